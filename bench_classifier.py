@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Microbenchmark: compiled command classifier vs. the original regex loop."""
+
+import os
+import re
+import sys
+import time
+
+from terminai.utils.classifier import CommandClassifier
+
+ROUNDS = int(os.getenv("TERMINAI_BENCH_ROUNDS", "2000"))
+
+CORPUS = [
+    "ls -la", "cd ..", "git status", "git commit -m 'fix parser'", "cat README.md | grep -n install",
+    "python3 -m pytest -q", "docker ps -a", "find . -name '*.py' | xargs wc -l", "echo $HOME",
+    "./install.sh", "FOO=1 make test", "tar xzf archive.tar.gz", "python3.11 -V", "du -sh *",
+    "please list the files here", "can you explain this error", "what is using port 8080",
+    "how do I undo the last commit", "explain this code to me", "summarize the readme",
+    "show me the largest files", "list all python files", "why is the build failing",
+    "write a script that backs up my home directory", "deploy staging now", "hello",
+]
+
+_NATURAL_LANGUAGE_INDICATORS = [
+    r'^please\b', r'^can you\b', r'^could you\b', r'^would you\b', r'^what\b', r'^how\b',
+    r'^where\b', r'^when\b', r'^why\b', r'^create a\b', r'^make a\b', r'^write a\b',
+    r'^find all\b', r'^list all\b', r'^show me\b', r'^tell me\b',
+]
+
+_BASH_PATTERNS = [
+    r'^[a-zA-Z][a-zA-Z0-9_-]*\s+', r'^[a-zA-Z][a-zA-Z0-9_-]*$', r'^\.?/', r'^\.\s+',
+    r'^ls\b', r'^cd\b', r'^pwd\b', r'^cat\b', r'^grep\b', r'^find\b', r'^mkdir\b', r'^rm\b',
+    r'^cp\b', r'^mv\b', r'^echo\b', r'^printf\b', r'^head\b', r'^tail\b', r'^wc\b', r'^sort\b',
+    r'^uniq\b', r'^cut\b', r'^awk\b', r'^sed\b', r'^tr\b', r'^xargs\b', r'^tar\b', r'^zip\b',
+    r'^unzip\b', r'^curl\b', r'^wget\b', r'^git\b', r'^docker\b', r'^python\b', r'^python3\b',
+    r'^node\b', r'^npm\b', r'^yarn\b', r'^chmod\b', r'^chown\b', r'^sudo\b', r'^apt\b',
+    r'^apt-get\b', r'^systemctl\b', r'^service\b', r'^journalctl\b',
+]
+
+
+def legacy_is_bash_command(text: str) -> bool:
+    """The original loop-over-patterns classifier, kept for comparison."""
+    text = text.strip()
+    text_lower = text.lower()
+    for pattern in _NATURAL_LANGUAGE_INDICATORS:
+        if re.match(pattern, text_lower):
+            return False
+    if text.startswith(('-', '*', '?', '!')):
+        return False
+    for pattern in _BASH_PATTERNS:
+        if re.match(pattern, text):
+            return True
+    for op in ['|', '>', '<', '&&', '||', ';', '&', '$', '`', '$(', '${']:
+        if op in text:
+            return True
+    return False
+
+
+def bench(label: str, classify) -> float:
+    """Classify the corpus repeatedly and return microseconds per input."""
+    for text in CORPUS:
+        classify(text)
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for text in CORPUS:
+            classify(text)
+    elapsed = time.perf_counter() - start
+
+    per_input_us = elapsed * 1e6 / (ROUNDS * len(CORPUS))
+    print(f"{label:<22} {ROUNDS * len(CORPUS)} inputs in {elapsed:6.2f}s  ({per_input_us:.2f} us/input)")
+    return per_input_us
+
+
+def main():
+    """Compare both classifiers and show where they disagree."""
+    classifier = CommandClassifier()
+    legacy_us = bench("regex loop", legacy_is_bash_command)
+    compiled_us = bench("compiled classifier", lambda text: classifier.classify(text).is_bash)
+    print(f"Speedup: {legacy_us / compiled_us:.1f}x")
+
+    for text in CORPUS:
+        decision = classifier.classify(text)
+        if decision.is_bash != legacy_is_bash_command(text):
+            print(f"  changed: {text!r:50} -> {decision.kind} ({decision.confidence:.2f}, {decision.reason})")
+    return 0 if compiled_us < legacy_us else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
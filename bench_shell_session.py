@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""Microbenchmark: persistent shell session vs. a fresh shell per command."""
+
+import asyncio
+import os
+import sys
+import time
+
+from terminai.utils.bash import BashExecutor
+
+COMMANDS = int(os.getenv("TERMINAI_BENCH_COMMANDS", "1000"))
+
+
+async def bench(executor: BashExecutor, label: str) -> float:
+    """Run trivial commands and return the mean latency in milliseconds."""
+    # Warm up (starts the session in persistent mode)
+    await executor.execute_command_async("true")
+
+    start = time.perf_counter()
+    for _ in range(COMMANDS):
+        exit_code, _, _ = await executor.execute_command_async("true")
+        assert exit_code == 0
+    elapsed = time.perf_counter() - start
+
+    await executor.close()
+    per_command_ms = elapsed * 1000 / COMMANDS
+    print(f"{label:<22} {COMMANDS} commands in {elapsed:6.2f}s  ({per_command_ms:.3f} ms/command)")
+    return per_command_ms
+
+
+async def main():
+    """Compare both execution modes."""
+    fork_ms = await bench(BashExecutor(), "fork-per-command")
+    session_ms = await bench(BashExecutor(persistent_session=True), "persistent session")
+    print(f"Speedup: {fork_ms / session_ms:.1f}x")
+    return 0 if session_ms < fork_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
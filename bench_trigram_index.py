@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Benchmark: repeated content searches with and without the trigram index."""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from terminai.utils.search import SearchEngine
+from terminai.utils.trigram_index import IndexManager
+
+TREE_MB = int(os.getenv("TERMINAI_BENCH_MB", "256"))
+FILE_KB = 64
+QUERIES = ["unique_token_17", "unique_token_4242", "no_such_identifier", "def handler_9"]
+
+
+def make_tree(root: str):
+    """Write TREE_MB of source-like files with a few rare tokens."""
+    rng = random.Random(0)
+    words = [f"name_{i}" for i in range(5000)] + ["def", "return", "class", "import", "self", "if", "else"]
+    files = TREE_MB * 1024 // FILE_KB
+    for i in range(files):
+        lines = []
+        size = 0
+        while size < FILE_KB * 1024:
+            line = " ".join(rng.choice(words) for _ in range(10))
+            lines.append(line)
+            size += len(line) + 1
+        if i % 1000 == 17:
+            lines.append(f"unique_token_{i}")
+        lines.append(f"def handler_{i}(): pass")
+        path = os.path.join(root, f"dir_{i // 100}", f"file_{i}.py")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write("\n".join(lines))
+    return files
+
+
+def main():
+    """Compare scan-everything searches with index-narrowed searches."""
+    root = tempfile.mkdtemp()
+    files = make_tree(root)
+    engine = SearchEngine()
+    print(f"Tree: {files} files, {TREE_MB} MB")
+
+    start = time.perf_counter()
+    index = IndexManager(tempfile.mkdtemp()).open(root, create=True)
+    index.update()
+    print(f"Index build:          {time.perf_counter() - start:6.2f}s  ({index.info()['index_bytes'] / 1024 / 1024:.0f} MB)")
+
+    start = time.perf_counter()
+    for query in QUERIES:
+        engine.search(root, query, context_lines=0)
+    scan_s = (time.perf_counter() - start) / len(QUERIES)
+    print(f"Full scan search:     {scan_s:6.3f}s per query")
+
+    start = time.perf_counter()
+    for query in QUERIES:
+        index.update()
+        engine.search(root, query, context_lines=0, candidates=index.candidates(query))
+    indexed_s = (time.perf_counter() - start) / len(QUERIES)
+    print(f"Indexed search:       {indexed_s:6.3f}s per query (including the freshness check)")
+    print(f"Speedup: {scan_s / indexed_s:.1f}x")
+    return 0 if indexed_s < scan_s else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
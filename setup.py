@@ -37,6 +37,10 @@ setup(
         "pyyaml>=6.0",
         "keyring>=24.0.0",
     ],
+    extras_require={
+        "semantic": ["numpy>=1.20"],
+        "http2": ["httpx[http2]>=0.25.0"],
+    },
     entry_points={
         "console_scripts": [
             "terminai=terminai.main:main",
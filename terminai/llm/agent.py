@@ -0,0 +1,164 @@
+"""Multi-turn agent loop for tool-calling conversations."""
+
+import json
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+from pydantic import BaseModel
+
+from .base import LLMMessage, LLMResponse
+from .context import ConversationContext
+from ..tools.manager import ToolManager, ToolResult
+
+logger = logging.getLogger(__name__)
+
+
+class AgentResult(BaseModel):
+    """Represents the outcome of an agent run."""
+    response: Optional[LLMResponse] = None
+    turns: int = 0
+    tool_calls: int = 0
+    failed_tool_calls: List[str] = []  # ids of calls that were declined or failed
+    stop_reason: str = "complete"  # "complete", "max_turns" or "time_budget"
+
+
+class AgentLoop:
+    """Runs generate → tool calls → generate until the model stops calling tools.
+
+    Tool calls from a single response are treated as independent and executed
+    concurrently (bounded by ``max_concurrency``); their results are sent back
+    to the model in the order the calls were made. With a ``context``, the
+    history is trimmed to its token budget before every model call.
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[List[LLMMessage], Optional[List[Dict[str, Any]]]], Awaitable[LLMResponse]],
+        tool_manager: ToolManager,
+        max_turns: int = 8,
+        max_concurrency: int = 4,
+        time_budget: float = 120.0,
+        confirm_tool_call: Optional[Callable[[str, Dict[str, Any]], bool]] = None,
+        on_tool_result: Optional[Callable[[str, ToolResult], None]] = None,
+        context: Optional[ConversationContext] = None
+    ):
+        """Initialize the agent loop."""
+        self.generate = generate
+        self.tool_manager = tool_manager
+        self.max_turns = max(1, max_turns)
+        self.max_concurrency = max(1, max_concurrency)
+        self.time_budget = time_budget
+        self.confirm_tool_call = confirm_tool_call
+        self.on_tool_result = on_tool_result
+        self.context = context
+
+    async def run(self, messages: List[LLMMessage], tools: Optional[List[Dict[str, Any]]] = None) -> AgentResult:
+        """Run the loop, appending every turn to ``messages``."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.time_budget
+        result = AgentResult()
+
+        for _ in range(self.max_turns):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                result.stop_reason = "time_budget"
+                return result
+
+            if self.context is not None:
+                self.context.fit()
+
+            try:
+                response = await asyncio.wait_for(self.generate(messages, tools), timeout=remaining)
+            except asyncio.TimeoutError:
+                result.stop_reason = "time_budget"
+                return result
+
+            result.turns += 1
+            result.response = response
+
+            if not response.tool_calls:
+                result.stop_reason = "complete"
+                return result
+
+            tool_results = await self.execute_tool_calls(response.tool_calls, deadline)
+            result.tool_calls += len(tool_results)
+
+            # The calls and their results are appended together, so an interrupted
+            # run never leaves tool calls without results in the history
+            messages.extend(self.tool_turn(response.content, response.tool_calls, tool_results))
+            result.failed_tool_calls.extend(
+                tool_call["id"] for tool_call, tool_result in zip(response.tool_calls, tool_results)
+                if not tool_result.success
+            )
+
+        result.stop_reason = "max_turns"
+        return result
+
+    @staticmethod
+    def tool_turn(content: str, tool_calls: List[Dict[str, Any]], tool_results: List[ToolResult]) -> List[LLMMessage]:
+        """Build the assistant message making tool calls followed by their results, in call order."""
+        turn = [LLMMessage(role="assistant", content=content, tool_calls=tool_calls)]
+        for tool_call, tool_result in zip(tool_calls, tool_results):
+            turn.append(LLMMessage(
+                role="tool",
+                content=tool_result.content if tool_result.success else f"Error: {tool_result.error}",
+                tool_call_id=tool_call["id"]
+            ))
+        return turn
+
+    async def execute_tool_calls(self, tool_calls: List[Dict[str, Any]], deadline: Optional[float] = None) -> List[ToolResult]:
+        """Execute tool calls concurrently and return results in call order."""
+        loop = asyncio.get_running_loop()
+        if deadline is None:
+            deadline = loop.time() + self.time_budget
+
+        # Parse and confirm sequentially, since confirmation is interactive
+        prepared = []
+        for tool_call in tool_calls:
+            tool_name = tool_call["function"]["name"]
+            try:
+                tool_args = json.loads(tool_call["function"]["arguments"] or "{}")
+            except json.JSONDecodeError as e:
+                prepared.append((tool_name, None, ToolResult(
+                    success=False,
+                    content="",
+                    error=f"Invalid JSON arguments: {e}"
+                )))
+                continue
+
+            if self.confirm_tool_call and not self.confirm_tool_call(tool_name, tool_args):
+                prepared.append((tool_name, None, ToolResult(
+                    success=False,
+                    content="",
+                    error="Tool call declined by user"
+                )))
+                continue
+
+            prepared.append((tool_name, tool_args, None))
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_one(tool_name: str, tool_args: Optional[Dict[str, Any]], early_result: Optional[ToolResult]) -> ToolResult:
+            if early_result is not None:
+                return early_result
+
+            async with semaphore:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return ToolResult(success=False, content="", error="Time budget exhausted before tool ran")
+                try:
+                    return await asyncio.wait_for(
+                        self.tool_manager.execute_tool(tool_name, tool_args),
+                        timeout=remaining
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning(f"Tool {tool_name} exceeded the agent time budget")
+                    return ToolResult(success=False, content="", error="Tool timed out (time budget exhausted)")
+
+        results = await asyncio.gather(*(run_one(*item) for item in prepared))
+
+        if self.on_tool_result:
+            for (tool_name, _, _), tool_result in zip(prepared, results):
+                self.on_tool_result(tool_name, tool_result)
+
+        return list(results)
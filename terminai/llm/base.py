@@ -1,8 +1,10 @@
 """Base classes for LLM providers."""
 
+import os
 import logging
+import importlib
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
@@ -13,6 +15,7 @@ class LLMMessage(BaseModel):
     role: str  # "system", "user", "assistant", "tool"
     content: str
     tool_call_id: Optional[str] = None
+    tool_calls: Optional[List[Dict[str, Any]]] = None  # set on assistant messages that requested tools
 
 
 class LLMResponse(BaseModel):
@@ -23,21 +26,136 @@ class LLMResponse(BaseModel):
     model: Optional[str] = None
 
 
+class LLMStreamChunk(BaseModel):
+    """Represents an incremental piece of a streamed response."""
+    content: Optional[str] = None
+    tool_call_index: Optional[int] = None
+    tool_call_id: Optional[str] = None
+    tool_name: Optional[str] = None
+    arguments: Optional[str] = None  # fragment of the tool call's JSON arguments
+    finish_reason: Optional[str] = None
+    usage: Optional[Dict[str, Any]] = None
+    model: Optional[str] = None
+
+
+class StreamAccumulator:
+    """Reassembles streamed chunks into a complete LLMResponse.
+
+    Tool-call fragments are keyed by their index and stitched back into the
+    same ``tool_calls`` structure returned by ``LLMProvider.generate``.
+    """
+    
+    def __init__(self):
+        """Initialize an empty accumulator."""
+        self.content = ""
+        self.usage: Optional[Dict[str, Any]] = None
+        self.model: Optional[str] = None
+        self.finish_reason: Optional[str] = None
+        self._tool_calls: Dict[int, Dict[str, Any]] = {}
+    
+    def add(self, chunk: LLMStreamChunk):
+        """Add a chunk to the accumulated response."""
+        if chunk.content:
+            self.content += chunk.content
+        
+        if chunk.tool_call_index is not None:
+            call = self._tool_calls.setdefault(chunk.tool_call_index, {
+                "id": "",
+                "type": "function",
+                "function": {"name": "", "arguments": ""}
+            })
+            if chunk.tool_call_id:
+                call["id"] = chunk.tool_call_id
+            if chunk.tool_name:
+                call["function"]["name"] += chunk.tool_name
+            if chunk.arguments:
+                call["function"]["arguments"] += chunk.arguments
+        
+        if chunk.finish_reason:
+            self.finish_reason = chunk.finish_reason
+        if chunk.usage:
+            self.usage = chunk.usage
+        if chunk.model:
+            self.model = chunk.model
+    
+    def get_tool_calls(self) -> Optional[List[Dict[str, Any]]]:
+        """Get the reassembled tool calls in their original order."""
+        if not self._tool_calls:
+            return None
+        
+        tool_calls = []
+        for index in sorted(self._tool_calls):
+            call = self._tool_calls[index]
+            if not call["function"]["arguments"]:
+                call["function"]["arguments"] = "{}"
+            tool_calls.append(call)
+        return tool_calls
+    
+    def to_response(self) -> LLMResponse:
+        """Build the final response from everything received so far."""
+        return LLMResponse(
+            content=self.content,
+            tool_calls=self.get_tool_calls(),
+            usage=self.usage,
+            model=self.model
+        )
+
+
+class ProviderSpec(BaseModel):
+    """Describes where a provider class lives without importing it."""
+    module: str
+    class_name: str
+    api_key_env: Optional[str] = None
+
+
 class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
     
+    # API endpoint used when the configuration does not set base_url
+    DEFAULT_BASE_URL: Optional[str] = None
+    
     def __init__(self, config: Dict[str, Any]):
         """Initialize the LLM provider with configuration."""
         self.config = config
         self.model = config.get("model")
         self.max_tokens = config.get("max_tokens", 150)
         self.temperature = config.get("temperature", 0.1)
+        self.transport_manager = None  # shared HTTP clients, set by LLMManager
     
     @abstractmethod
     async def generate(self, messages: List[LLMMessage], tools: Optional[List[Dict[str, Any]]] = None) -> LLMResponse:
         """Generate a response from the LLM."""
         pass
     
+    async def stream(self, messages: List[LLMMessage], tools: Optional[List[Dict[str, Any]]] = None) -> AsyncIterator[LLMStreamChunk]:
+        """Stream a response as content and tool-call argument deltas.
+        
+        Providers without native streaming support yield the complete
+        response from ``generate`` as a single set of chunks.
+        """
+        response = await self.generate(messages, tools=tools)
+        
+        if response.content:
+            yield LLMStreamChunk(content=response.content)
+        
+        for index, call in enumerate(response.tool_calls or []):
+            yield LLMStreamChunk(
+                tool_call_index=index,
+                tool_call_id=call.get("id"),
+                tool_name=call["function"]["name"],
+                arguments=call["function"]["arguments"]
+            )
+        
+        yield LLMStreamChunk(
+            finish_reason="tool_calls" if response.tool_calls else "stop",
+            usage=response.usage,
+            model=response.model
+        )
+    
+    def get_base_url(self) -> Optional[str]:
+        """Get the HTTP endpoint this provider talks to, if it uses one."""
+        return getattr(self, "base_url", None) or self.DEFAULT_BASE_URL
+    
     @abstractmethod
     def is_configured(self) -> bool:
         """Check if the provider is properly configured."""
@@ -91,69 +209,115 @@ The exact MCP tools available depend on which MCP servers are connected. Use the
 
 
 class LLMManager:
-    """Manages multiple LLM providers."""
+    """Manages multiple LLM providers.
+
+    Providers are registered lazily: only the module path and class name are
+    recorded at startup, and the provider module (and with it the vendor SDK)
+    is imported the first time an instance is requested.
+    """
     
-    def __init__(self):
-        """Initialize the LLM manager."""
-        self.providers: Dict[str, type] = {}
+    def __init__(self, transport_manager=None):
+        """Initialize the LLM manager, optionally with a shared TransportManager for providers."""
+        self.providers: Dict[str, ProviderSpec] = {}
+        self._provider_classes: Dict[str, type] = {}
+        self.transport_manager = transport_manager
     
     def register_provider(self, name: str, provider_class: type):
         """Register a new LLM provider."""
-        self.providers[name] = provider_class
+        self.providers[name] = ProviderSpec(
+            module=provider_class.__module__,
+            class_name=provider_class.__name__
+        )
+        self._provider_classes[name] = provider_class
+    
+    def register_lazy_provider(self, name: str, module: str, class_name: str, api_key_env: Optional[str] = None):
+        """Register a provider by import location, deferring the import until first use."""
+        self.providers[name] = ProviderSpec(
+            module=module,
+            class_name=class_name,
+            api_key_env=api_key_env
+        )
+        self._provider_classes.pop(name, None)
     
     def load_providers_from_config(self, config: Dict[str, Any]):
         """Load providers dynamically from configuration."""
         providers_config = config.get("llm", {}).get("providers", {})
         
-        # Dynamically import and register providers based on configuration
+        # Only record where each provider lives; nothing is imported here
         for name, provider_config in providers_config.items():
             provider_type = provider_config.get("type")
             if not provider_type:
                 continue
-                
-            try:
-                # Dynamically import the provider module
-                module_name = f"terminai.llm.providers.{provider_type}_provider"
-                class_name = f"{provider_type.capitalize()}Provider"
-                
-                # Import the module dynamically
-                import importlib
-                module = importlib.import_module(module_name)
-                
-                # Handle case sensitivity properly
-                provider_class = None
-                for attr_name in dir(module):
-                    if attr_name.lower() == class_name.lower():
-                        provider_class = getattr(module, attr_name)
-                        break
-                
-                if provider_class is None:
-                    raise AttributeError(f"Class {class_name} not found in {module_name}")
-                
-                self.register_provider(name, provider_class)
-            except (ImportError, AttributeError) as e:
-                logger.warning(f"Failed to load provider '{name}' of type '{provider_type}': {e}")
+            
+            self.register_lazy_provider(
+                name,
+                module=f"terminai.llm.providers.{provider_type}_provider",
+                class_name=f"{provider_type.capitalize()}Provider",
+                api_key_env=f"{provider_type.upper()}_API_KEY"
+            )
+    
+    def _resolve_provider_class(self, name: str) -> Optional[type]:
+        """Import and cache the class for a registered provider."""
+        if name in self._provider_classes:
+            return self._provider_classes[name]
+        
+        spec = self.providers.get(name)
+        if spec is None:
+            return None
+        
+        try:
+            module = importlib.import_module(spec.module)
+            
+            # Handle case sensitivity properly
+            provider_class = None
+            for attr_name in dir(module):
+                if attr_name.lower() == spec.class_name.lower():
+                    provider_class = getattr(module, attr_name)
+                    break
+            
+            if provider_class is None:
+                raise AttributeError(f"Class {spec.class_name} not found in {spec.module}")
+        except (ImportError, AttributeError) as e:
+            logger.warning(f"Failed to load provider '{name}' from '{spec.module}': {e}")
+            return None
+        
+        self._provider_classes[name] = provider_class
+        return provider_class
     
     def get_provider(self, name: str, config: Dict[str, Any]) -> Optional[LLMProvider]:
         """Get an instance of a specific provider."""
-        if name not in self.providers:
+        provider_class = self._resolve_provider_class(name)
+        if provider_class is None:
             return None
         
-        provider_class = self.providers[name]
-        return provider_class(config)
+        provider = provider_class(config)
+        provider.transport_manager = self.transport_manager
+        return provider
     
     def list_providers(self) -> List[str]:
         """List all available providers."""
         return list(self.providers.keys())
     
+    def is_provider_configured(self, name: str, provider_config: Dict[str, Any]) -> bool:
+        """Check whether a provider has credentials, without importing it when possible."""
+        spec = self.providers.get(name)
+        if spec is None:
+            return False
+        
+        if spec.api_key_env is not None:
+            return bool(provider_config.get("api_key") or os.getenv(spec.api_key_env))
+        
+        # Eagerly registered providers are asked directly
+        try:
+            provider = self.get_provider(name, provider_config)
+            return bool(provider and provider.is_configured())
+        except Exception:
+            return False
+    
     def get_configured_providers(self, config: Dict[str, Any]) -> Dict[str, bool]:
         """Get configuration status for all providers."""
-        status = {}
-        for name, provider_class in self.providers.items():
-            provider_config = config.get("llm", {}).get("providers", {}).get(name, {})
-            try:
-                provider = provider_class(provider_config)
-                status[name] = provider.is_configured()
-            except Exception:
-                status[name] = False
-        return status
+        providers_config = config.get("llm", {}).get("providers", {})
+        return {
+            name: self.is_provider_configured(name, providers_config.get(name, {}))
+            for name in self.providers
+        }
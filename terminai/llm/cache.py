@@ -0,0 +1,300 @@
+"""Response cache for deterministic LLM requests."""
+
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple, Union
+
+from .base import LLMProvider, LLMMessage, LLMResponse, LLMStreamChunk, StreamAccumulator
+from .router import RoutingProvider
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at);
+"""
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def cache_key(
+    provider_name: str,
+    model: Optional[str],
+    temperature: float,
+    messages: List[LLMMessage],
+    tools: Optional[List[Dict[str, Any]]] = None,
+    tools_json: Optional[bytes] = None
+) -> str:
+    """Hash a request into a cache key.
+
+    Message text is stripped and whitespace runs collapsed, and tools are
+    put in a canonical order, so trivially different requests share an entry.
+    ``tools_json``, if given, is hashed as is in place of ``tools``: pass
+    ToolManager's cached bytes to skip reserializing the tools.
+    """
+    normalized_messages = []
+    for message in messages:
+        item = message.model_dump(exclude_none=True)
+        item["content"] = _WHITESPACE.sub(" ", message.content).strip()
+        normalized_messages.append(item)
+
+    if tools_json is None:
+        normalized_tools = sorted(tools or [], key=lambda tool: json.dumps(tool, sort_keys=True))
+        tools_json = json.dumps(normalized_tools, sort_keys=True, separators=(",", ":")).encode()
+    payload = json.dumps({
+        "provider": provider_name,
+        "model": model,
+        "temperature": temperature,
+        "messages": normalized_messages,
+    }, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode() + b"\n" + tools_json).hexdigest()
+
+
+class ResponseCache:
+    """SQLite store of LLM responses with a TTL and least-recently-used eviction.
+
+    The database is opened on first use. Hit and miss counters cover the
+    current session.
+    """
+
+    def __init__(self, db_path: Union[str, Path], ttl: float = 24 * 3600, max_entries: int = 1000):
+        """Initialize the cache stored at ``db_path``."""
+        self.db_path = Path(db_path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database if needed."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def get(self, key: str) -> Optional[LLMResponse]:
+        """Get a cached response, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl and now - row[1] > self.ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self.hits += 1
+
+        try:
+            return LLMResponse.model_validate_json(row[0])
+        except ValueError as e:
+            logger.warning(f"Discarding unreadable cached response: {e}")
+            return None
+
+    def put(self, key: str, response: LLMResponse):
+        """Store a response, evicting the least recently used entries over the limit."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, response.model_dump_json(), now, now)
+            )
+            if self.ttl:
+                conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+
+            count = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                evicted = conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                    (count - self.max_entries,)
+                ).rowcount
+                self.evictions += evicted
+            conn.commit()
+
+    def clear(self) -> int:
+        """Remove every cached response; returns how many were removed."""
+        with self._lock:
+            conn = self._connection()
+            removed = conn.execute("DELETE FROM responses").rowcount
+            conn.commit()
+            conn.execute("VACUUM")
+            return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Get entry count, size and this session's counters."""
+        with self._lock:
+            entries = self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "path": str(self.db_path),
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "bytes": self.db_path.stat().st_size if self.db_path.exists() else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class CachingProvider(LLMProvider):
+    """Wraps a provider and answers repeated deterministic requests from a ResponseCache.
+
+    Only requests made at a temperature of at most ``max_temperature`` are
+    cached; everything else goes straight to the wrapped provider. Keys hash
+    the whole history, so only the first turn of a conversation is cached:
+    later turns can never repeat. When the wrapped provider is a
+    RoutingProvider, lookups use the provider it would try first and answers
+    are stored under the provider that actually gave them. With a
+    ``tool_manager``, tools are hashed from its cached JSON bytes.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        cache: ResponseCache,
+        provider_name: str,
+        max_temperature: float = 0.0,
+        tool_manager=None
+    ):
+        """Initialize the wrapper."""
+        super().__init__(provider.config)
+        self.provider = provider
+        self.cache = cache
+        self.provider_name = provider_name
+        self.max_temperature = max_temperature
+        self.tool_manager = tool_manager
+
+    def _target(self, answered: bool = False) -> Optional[Tuple[str, LLMProvider]]:
+        """Get the provider a request goes to (or, with ``answered``, the one that just answered it)."""
+        if not isinstance(self.provider, RoutingProvider):
+            return self.provider_name, self.provider
+        if answered:
+            name = self.provider.last_provider
+            return (name, self.provider.provider(name)) if name else None
+        ranked = self.provider.ranked()
+        return ranked[0] if ranked else None
+
+    def _key(
+        self,
+        messages: List[LLMMessage],
+        tools: Optional[List[Dict[str, Any]]],
+        answered: bool = False
+    ) -> Optional[str]:
+        """Get the cache key for a request, or None if it should not be cached."""
+        if sum(1 for message in messages if message.role == "user") > 1:
+            return None
+        target = self._target(answered)
+        if target is None:
+            return None
+        name, provider = target
+        temperature = provider.temperature or 0.0
+        if temperature > 0 and temperature > self.max_temperature:
+            return None
+        tools_json = None
+        if self.tool_manager is not None and tools:
+            tools_json = self.tool_manager.get_tool_definitions_json(tools)
+        return cache_key(name, provider.model, temperature, messages, tools, tools_json)
+
+    async def generate(self, messages: List[LLMMessage], tools: Optional[List[Dict[str, Any]]] = None) -> LLMResponse:
+        """Generate a response, from the cache when possible."""
+        key = self._key(messages, tools)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        response = await self.provider.generate(messages, tools=tools)
+        key = self._key(messages, tools, answered=True)
+        if key is not None and (response.content or response.tool_calls):
+            self.cache.put(key, response)
+        return response
+
+    async def stream(self, messages: List[LLMMessage], tools: Optional[List[Dict[str, Any]]] = None) -> AsyncIterator[LLMStreamChunk]:
+        """Stream a response; cached responses are replayed, new ones are stored once complete."""
+        key = self._key(messages, tools)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                async for chunk in _Replay(cached).stream(messages, tools=tools):
+                    yield chunk
+                return
+
+        accumulator = StreamAccumulator()
+        async for chunk in self.provider.stream(messages, tools=tools):
+            accumulator.add(chunk)
+            yield chunk
+
+        # Only complete responses are worth replaying
+        response = accumulator.to_response()
+        key = self._key(messages, tools, answered=True)
+        if key is not None and accumulator.finish_reason and (response.content or response.tool_calls):
+            self.cache.put(key, response)
+
+    def is_configured(self) -> bool:
+        """Check if the wrapped provider is configured."""
+        return self.provider.is_configured()
+
+    def get_required_config(self) -> List[str]:
+        """Get the wrapped provider's required configuration."""
+        return self.provider.get_required_config()
+
+    def format_prompt(self, prompt: str) -> List[LLMMessage]:
+        """Format a prompt the way the wrapped provider does."""
+        return self.provider.format_prompt(prompt)
+
+    def get_base_url(self) -> Optional[str]:
+        """Get the wrapped provider's endpoint."""
+        return self.provider.get_base_url()
+
+
+class _Replay(LLMProvider):
+    """Provider that returns a fixed response; used to replay cache hits as a stream."""
+
+    def __init__(self, response: LLMResponse):
+        """Initialize with the response to replay."""
+        super().__init__({})
+        self.response = response
+
+    async def generate(self, messages: List[LLMMessage], tools: Optional[List[Dict[str, Any]]] = None) -> LLMResponse:
+        """Return the fixed response."""
+        return self.response
+
+    def is_configured(self) -> bool:
+        """Always configured."""
+        return True
+
+    def get_required_config(self) -> List[str]:
+        """Nothing is required."""
+        return []
@@ -0,0 +1,205 @@
+"""Token-budgeted conversation history."""
+
+import json
+import logging
+from typing import Dict, Any, List, Union
+
+from .base import LLMMessage
+
+logger = logging.getLogger(__name__)
+
+# Tokens each message costs beyond its text (role, separators)
+MESSAGE_OVERHEAD = 4
+
+# Old tool output is cut down to this many lines from each end
+COMPACT_HEAD_LINES = 8
+COMPACT_TAIL_LINES = 4
+
+
+def estimate_tokens(text: Union[str, bytes]) -> int:
+    """Estimate the tokens in some text: about four UTF-8 bytes per token for English and code."""
+    data = text if isinstance(text, bytes) else text.encode("utf-8")
+    return (len(data) + 3) // 4
+
+
+def message_tokens(message: LLMMessage) -> int:
+    """Estimate the tokens a message takes up in a prompt."""
+    tokens = MESSAGE_OVERHEAD + estimate_tokens(message.content)
+    if message.tool_calls:
+        tokens += estimate_tokens(json.dumps(message.tool_calls))
+    return tokens
+
+
+def compact_output(content: str, head: int = COMPACT_HEAD_LINES, tail: int = COMPACT_TAIL_LINES) -> str:
+    """Shorten tool output to its first and last lines, noting what was left out."""
+    lines = content.splitlines()
+    if len(lines) <= head + tail + 1:
+        # Few but long lines: cut by characters instead
+        limit = (head + tail) * 80
+        if len(content) <= limit + 100:
+            return content
+        omitted = len(content) - limit
+        return f"{content[:limit * 2 // 3]}\n[... {omitted} characters omitted ...]\n{content[-limit // 3:]}"
+    omitted = len(lines) - head - tail
+    return "\n".join(lines[:head] + [f"[... {omitted} lines omitted ...]"] + lines[-tail:])
+
+
+class ConversationContext:
+    """Conversation history that stays within a token budget.
+
+    ``messages`` is an ordinary list, so the agent loop appends to it as
+    usual; token counts for new messages are picked up incrementally on the
+    next ``fit``. The system prompt is pinned. When the history is over
+    budget, tool output from earlier turns is compacted first, then the
+    oldest turns are dropped whole, then the current turn's tool output is
+    compacted as a last resort.
+    """
+
+    def __init__(self, max_tokens: int = 16000, reserve_tokens: int = 0):
+        """Initialize an empty history; ``reserve_tokens`` are kept free for the response."""
+        self.max_tokens = max_tokens
+        self.reserve_tokens = reserve_tokens
+        self.messages: List[LLMMessage] = []
+        self._tokens: List[int] = []
+        self.total_tokens = 0
+        self.compacted = 0
+        self.dropped = 0
+
+    @property
+    def budget(self) -> int:
+        """Tokens available for the prompt."""
+        return max(0, self.max_tokens - self.reserve_tokens)
+
+    def _sync(self):
+        """Count tokens for messages appended since the last call."""
+        for message in self.messages[len(self._tokens):]:
+            tokens = message_tokens(message)
+            self._tokens.append(tokens)
+            self.total_tokens += tokens
+
+    def set_system_prompt(self, message: LLMMessage):
+        """Pin the system prompt at the start of the history, replacing any previous one."""
+        self._sync()
+        if self.messages and self.messages[0].role == "system":
+            self.total_tokens -= self._tokens[0]
+            self.messages[0] = message
+            self._tokens[0] = message_tokens(message)
+            self.total_tokens += self._tokens[0]
+        else:
+            self.messages.insert(0, message)
+            self._tokens.insert(0, message_tokens(message))
+            self.total_tokens += self._tokens[0]
+
+    def start_turn(self, messages: List[LLMMessage]) -> List[LLMMessage]:
+        """Begin a turn with freshly formatted prompt messages and return the history to send.
+
+        A leading system message becomes the pinned system prompt; the rest
+        are appended.
+        """
+        if messages and messages[0].role == "system":
+            self.set_system_prompt(messages[0])
+            messages = messages[1:]
+        self.messages.extend(messages)
+        self.fit()
+        return self.messages
+
+    def _turn_starts(self) -> List[int]:
+        """Indexes of the user messages that begin each turn."""
+        return [i for i, message in enumerate(self.messages) if message.role == "user"]
+
+    def current_turn(self) -> List[LLMMessage]:
+        """Messages from the latest user message on."""
+        starts = self._turn_starts()
+        return self.messages[starts[-1]:] if starts else list(self.messages)
+
+    def recent_requests(self, turns: int = 2) -> List[str]:
+        """The user messages of the last ``turns`` turns, oldest first."""
+        return [self.messages[i].content for i in self._turn_starts()[-turns:]]
+
+    def tools_called(self) -> List[str]:
+        """Names of the tools called anywhere in the history, in first-call order."""
+        names: Dict[str, None] = {}
+        for message in self.messages:
+            for tool_call in message.tool_calls or ():
+                names[tool_call["function"]["name"]] = None
+        return list(names)
+
+    def _compact(self, start: int, end: int) -> bool:
+        """Compact tool output in ``messages[start:end]``, oldest first, until within budget."""
+        changed = False
+        for i in range(start, end):
+            if self.total_tokens <= self.budget:
+                break
+            message = self.messages[i]
+            if message.role != "tool":
+                continue
+            content = compact_output(message.content)
+            if content == message.content:
+                continue
+            self.messages[i] = message.model_copy(update={"content": content})
+            tokens = message_tokens(self.messages[i])
+            self.total_tokens += tokens - self._tokens[i]
+            self._tokens[i] = tokens
+            self.compacted += 1
+            changed = True
+        return changed
+
+    def _drop_oldest_turn(self) -> bool:
+        """Remove the oldest turn other than the current one."""
+        starts = self._turn_starts()
+        if len(starts) < 2:
+            return False
+        first, end = starts[0], starts[1]
+        # Anything between the system prompt and the first user message goes too
+        begin = 1 if self.messages and self.messages[0].role == "system" else 0
+        begin = min(begin, first)
+        self.total_tokens -= sum(self._tokens[begin:end])
+        del self.messages[begin:end]
+        del self._tokens[begin:end]
+        self.dropped += 1
+        return True
+
+    def fit(self) -> int:
+        """Bring the history within budget; returns the estimated prompt tokens."""
+        self._sync()
+        if self.total_tokens <= self.budget:
+            return self.total_tokens
+
+        starts = self._turn_starts()
+        current = starts[-1] if starts else 0
+        self._compact(0, current)
+        while self.total_tokens > self.budget and self._drop_oldest_turn():
+            pass
+        if self.total_tokens > self.budget:
+            starts = self._turn_starts()
+            self._compact(starts[-1] if starts else 0, len(self.messages))
+        if self.total_tokens > self.budget:
+            logger.warning(f"Conversation is {self.total_tokens} tokens, over the {self.budget} token budget")
+        return self.total_tokens
+
+    def truncate(self, length: int):
+        """Remove every message after the first ``length``, e.g. to undo an interrupted turn."""
+        self._sync()
+        del self.messages[length:]
+        del self._tokens[length:]
+        self.total_tokens = sum(self._tokens)
+
+    def clear(self):
+        """Forget everything except the system prompt."""
+        self._sync()
+        keep = 1 if self.messages and self.messages[0].role == "system" else 0
+        del self.messages[keep:]
+        del self._tokens[keep:]
+        self.total_tokens = sum(self._tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the history's size and how much has been trimmed."""
+        self._sync()
+        return {
+            "messages": len(self.messages),
+            "turns": len(self._turn_starts()),
+            "tokens": self.total_tokens,
+            "budget": self.budget,
+            "compacted": self.compacted,
+            "dropped": self.dropped,
+        }
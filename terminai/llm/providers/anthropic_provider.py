@@ -1,64 +1,207 @@
 """Anthropic provider implementation."""
 
 import os
-from typing import Dict, Any, List
-from anthropic import AsyncAnthropic
+import json
+from typing import Dict, Any, List, Optional, AsyncIterator
 
-from ..base import LLMProvider, LLMMessage, LLMResponse
+from ..base import LLMProvider, LLMMessage, LLMResponse, LLMStreamChunk
+
+# Anthropic stop reasons in the shared (OpenAI) vocabulary
+FINISH_REASONS = {
+    "end_turn": "stop",
+    "stop_sequence": "stop",
+    "tool_use": "tool_calls",
+    "max_tokens": "length",
+}
+
+EPHEMERAL = {"type": "ephemeral"}
 
 
 class AnthropicProvider(LLMProvider):
     """Anthropic LLM provider."""
     
+    DEFAULT_BASE_URL = "https://api.anthropic.com"
+    
     def __init__(self, config: Dict[str, Any]):
         """Initialize Anthropic provider."""
         super().__init__(config)
         self.api_key = config.get("api_key") or os.getenv("ANTHROPIC_API_KEY")
         self.base_url = config.get("base_url")
+        self.prompt_caching = config.get("prompt_caching", True)
         self.client = None
-        
-        if self.is_configured():
+    
+    def _get_client(self):
+        """Create the API client on first use so the SDK is only imported when needed."""
+        if self.client is None and self.is_configured():
+            from anthropic import AsyncAnthropic
+            
             client_kwargs = {"api_key": self.api_key}
             if self.base_url:
                 client_kwargs["base_url"] = self.base_url
-                
+            
+            if self.transport_manager is not None:
+                # Share pooled, keep-alive connections with everything else talking to this host
+                client_kwargs["http_client"] = self.transport_manager.client_for(self.get_base_url())
+            
             self.client = AsyncAnthropic(**client_kwargs)
+        return self.client
     
-    async def generate(self, messages: List[LLMMessage]) -> LLMResponse:
+    def _convert_messages(self, messages: List[LLMMessage]) -> List[Dict[str, Any]]:
+        """Convert messages to Anthropic content blocks.
+        
+        Assistant tool calls become ``tool_use`` blocks and tool results
+        become ``tool_result`` blocks in a user turn. Consecutive turns of the
+        same role are merged, since results of parallel calls must share one
+        user message.
+        """
+        converted: List[Dict[str, Any]] = []
+        for msg in messages:
+            if msg.role == "system":
+                continue
+            
+            if msg.role == "tool":
+                role = "user"
+                blocks = [{"type": "tool_result", "tool_use_id": msg.tool_call_id, "content": msg.content}]
+            else:
+                role = msg.role
+                blocks = [{"type": "text", "text": msg.content}] if msg.content else []
+                for call in msg.tool_calls or []:
+                    try:
+                        arguments = json.loads(call["function"]["arguments"] or "{}")
+                    except json.JSONDecodeError:
+                        arguments = {}
+                    blocks.append({
+                        "type": "tool_use",
+                        "id": call["id"],
+                        "name": call["function"]["name"],
+                        "input": arguments
+                    })
+            
+            if converted and converted[-1]["role"] == role:
+                converted[-1]["content"].extend(blocks)
+            else:
+                converted.append({"role": role, "content": blocks})
+        return converted
+    
+    def _convert_tools(self, tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convert OpenAI-style function definitions to Anthropic tools."""
+        return [
+            {
+                "name": tool["function"]["name"],
+                "description": tool["function"].get("description", ""),
+                "input_schema": tool["function"].get("parameters") or {"type": "object", "properties": {}}
+            }
+            for tool in tools
+        ]
+    
+    def _build_api_kwargs(self, messages: List[LLMMessage], tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Build message creation arguments in Anthropic format.
+        
+        With prompt caching on, cache breakpoints are set after the tool list
+        and the system prompt, so later turns reuse that prefix instead of
+        paying for it again.
+        """
+        system_prompt = "\n\n".join(msg.content for msg in messages if msg.role == "system")
+        
+        api_kwargs = {
+            "model": self.model,
+            "messages": self._convert_messages(messages),
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature
+        }
+        
+        if system_prompt:
+            system_block = {"type": "text", "text": system_prompt}
+            if self.prompt_caching:
+                system_block["cache_control"] = EPHEMERAL
+            api_kwargs["system"] = [system_block]
+        
+        if tools:
+            anthropic_tools = self._convert_tools(tools)
+            if self.prompt_caching:
+                anthropic_tools[-1]["cache_control"] = EPHEMERAL
+            api_kwargs["tools"] = anthropic_tools
+        
+        return api_kwargs
+    
+    async def generate(self, messages: List[LLMMessage], tools: Optional[List[Dict[str, Any]]] = None) -> LLMResponse:
         """Generate response using Anthropic API."""
-        if not self.client:
+        client = self._get_client()
+        if not client:
             raise RuntimeError("Anthropic client not initialized. Please check your API key.")
-            
+        
         try:
-            # Convert messages to Anthropic format
-            system_message = None
-            anthropic_messages = []
+            response = await client.messages.create(**self._build_api_kwargs(messages, tools))
             
-            for msg in messages:
-                if msg.role == "system":
-                    system_message = msg.content
-                else:
-                    anthropic_messages.append({
-                        "role": msg.role,
-                        "content": msg.content
+            text = []
+            tool_calls = []
+            for block in response.content:
+                if block.type == "text":
+                    text.append(block.text)
+                elif block.type == "tool_use":
+                    tool_calls.append({
+                        "id": block.id,
+                        "type": "function",
+                        "function": {
+                            "name": block.name,
+                            "arguments": json.dumps(block.input)
+                        }
                     })
             
-            response = await self.client.messages.create(
-                model=self.model,
-                messages=anthropic_messages,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                system=system_message
-            )
-            
             return LLMResponse(
-                content=response.content[0].text.strip(),
-                usage=response.usage.dict() if response.usage else None,
+                content="".join(text).strip(),
+                tool_calls=tool_calls or None,
+                usage=response.usage.model_dump(exclude_none=True) if response.usage else None,
                 model=response.model
             )
         except Exception as e:
             raise RuntimeError(f"Anthropic API error: {str(e)}")
     
+    async def stream(self, messages: List[LLMMessage], tools: Optional[List[Dict[str, Any]]] = None) -> AsyncIterator[LLMStreamChunk]:
+        """Stream response deltas from Anthropic API."""
+        client = self._get_client()
+        if not client:
+            raise RuntimeError("Anthropic client not initialized. Please check your API key.")
+        
+        try:
+            api_kwargs = self._build_api_kwargs(messages, tools)
+            api_kwargs["stream"] = True
+            
+            usage: Dict[str, Any] = {}
+            model = None
+            response = await client.messages.create(**api_kwargs)
+            async for event in response:
+                if event.type == "message_start":
+                    model = event.message.model
+                    if event.message.usage:
+                        usage.update(event.message.usage.model_dump(exclude_none=True))
+                
+                elif event.type == "content_block_start" and event.content_block.type == "tool_use":
+                    # Content block indexes double as tool call indexes; they only need to be ordered
+                    yield LLMStreamChunk(
+                        tool_call_index=event.index,
+                        tool_call_id=event.content_block.id,
+                        tool_name=event.content_block.name
+                    )
+                
+                elif event.type == "content_block_delta":
+                    if event.delta.type == "text_delta":
+                        yield LLMStreamChunk(content=event.delta.text)
+                    elif event.delta.type == "input_json_delta":
+                        yield LLMStreamChunk(tool_call_index=event.index, arguments=event.delta.partial_json)
+                
+                elif event.type == "message_delta":
+                    if event.usage:
+                        usage.update(event.usage.model_dump(exclude_none=True))
+                    if event.delta.stop_reason:
+                        yield LLMStreamChunk(
+                            finish_reason=FINISH_REASONS.get(event.delta.stop_reason, event.delta.stop_reason),
+                            usage=usage or None,
+                            model=model
+                        )
+        except Exception as e:
+            raise RuntimeError(f"Anthropic API error: {str(e)}")
+    
     def is_configured(self) -> bool:
         """Check if Anthropic provider is configured."""
         return bool(self.api_key)
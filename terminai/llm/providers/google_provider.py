@@ -1,10 +1,35 @@
 """Google provider implementation."""
 
 import os
-import google.generativeai as genai
-from typing import Dict, Any, List
+import json
+import uuid
+from typing import Dict, Any, List, Optional, AsyncIterator
 
-from ..base import LLMProvider, LLMMessage, LLMResponse
+from ..base import LLMProvider, LLMMessage, LLMResponse, LLMStreamChunk
+
+# JSON-schema keys Gemini function declarations understand
+SCHEMA_KEYS = ("type", "format", "description", "nullable", "enum", "items", "properties", "required")
+
+
+def _clean_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Strip a JSON schema down to the subset Gemini accepts."""
+    cleaned = {key: value for key, value in schema.items() if key in SCHEMA_KEYS}
+    if "items" in cleaned:
+        cleaned["items"] = _clean_schema(cleaned["items"])
+    if "properties" in cleaned:
+        cleaned["properties"] = {name: _clean_schema(prop) for name, prop in cleaned["properties"].items()}
+    return cleaned
+
+
+def _plain(value: Any) -> Any:
+    """Convert function call arguments from protobuf values (where every number is a float)."""
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
 
 
 class GoogleProvider(LLMProvider):
@@ -15,41 +40,182 @@ class GoogleProvider(LLMProvider):
         super().__init__(config)
         self.api_key = config.get("api_key") or os.getenv("GOOGLE_API_KEY")
         self.model_instance = None
+        self._system_prompt: Optional[str] = None
+    
+    def _get_model_instance(self, system_prompt: Optional[str] = None):
+        """Create the model on first use so the SDK is only imported when needed.
+        
+        The system prompt is part of the model in the Gemini SDK, so the
+        instance is rebuilt only when the system prompt changes.
+        """
+        if not self.is_configured():
+            return None
         
-        if self.is_configured():
+        if self.model_instance is None or system_prompt != self._system_prompt:
+            import google.generativeai as genai
+            
             genai.configure(api_key=self.api_key)
-            self.model_instance = genai.GenerativeModel(self.model)
+            self.model_instance = genai.GenerativeModel(self.model, system_instruction=system_prompt or None)
+            self._system_prompt = system_prompt
+        return self.model_instance
     
-    async def generate(self, messages: List[LLMMessage]) -> LLMResponse:
-        """Generate response using Google API."""
-        if not self.model_instance:
-            raise RuntimeError("Google client not initialized. Please check your API key.")
+    def _convert_messages(self, messages: List[LLMMessage]) -> List[Dict[str, Any]]:
+        """Convert messages to Gemini contents.
+        
+        Assistant tool calls become ``function_call`` parts and tool results
+        become ``function_response`` parts, matched to the call's name by its
+        id. Consecutive turns of the same role are merged.
+        """
+        contents: List[Dict[str, Any]] = []
+        call_names: Dict[str, str] = {}
+        for msg in messages:
+            if msg.role == "system":
+                continue
             
-        try:
-            # Convert messages to Google format
-            conversation = []
-            system_prompt = None
+            if msg.role == "tool":
+                role = "user"
+                parts = [{"function_response": {
+                    "name": call_names.get(msg.tool_call_id, msg.tool_call_id or ""),
+                    "response": {"result": msg.content}
+                }}]
+            else:
+                role = "model" if msg.role == "assistant" else "user"
+                parts = [{"text": msg.content}] if msg.content else []
+                for call in msg.tool_calls or []:
+                    call_names[call["id"]] = call["function"]["name"]
+                    try:
+                        arguments = json.loads(call["function"]["arguments"] or "{}")
+                    except json.JSONDecodeError:
+                        arguments = {}
+                    parts.append({"function_call": {"name": call["function"]["name"], "args": arguments}})
             
-            for msg in messages:
-                if msg.role == "system":
-                    system_prompt = msg.content
-                else:
-                    conversation.append(f"{msg.role}: {msg.content}")
+            if contents and contents[-1]["role"] == role:
+                contents[-1]["parts"].extend(parts)
+            else:
+                contents.append({"role": role, "parts": parts})
+        return contents
+    
+    def _convert_tools(self, tools: Optional[List[Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+        """Convert OpenAI-style function definitions to Gemini function declarations."""
+        if not tools:
+            return None
+        
+        declarations = []
+        for tool in tools:
+            declaration = {
+                "name": tool["function"]["name"],
+                "description": tool["function"].get("description", "")
+            }
+            parameters = tool["function"].get("parameters")
+            if parameters and parameters.get("properties"):
+                declaration["parameters"] = _clean_schema(parameters)
+            declarations.append(declaration)
+        return [{"function_declarations": declarations}]
+    
+    def _request(self, messages: List[LLMMessage], tools: Optional[List[Dict[str, Any]]]):
+        """Get the model and the arguments for a request."""
+        system_prompt = "\n\n".join(msg.content for msg in messages if msg.role == "system")
+        model_instance = self._get_model_instance(system_prompt)
+        if not model_instance:
+            raise RuntimeError("Google client not initialized. Please check your API key.")
+        
+        api_kwargs = {
+            "contents": self._convert_messages(messages),
+            "generation_config": {
+                "max_output_tokens": self.max_tokens,
+                "temperature": self.temperature,
+            }
+        }
+        converted_tools = self._convert_tools(tools)
+        if converted_tools:
+            api_kwargs["tools"] = converted_tools
+        return model_instance, api_kwargs
+    
+    @staticmethod
+    def _tool_call(part) -> Dict[str, Any]:
+        """Convert a ``function_call`` part to the shared tool call format."""
+        call = type(part.function_call).to_dict(part.function_call)
+        return {
+            # Gemini does not identify calls, so results are matched by generated ids
+            "id": call.get("id") or f"call_{uuid.uuid4().hex[:12]}",
+            "type": "function",
+            "function": {
+                "name": call["name"],
+                "arguments": json.dumps(_plain(call.get("args") or {}))
+            }
+        }
+    
+    @staticmethod
+    def _usage(response) -> Optional[Dict[str, Any]]:
+        """Get token usage in the shared format."""
+        metadata = getattr(response, "usage_metadata", None)
+        if not metadata or not metadata.total_token_count:
+            return None
+        return {
+            "prompt_tokens": metadata.prompt_token_count,
+            "completion_tokens": metadata.candidates_token_count,
+            "total_tokens": metadata.total_token_count
+        }
+    
+    @staticmethod
+    def _parts(response) -> list:
+        """Get the parts of the first candidate, if any."""
+        if not response.candidates or not response.candidates[0].content:
+            return []
+        return list(response.candidates[0].content.parts)
+    
+    async def generate(self, messages: List[LLMMessage], tools: Optional[List[Dict[str, Any]]] = None) -> LLMResponse:
+        """Generate response using Google API."""
+        model_instance, api_kwargs = self._request(messages, tools)
+        
+        try:
+            response = await model_instance.generate_content_async(**api_kwargs)
             
-            prompt = "\n".join(conversation)
-            if system_prompt:
-                prompt = f"{system_prompt}\n\n{prompt}"
+            text = []
+            tool_calls = []
+            for part in self._parts(response):
+                if "function_call" in part:
+                    tool_calls.append(self._tool_call(part))
+                elif part.text:
+                    text.append(part.text)
             
-            response = await self.model_instance.generate_content_async(
-                prompt,
-                generation_config={
-                    "max_output_tokens": self.max_tokens,
-                    "temperature": self.temperature,
-                }
+            return LLMResponse(
+                content="".join(text).strip(),
+                tool_calls=tool_calls or None,
+                usage=self._usage(response),
+                model=self.model
             )
+        except Exception as e:
+            raise RuntimeError(f"Google API error: {str(e)}")
+    
+    async def stream(self, messages: List[LLMMessage], tools: Optional[List[Dict[str, Any]]] = None) -> AsyncIterator[LLMStreamChunk]:
+        """Stream response deltas from Google API."""
+        model_instance, api_kwargs = self._request(messages, tools)
+        
+        try:
+            response = await model_instance.generate_content_async(stream=True, **api_kwargs)
             
-            return LLMResponse(
-                content=response.text.strip(),
+            tool_index = 0
+            usage = None
+            async for chunk in response:
+                for part in self._parts(chunk):
+                    if "function_call" in part:
+                        # Gemini sends each call whole rather than in fragments
+                        call = self._tool_call(part)
+                        yield LLMStreamChunk(
+                            tool_call_index=tool_index,
+                            tool_call_id=call["id"],
+                            tool_name=call["function"]["name"],
+                            arguments=call["function"]["arguments"]
+                        )
+                        tool_index += 1
+                    elif part.text:
+                        yield LLMStreamChunk(content=part.text)
+                usage = self._usage(chunk) or usage
+            
+            yield LLMStreamChunk(
+                finish_reason="tool_calls" if tool_index else "stop",
+                usage=usage,
                 model=self.model
             )
         except Exception as e:
@@ -2,56 +2,74 @@
 
 import os
 import json
-from typing import Dict, Any, List, Optional
-from openai import AsyncOpenAI
+from typing import Dict, Any, List, Optional, AsyncIterator
 
-from ..base import LLMProvider, LLMMessage, LLMResponse
+from ..base import LLMProvider, LLMMessage, LLMResponse, LLMStreamChunk
 
 
 class OpenRouterProvider(LLMProvider):
     """OpenRouter LLM provider using OpenAI-compatible API."""
     
+    DEFAULT_BASE_URL = "https://openrouter.ai/api/v1"
+    
     def __init__(self, config: Dict[str, Any]):
         """Initialize OpenRouter provider."""
         super().__init__(config)
         self.api_key = config.get("api_key") or os.getenv("OPENROUTER_API_KEY")
         self.base_url = config.get("base_url", "https://openrouter.ai/api/v1")
         self.client = None
-        
-        if self.is_configured():
+    
+    def _get_client(self):
+        """Create the API client on first use so the SDK is only imported when needed."""
+        if self.client is None and self.is_configured():
+            from openai import AsyncOpenAI
+            
             client_kwargs = {"api_key": self.api_key}
             if self.base_url:
                 client_kwargs["base_url"] = self.base_url
                 
+            if self.transport_manager is not None:
+                # Share pooled, keep-alive connections with everything else talking to this host
+                client_kwargs["http_client"] = self.transport_manager.client_for(self.get_base_url())
+            
             self.client = AsyncOpenAI(**client_kwargs)
+        return self.client
+    
+    def _build_api_kwargs(self, messages: List[LLMMessage], tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Build chat completion arguments in OpenAI format."""
+        # Convert messages to OpenAI format
+        openai_messages = []
+        for msg in messages:
+            openai_msg = {"role": msg.role, "content": msg.content}
+            if msg.tool_call_id:
+                openai_msg["tool_call_id"] = msg.tool_call_id
+            if msg.tool_calls:
+                openai_msg["tool_calls"] = msg.tool_calls
+            openai_messages.append(openai_msg)
+        
+        # Prepare API call
+        api_kwargs = {
+            "model": self.model,
+            "messages": openai_messages,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature
+        }
+        
+        if tools:
+            api_kwargs["tools"] = tools
+            api_kwargs["tool_choice"] = "auto"
+        
+        return api_kwargs
     
     async def generate(self, messages: List[LLMMessage], tools: Optional[List[Dict[str, Any]]] = None) -> LLMResponse:
         """Generate response using OpenRouter API."""
-        if not self.client:
+        client = self._get_client()
+        if not client:
             raise RuntimeError("OpenRouter client not initialized. Please check your API key.")
             
         try:
-            # Convert messages to OpenAI format
-            openai_messages = []
-            for msg in messages:
-                openai_msg = {"role": msg.role, "content": msg.content}
-                if msg.tool_call_id:
-                    openai_msg["tool_call_id"] = msg.tool_call_id
-                openai_messages.append(openai_msg)
-            
-            # Prepare API call
-            api_kwargs = {
-                "model": self.model,
-                "messages": openai_messages,
-                "max_tokens": self.max_tokens,
-                "temperature": self.temperature
-            }
-            
-            if tools:
-                api_kwargs["tools"] = tools
-                api_kwargs["tool_choice"] = "auto"
-            
-            response = await self.client.chat.completions.create(**api_kwargs)
+            api_kwargs = self._build_api_kwargs(messages, tools)
+            response = await client.chat.completions.create(**api_kwargs)
             
             # Extract tool calls if present
             tool_calls = None
@@ -77,6 +95,45 @@ class OpenRouterProvider(LLMProvider):
         except Exception as e:
             raise RuntimeError(f"OpenRouter API error: {str(e)}")
     
+    async def stream(self, messages: List[LLMMessage], tools: Optional[List[Dict[str, Any]]] = None) -> AsyncIterator[LLMStreamChunk]:
+        """Stream response deltas from OpenRouter API."""
+        client = self._get_client()
+        if not client:
+            raise RuntimeError("OpenRouter client not initialized. Please check your API key.")
+        
+        try:
+            api_kwargs = self._build_api_kwargs(messages, tools)
+            api_kwargs["stream"] = True
+            
+            response = await client.chat.completions.create(**api_kwargs)
+            async for chunk in response:
+                if not chunk.choices:
+                    continue
+                
+                choice = chunk.choices[0]
+                delta = choice.delta
+                
+                if delta.content:
+                    yield LLMStreamChunk(content=delta.content)
+                
+                # Tool calls arrive as fragments keyed by index
+                for call in delta.tool_calls or []:
+                    yield LLMStreamChunk(
+                        tool_call_index=call.index,
+                        tool_call_id=call.id,
+                        tool_name=call.function.name if call.function else None,
+                        arguments=call.function.arguments if call.function else None
+                    )
+                
+                if choice.finish_reason:
+                    yield LLMStreamChunk(
+                        finish_reason=choice.finish_reason,
+                        usage=chunk.usage.dict() if chunk.usage else None,
+                        model=chunk.model
+                    )
+        except Exception as e:
+            raise RuntimeError(f"OpenRouter API error: {str(e)}")
+    
     def is_configured(self) -> bool:
         """Check if OpenRouter provider is configured."""
         return bool(self.api_key)
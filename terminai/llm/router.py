@@ -0,0 +1,275 @@
+"""Routing provider: failover and hedged requests across several LLM providers."""
+
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, Any, List, Optional, AsyncIterator, Awaitable, Callable, Deque, Tuple
+
+from .base import LLMProvider, LLMMessage, LLMResponse, LLMStreamChunk
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderHealth:
+    """Latency and error tracking for one provider.
+
+    Latency and error rate are exponentially weighted moving averages, so
+    recent requests count most. A window of recent latencies gives the p95
+    used to decide when to hedge. Latencies are kept separately per kind:
+    full responses for ``generate`` and time to first chunk for ``stream``.
+    """
+
+    def __init__(self, alpha: float = 0.3, window: int = 50):
+        """Initialize empty statistics."""
+        self.alpha = alpha
+        self.error_rate = 0.0
+        self.successes = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.cooldown_until = 0.0
+        self._window = window
+        self._latency: Dict[str, float] = {}
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def observe_latency(self, seconds: float, kind: str = "generate"):
+        """Add a latency sample without counting a success (e.g. a slow hedged loser)."""
+        previous = self._latency.get(kind)
+        self._latency[kind] = seconds if previous is None else self.alpha * seconds + (1 - self.alpha) * previous
+        self._samples.setdefault(kind, deque(maxlen=self._window)).append(seconds)
+
+    def record_success(self, seconds: float, kind: str = "generate"):
+        """Record a successful request and how long it took."""
+        self.successes += 1
+        self.error_rate *= 1 - self.alpha
+        self.observe_latency(seconds, kind)
+
+    def record_failure(self, error: BaseException, cooldown: float = 0.0, max_error_rate: float = 0.5):
+        """Record a failed request; a provider failing too often is benched for ``cooldown`` seconds."""
+        self.failures += 1
+        self.error_rate = self.alpha + (1 - self.alpha) * self.error_rate
+        self.last_error = str(error) or type(error).__name__
+        if cooldown and self.error_rate >= max_error_rate:
+            self.cooldown_until = time.monotonic() + cooldown
+
+    def latency(self, kind: str = "generate") -> Optional[float]:
+        """Get the average latency in seconds, if any requests have been seen."""
+        return self._latency.get(kind)
+
+    def p95(self, kind: str = "generate", min_samples: int = 5) -> Optional[float]:
+        """Get the 95th percentile latency, once there are enough samples."""
+        samples = self._samples.get(kind)
+        if not samples or len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+    def is_available(self) -> bool:
+        """Check whether the provider is out of its cooldown."""
+        return time.monotonic() >= self.cooldown_until
+
+
+class RoutingProvider(LLMProvider):
+    """Sends requests to the first healthy provider in an ordered list.
+
+    A provider that fails is skipped in favor of the next one. With hedging
+    on, a request the current provider has not answered within its p95
+    latency is also sent to the next provider, and whichever answers first
+    wins; the other attempt is cancelled. Streams are hedged and failed over
+    on their first chunk only, since chunks already shown cannot be retracted.
+    """
+
+    def __init__(
+        self,
+        providers: List[Tuple[str, LLMProvider]],
+        hedge: bool = True,
+        hedge_min_samples: int = 5,
+        cooldown: float = 30.0,
+        max_error_rate: float = 0.5
+    ):
+        """Initialize the router; the first provider is the primary."""
+        if not providers:
+            raise ValueError("RoutingProvider needs at least one provider")
+        super().__init__(providers[0][1].config)
+        self.providers = providers
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.cooldown = cooldown
+        self.max_error_rate = max_error_rate
+        self.health: Dict[str, ProviderHealth] = {name: ProviderHealth() for name, _ in providers}
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+        self.last_provider: Optional[str] = None
+
+    def provider(self, name: str) -> LLMProvider:
+        """Get a routed provider by name."""
+        return dict(self.providers)[name]
+
+    def ranked(self) -> List[Tuple[str, LLMProvider]]:
+        """Get configured providers in fallback order, benched ones last."""
+        configured = [(name, provider) for name, provider in self.providers if provider.is_configured()]
+        return sorted(configured, key=lambda item: not self.health[item[0]].is_available())
+
+    def hedge_delay(self, name: str, kind: str) -> Optional[float]:
+        """Get how long to wait on a provider before hedging, or None to not hedge."""
+        if not self.hedge:
+            return None
+        return self.health[name].p95(kind, self.hedge_min_samples)
+
+    async def _attempt(self, name: str, call: Callable[[LLMProvider], Awaitable[Any]], kind: str) -> Any:
+        """Run one request against one provider, recording its health."""
+        provider = dict(self.providers)[name]
+        health = self.health[name]
+        start = time.monotonic()
+        try:
+            result = await call(provider)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            health.record_failure(e, self.cooldown, self.max_error_rate)
+            logger.warning(f"Provider '{name}' failed: {health.last_error}")
+            raise
+        health.record_success(time.monotonic() - start, kind)
+        return result
+
+    async def _route(
+        self,
+        call: Callable[[LLMProvider], Awaitable[Any]],
+        kind: str,
+        discard: Optional[Callable[[Any], Awaitable[None]]] = None
+    ) -> Tuple[str, Any]:
+        """Run ``call`` with failover and hedging; returns the winning provider's name and result.
+
+        ``discard`` releases a result that completed but lost the race.
+        """
+        queue = [name for name, _ in self.ranked()]
+        if not queue:
+            raise RuntimeError("No configured LLM provider is available")
+
+        first = queue[0]
+        pending: Dict[asyncio.Future, Tuple[str, float]] = {}
+        errors: List[str] = []
+        hedged = False
+        winner: Optional[str] = None
+
+        def launch():
+            name = queue.pop(0)
+            pending[asyncio.ensure_future(self._attempt(name, call, kind))] = (name, time.monotonic())
+
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if not hedged and queue and len(pending) == 1:
+                    [(name, started)] = pending.values()
+                    delay = self.hedge_delay(name, kind)
+                    if delay is not None:
+                        timeout = max(0.0, started + delay - time.monotonic())
+
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # The current attempt is slower than usual; race the next provider against it
+                    hedged = True
+                    self.hedges += 1
+                    logger.info(f"Hedging request to '{queue[0]}' after {delay:.2f}s")
+                    launch()
+                    continue
+
+                # Earlier launches win ties
+                for task in sorted(done, key=lambda t: pending[t][1]):
+                    name, _ = pending.pop(task)
+                    if task.exception() is not None:
+                        errors.append(f"{name}: {self.health[name].last_error}")
+                    elif winner is None:
+                        winner, result = name, task.result()
+                    elif discard is not None:
+                        await discard(task.result())
+
+                if winner is not None:
+                    if hedged and winner != first:
+                        self.hedge_wins += 1
+                    return winner, result
+
+                if not pending and queue:
+                    self.failovers += 1
+                    launch()
+
+            raise RuntimeError("All LLM providers failed: " + "; ".join(errors))
+        finally:
+            for task, (name, started) in pending.items():
+                task.cancel()
+                if winner is not None:
+                    # The loser took at least this long; keep it in the latency picture
+                    self.health[name].observe_latency(time.monotonic() - started, kind)
+            if pending:
+                results = await asyncio.gather(*pending, return_exceptions=True)
+                if discard is not None:
+                    for leftover in results:
+                        if not isinstance(leftover, BaseException):
+                            await discard(leftover)
+
+    async def generate(self, messages: List[LLMMessage], tools: Optional[List[Dict[str, Any]]] = None) -> LLMResponse:
+        """Generate a response from the first provider to answer."""
+        self.last_provider, response = await self._route(lambda provider: provider.generate(messages, tools=tools), "generate")
+        return response
+
+    async def stream(self, messages: List[LLMMessage], tools: Optional[List[Dict[str, Any]]] = None) -> AsyncIterator[LLMStreamChunk]:
+        """Stream a response from the first provider to produce a chunk."""
+        async def open_stream(provider: LLMProvider):
+            chunks = provider.stream(messages, tools=tools)
+            try:
+                first = await chunks.__anext__()
+            except BaseException:
+                await chunks.aclose()
+                raise
+            return chunks, first
+
+        async def close_stream(opened):
+            await opened[0].aclose()
+
+        name, (chunks, first) = await self._route(open_stream, "stream", discard=close_stream)
+        self.last_provider = name
+        try:
+            yield first
+            async for chunk in chunks:
+                yield chunk
+        except Exception as e:
+            self.health[name].record_failure(e, self.cooldown, self.max_error_rate)
+            raise
+        finally:
+            await chunks.aclose()
+
+    def is_configured(self) -> bool:
+        """Check if any routed provider is configured."""
+        return any(provider.is_configured() for _, provider in self.providers)
+
+    def get_required_config(self) -> List[str]:
+        """Get the primary provider's required configuration."""
+        return self.providers[0][1].get_required_config()
+
+    def format_prompt(self, prompt: str) -> List[LLMMessage]:
+        """Format a prompt the way the primary provider does."""
+        return self.providers[0][1].format_prompt(prompt)
+
+    def get_base_url(self) -> Optional[str]:
+        """Get the primary provider's endpoint."""
+        return self.providers[0][1].get_base_url()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Get each provider's health, in fallback order."""
+        rows = []
+        for name, provider in self.providers:
+            health = self.health[name]
+            rows.append({
+                "name": name,
+                "configured": provider.is_configured(),
+                "available": health.is_available(),
+                "successes": health.successes,
+                "failures": health.failures,
+                "error_rate": health.error_rate,
+                "latency": health.latency("stream") or health.latency("generate"),
+                "p95": health.p95("stream", self.hedge_min_samples) or health.p95("generate", self.hedge_min_samples),
+                "last_error": health.last_error,
+            })
+        return rows
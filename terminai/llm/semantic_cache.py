@@ -0,0 +1,278 @@
+"""Semantic cache: finds earlier prompts that ask for the same thing in other words."""
+
+import os
+import re
+import json
+import time
+import zlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Union
+from pydantic import BaseModel
+
+try:
+    import numpy as np
+except ImportError:  # optional: pip install terminai[semantic]
+    np = None
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Filler that says nothing about what is being asked for
+STOP_WORDS = frozenset({
+    "a", "an", "the", "please", "can", "could", "would", "will", "you", "me", "my", "i", "we",
+    "us", "our", "is", "are", "be", "to", "of", "for", "in", "on", "at", "it", "this", "that",
+    "do", "does", "some", "just", "kindly", "tell", "give", "how", "much", "many", "what",
+    "show", "display", "see", "check", "get",
+})
+
+_SUFFIXES = ("ing", "age", "ed", "s")
+
+_QUOTED = re.compile(r"\"[^\"]+\"|(?<!\w)'[^']+'(?!\w)|`[^`]+`")
+_PATH_CHARS = frozenset("/\\.~*")
+
+
+def numpy_available() -> bool:
+    """Check whether NumPy, needed for the semantic cache, is installed."""
+    return np is not None
+
+
+def _stem(word: str) -> str:
+    """Strip a common suffix so 'used', 'usage' and 'using' share a feature."""
+    for suffix in _SUFFIXES:
+        if len(word) - len(suffix) >= 2 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def literals(text: str) -> List[str]:
+    """Get the parts of a prompt that name a specific target: quoted text, paths and numbers.
+
+    These are kept verbatim; two prompts only count as the same request if
+    their literals are identical, so "delete a.txt" never matches "delete b.txt".
+    """
+    found = {quoted[1:-1] for quoted in _QUOTED.findall(text)}
+    for word in _QUOTED.sub(" ", text).split():
+        word = word.lstrip("([{").rstrip(".,;:!?)]}")
+        if any(c.isdigit() for c in word) or any(c in _PATH_CHARS for c in word):
+            found.add(word)
+    return sorted(found)
+
+
+class HashingVectorizer:
+    """Embeds text as a signed, hashed bag of words, word pairs and character trigrams.
+
+    Needs no model or vocabulary: features are hashed into ``dim`` buckets
+    with CRC32, so vectors are stable across runs and machines.
+    """
+
+    def __init__(self, dim: int = 512):
+        """Initialize the vectorizer."""
+        self.dim = dim
+
+    def features(self, text: str) -> Dict[str, float]:
+        """Get the weighted features of some text."""
+        words = [_stem(word) for word in _TOKEN.findall(text.lower()) if word not in STOP_WORDS]
+        features: Dict[str, float] = {}
+        for word in words:
+            features["w:" + word] = features.get("w:" + word, 0.0) + 1.0
+            padded = f" {word} "
+            for i in range(len(padded) - 2):
+                key = "c:" + padded[i:i + 3]
+                features[key] = features.get(key, 0.0) + 0.25
+        for first, second in zip(words, words[1:]):
+            key = f"b:{first} {second}"
+            features[key] = features.get(key, 0.0) + 0.5
+        return features
+
+    def embed(self, text: str) -> "np.ndarray":
+        """Embed text as a unit-length float32 vector (all zeros for empty text)."""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, weight in self.features(text).items():
+            h = zlib.crc32(feature.encode())
+            vector[h % self.dim] += weight if h & 0x80000000 else -weight
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+
+class SemanticMatch(BaseModel):
+    """A previous prompt similar to the current one and what was suggested for it."""
+    prompt: str
+    similarity: float
+    tool_calls: List[Dict[str, Any]] = []
+    created_at: float = 0.0
+
+
+class VectorStore:
+    """Append-only store of unit vectors in a memory-mapped file, with a JSONL sidecar.
+
+    Rows of ``vectors.f32`` and lines of ``entries.jsonl`` correspond one to
+    one. Appends go to the end of both files; the map is reopened lazily when
+    the file has grown, so searches never reload earlier rows.
+    """
+
+    def __init__(self, directory: Union[str, Path], dim: int):
+        """Open (or create) the store in ``directory``."""
+        self.directory = Path(directory)
+        self.dim = dim
+        self.vectors_path = self.directory / "vectors.f32"
+        self.entries_path = self.directory / "entries.jsonl"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._entries: List[Dict[str, Any]] = self._load_entries()
+        self._map: Optional["np.memmap"] = None
+        self._repair()
+
+    def _load_entries(self) -> List[Dict[str, Any]]:
+        """Read the sidecar, stopping at the first unreadable line."""
+        entries = []
+        try:
+            with open(self.entries_path, "r") as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        break
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _repair(self):
+        """Trim both files to the rows they have in common (after an interrupted append)."""
+        row_bytes = self.dim * 4
+        size = self.vectors_path.stat().st_size if self.vectors_path.exists() else 0
+        count = min(size // row_bytes, len(self._entries))
+        if size != count * row_bytes:
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(count * row_bytes)
+        if len(self._entries) != count:
+            self._entries = self._entries[:count]
+            self._rewrite_entries(self._entries)
+
+    def _rewrite_entries(self, entries: List[Dict[str, Any]]):
+        """Atomically replace the sidecar."""
+        tmp_path = self.entries_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+        os.replace(tmp_path, self.entries_path)
+
+    def __len__(self) -> int:
+        """Number of stored entries."""
+        return len(self._entries)
+
+    def vectors(self) -> "np.ndarray":
+        """Get the stored vectors as a read-only memory map."""
+        count = len(self._entries)
+        if count == 0:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        if self._map is None or self._map.shape[0] != count:
+            self._map = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(count, self.dim))
+        return self._map
+
+    def entry(self, row: int) -> Dict[str, Any]:
+        """Get the metadata stored with a row."""
+        return self._entries[row]
+
+    def append(self, vector: "np.ndarray", entry: Dict[str, Any]):
+        """Append one vector and its metadata."""
+        with open(self.vectors_path, "ab") as f:
+            f.write(np.asarray(vector, dtype=np.float32).tobytes())
+        with open(self.entries_path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+        self._entries.append(entry)
+
+    def keep_last(self, count: int):
+        """Drop all but the newest ``count`` entries."""
+        drop = len(self._entries) - count
+        if drop <= 0:
+            return
+        kept = np.array(self.vectors()[drop:])
+        self._map = None
+        tmp_path = self.vectors_path.with_suffix(".tmp")
+        kept.tofile(str(tmp_path))
+        os.replace(tmp_path, self.vectors_path)
+        self._entries = self._entries[drop:]
+        self._rewrite_entries(self._entries)
+
+
+class SemanticCache:
+    """Remembers which tool calls were suggested for a prompt and finds them for similar prompts.
+
+    Prompts are embedded with a HashingVectorizer and compared by cosine
+    similarity (a dot product of unit vectors) against every stored prompt.
+    A match must also have exactly the same literals (paths, numbers, quoted
+    text), since reusing tool calls against the wrong target is worse than a miss.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        threshold: float = 0.8,
+        max_entries: int = 5000,
+        dim: int = 512
+    ):
+        """Open the cache stored in ``directory``; requires NumPy."""
+        if np is None:
+            raise RuntimeError("The semantic cache needs NumPy (pip install terminai[semantic])")
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.vectorizer = HashingVectorizer(dim)
+        self.store = VectorStore(directory, dim)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, prompt: str) -> Optional[SemanticMatch]:
+        """Find the most similar stored prompt at or above the threshold."""
+        vector = self.vectorizer.embed(prompt)
+        with self._lock:
+            vectors = self.store.vectors()
+            if not len(vectors) or not vector.any():
+                self.misses += 1
+                return None
+
+            scores = vectors @ vector
+            wanted = literals(prompt)
+            # Best score first, newest entry first among ties
+            rows = np.flatnonzero(scores >= self.threshold)
+            entry = None
+            for row in sorted(rows, key=lambda row: (-scores[row], -row)):
+                candidate = self.store.entry(int(row))
+                if literals(candidate["prompt"]) == wanted:
+                    entry, similarity = candidate, float(scores[row])
+                    break
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+        return SemanticMatch(
+            prompt=entry["prompt"],
+            similarity=similarity,
+            tool_calls=entry.get("tool_calls", []),
+            created_at=entry.get("created_at", 0.0)
+        )
+
+    def add(self, prompt: str, tool_calls: List[Dict[str, Any]]):
+        """Remember the tool calls suggested for a prompt."""
+        vector = self.vectorizer.embed(prompt)
+        if not vector.any():
+            return
+        entry = {"prompt": prompt, "tool_calls": tool_calls, "created_at": time.time()}
+        with self._lock:
+            self.store.append(vector, entry)
+            # Compact in batches rather than on every append
+            if len(self.store) > self.max_entries * 1.25:
+                self.store.keep_last(self.max_entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get entry count and this session's counters."""
+        return {
+            "entries": len(self.store),
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "path": str(self.store.directory),
+        }
@@ -14,10 +14,11 @@ logger = logging.getLogger(__name__)
 class MCPClient:
     """Client for interacting with MCP servers."""
     
-    def __init__(self):
-        """Initialize MCP client."""
+    def __init__(self, transport_manager=None):
+        """Initialize MCP client, optionally sharing pooled HTTP clients for HTTP servers."""
         self.connections: Dict[str, BaseConnection] = {}
         self.server_configs: List[Dict[str, Any]] = []
+        self.transport_manager = transport_manager
     
     def _create_connection(self, name: str, config: Dict[str, Any]) -> BaseConnection:
         """Create appropriate connection based on configuration."""
@@ -26,7 +27,7 @@ class MCPClient:
         if connection_type == "stdio":
             return StdioConnection(name, config)
         elif connection_type == "http":
-            return HttpConnection(name, config)
+            return HttpConnection(name, config, transport_manager=self.transport_manager)
         elif connection_type == "sse":
             return SSEConnection(name, config)
         else:
@@ -49,7 +50,7 @@ class MCPClient:
     async def list_tools(self, server_name: str) -> List[Dict[str, Any]]:
         """List available tools from an MCP server."""
         if server_name not in self.connections:
-            return []
+            raise ValueError(f"Server {server_name} not connected")
         
         connection = self.connections[server_name]
         return await connection.list_tools()
@@ -65,7 +66,7 @@ class MCPClient:
     async def list_resources(self, server_name: str) -> List[Dict[str, Any]]:
         """List available resources from an MCP server."""
         if server_name not in self.connections:
-            return []
+            raise ValueError(f"Server {server_name} not connected")
         
         connection = self.connections[server_name]
         return await connection.list_resources()
@@ -16,21 +16,22 @@ logger = logging.getLogger(__name__)
 class HttpConnection(BaseConnection):
     """Connection to MCP server via HTTP REST API."""
     
-    def __init__(self, name: str, config: Dict[str, Any]):
+    def __init__(self, name: str, config: Dict[str, Any], transport_manager=None):
         super().__init__(name, config)
         self.base_url = config.get("url", "").rstrip("/")
         self.headers = config.get("headers", {})
         self.timeout = config.get("timeout", 30)
+        self.transport_manager = transport_manager
         self.client = None
     
     async def connect(self) -> bool:
         """Connect to MCP server via HTTP."""
         try:
-            self.client = httpx.AsyncClient(
-                base_url=self.base_url,
-                headers=self.headers,
-                timeout=self.timeout
-            )
+            if self.transport_manager is not None:
+                # Shared pooled client: base URL, headers and timeout go on each request
+                self.client = self.transport_manager.client_for(self.base_url)
+            else:
+                self.client = httpx.AsyncClient(timeout=self.timeout)
             
             # Test connection by listing tools
             await self.list_tools()
@@ -51,7 +52,8 @@ class HttpConnection(BaseConnection):
     
     async def disconnect(self) -> None:
         """Disconnect from MCP server."""
-        if self.client:
+        # Shared clients belong to the transport manager
+        if self.client and self.transport_manager is None:
             try:
                 await self.client.aclose()
             except Exception as e:
@@ -63,15 +65,15 @@ class HttpConnection(BaseConnection):
     async def list_tools(self) -> List[Dict[str, Any]]:
         """List available tools."""
         if not self.client:
-            return []
+            raise MCPConnectionError(f"Server {self.name} not connected")
         
         try:
-            response = await self.client.get("/tools")
+            response = await self._request("GET", "/tools")
             response.raise_for_status()
             return response.json().get("tools", [])
         except Exception as e:
             logger.error(f"Failed to list tools from {self.name}: {e}")
-            return []
+            raise
     
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
         """Call a tool."""
@@ -79,7 +81,8 @@ class HttpConnection(BaseConnection):
             raise MCPConnectionError(f"Server {self.name} not connected")
         
         try:
-            response = await self.client.post(
+            response = await self._request(
+                "POST",
                 "/tools/call",
                 json={"tool": tool_name, "arguments": arguments}
             )
@@ -96,15 +99,15 @@ class HttpConnection(BaseConnection):
     async def list_resources(self) -> List[Dict[str, Any]]:
         """List available resources."""
         if not self.client:
-            return []
+            raise MCPConnectionError(f"Server {self.name} not connected")
         
         try:
-            response = await self.client.get("/resources")
+            response = await self._request("GET", "/resources")
             response.raise_for_status()
             return response.json().get("resources", [])
         except Exception as e:
             logger.error(f"Failed to list resources from {self.name}: {e}")
-            return []
+            raise
     
     async def read_resource(self, uri: str) -> str:
         """Read a resource."""
@@ -112,7 +115,8 @@ class HttpConnection(BaseConnection):
             raise MCPConnectionError(f"Server {self.name} not connected")
         
         try:
-            response = await self.client.get(
+            response = await self._request(
+                "GET",
                 "/resources/read",
                 params={"uri": uri}
             )
@@ -126,6 +130,16 @@ class HttpConnection(BaseConnection):
         except Exception as e:
             raise MCPConnectionError(f"Failed to read resource {uri}: {e}")
     
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Send a request to the server with its headers and timeout."""
+        return await self.client.request(
+            method,
+            self.base_url + path,
+            headers=self.headers,
+            timeout=self.timeout,
+            **kwargs
+        )
+    
     def is_connected(self) -> bool:
         """Check if connection is active."""
         return self.connected and self.client is not None
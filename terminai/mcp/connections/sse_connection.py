@@ -15,6 +15,13 @@ from ..exceptions import MCPConnectionError, MCPAuthenticationError
 logger = logging.getLogger(__name__)
 
 
+def _root_cause(error: BaseException) -> BaseException:
+    """Unwrap exception groups raised by the SDK's task groups."""
+    while getattr(error, "exceptions", None):
+        error = error.exceptions[0]
+    return error
+
+
 class SSEConnection(BaseConnection):
     """Connection to MCP server via Server-Sent Events using MCP SDK."""
     
@@ -25,31 +32,39 @@ class SSEConnection(BaseConnection):
         self.timeout = config.get("timeout", 30)
         self._session_context = None
         self._session_task = None
+        self._ready: Optional[asyncio.Future] = None
+        self._shutdown: Optional[asyncio.Event] = None
     
     async def connect(self) -> bool:
         """Connect to MCP server via SSE using MCP SDK."""
         try:
             logger.info(f"Connecting to MCP SSE server: {self.name} at {self.base_url}")
-            logger.info(f"Headers: {self.headers}")
+            logger.debug(f"Headers: {self.headers}")
             
-            # Start the session context manager in a background task
+            # Readiness is signalled by the session task as soon as initialize() returns or fails
+            self._ready = asyncio.get_running_loop().create_future()
+            self._shutdown = asyncio.Event()
             self._session_task = asyncio.create_task(self._run_session())
             
-            # Wait a bit for the connection to establish
-            await asyncio.sleep(2)
+            try:
+                await asyncio.wait_for(asyncio.shield(self._ready), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                raise MCPConnectionError(f"Timed out after {self.timeout}s waiting for session initialization")
             
-            if self.connected:
-                logger.info(f"Successfully connected to MCP SSE server: {self.name}")
-                return True
-            else:
-                raise MCPConnectionError("Connection failed to establish")
+            logger.info(f"Successfully connected to MCP SSE server: {self.name}")
+            return True
                 
         except Exception as e:
-            logger.error(f"Failed to connect to MCP SSE server {self.name}: {e}")
-            if "401" in str(e) or "Unauthorized" in str(e):
+            await self._stop_session()
+            error = _root_cause(e)
+            logger.error(f"Failed to connect to MCP SSE server {self.name}: {error}")
+            if "401" in str(error) or "Unauthorized" in str(error):
                 raise MCPAuthenticationError(f"Authentication failed for {self.name}")
             else:
-                raise MCPConnectionError(f"Connection failed for {self.name}: {e}")
+                raise MCPConnectionError(f"Connection failed for {self.name}: {error}")
+        except asyncio.CancelledError:
+            await self._stop_session()
+            raise
     
     async def _run_session(self):
         """Run the MCP session following the official SDK pattern."""
@@ -81,45 +96,61 @@ class SSEConnection(BaseConnection):
                     # Initialize the MCP session
                     await session.initialize()
                     
-                    # Store the session and mark as connected
+                    # Store the session, mark as connected and wake up connect()
                     self._session_context = session
                     self.connected = True
+                    if not self._ready.done():
+                        self._ready.set_result(True)
                     logger.info(f"MCP SSE connection established and initialized for {self.name}")
                     
-                    # Keep the session alive until cancelled
-                    try:
-                        while True:
-                            await asyncio.sleep(1)
-                    except asyncio.CancelledError:
-                        logger.info(f"Session task cancelled for {self.name}")
-                        raise
+                    # Keep the session alive until disconnect() asks it to stop
+                    await self._shutdown.wait()
                         
         except asyncio.CancelledError:
             logger.info(f"Session cancelled for {self.name}")
             raise
         except Exception as e:
-            logger.error(f"Session error for {self.name}: {e}")
-            logger.exception(f"Full traceback for {self.name}:")
-            raise
+            logger.error(f"Session error for {self.name}: {_root_cause(e)}")
+            logger.debug(f"Full traceback for {self.name}:", exc_info=True)
+            if self._ready and not self._ready.done():
+                # Hand the real error to connect() instead of leaving it waiting
+                self._ready.set_exception(e)
+            else:
+                raise
         finally:
             # Clean up
             self.connected = False
             self._session_context = None
+            if self._ready and not self._ready.done():
+                self._ready.set_exception(MCPConnectionError("Session ended before initialization"))
             logger.info(f"Session ended for {self.name}")
     
+    async def _stop_session(self) -> None:
+        """Stop the session task and wait for it to unwind."""
+        task, self._session_task = self._session_task, None
+        if self._shutdown:
+            self._shutdown.set()
+        if task:
+            if self.connected and not task.done():
+                # An established session exits its contexts cleanly once shutdown is set
+                try:
+                    await asyncio.wait_for(asyncio.shield(task), timeout=1.0)
+                except (asyncio.TimeoutError, Exception):
+                    pass
+            if not task.done():
+                task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        if self._ready and self._ready.done() and not self._ready.cancelled():
+            # Mark any stored exception as retrieved
+            self._ready.exception()
+        
+        self.connected = False
+        self._session_context = None
+    
     async def disconnect(self) -> None:
         """Disconnect from MCP server."""
         try:
-            if self._session_task:
-                self._session_task.cancel()
-                try:
-                    await self._session_task
-                except asyncio.CancelledError:
-                    pass
-                self._session_task = None
-            
-            self.connected = False
-            self._session_context = None
+            await self._stop_session()
             logger.info(f"Disconnected from MCP SSE server: {self.name}")
             
         except Exception as e:
@@ -128,8 +159,7 @@ class SSEConnection(BaseConnection):
     async def list_tools(self) -> List[Dict[str, Any]]:
         """List available tools using MCP protocol."""
         if not self._session_context:
-            logger.warning(f"No session available for {self.name}")
-            return []
+            raise MCPConnectionError(f"Server {self.name} not connected")
         
         try:
             result = await self._session_context.list_tools()
@@ -144,7 +174,7 @@ class SSEConnection(BaseConnection):
             return tools
         except Exception as e:
             logger.error(f"Failed to list tools from {self.name}: {e}")
-            return []
+            raise MCPConnectionError(f"Failed to list tools: {e}")
     
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
         """Call a tool using MCP protocol."""
@@ -164,7 +194,7 @@ class SSEConnection(BaseConnection):
     async def list_resources(self) -> List[Dict[str, Any]]:
         """List available resources using MCP protocol."""
         if not self._session_context:
-            return []
+            raise MCPConnectionError(f"Server {self.name} not connected")
         
         try:
             result = await self._session_context.list_resources()
@@ -180,7 +210,7 @@ class SSEConnection(BaseConnection):
             return resources
         except Exception as e:
             logger.error(f"Failed to list resources from {self.name}: {e}")
-            return []
+            raise MCPConnectionError(f"Failed to list resources: {e}")
     
     async def read_resource(self, uri: str) -> str:
         """Read a resource using MCP protocol."""
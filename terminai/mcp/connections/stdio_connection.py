@@ -75,14 +75,14 @@ class StdioConnection(BaseConnection):
     async def list_tools(self) -> List[Dict[str, Any]]:
         """List available tools."""
         if not self._session:
-            return []
+            raise MCPConnectionError(f"Server {self.name} not connected")
         
         try:
             tools = await self._session.list_tools()
             return [tool.dict() for tool in tools]
         except Exception as e:
             logger.error(f"Failed to list tools from {self.name}: {e}")
-            return []
+            raise
     
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
         """Call a tool."""
@@ -99,14 +99,14 @@ class StdioConnection(BaseConnection):
     async def list_resources(self) -> List[Dict[str, Any]]:
         """List available resources."""
         if not self._session:
-            return []
+            raise MCPConnectionError(f"Server {self.name} not connected")
         
         try:
             resources = await self._session.list_resources()
             return [resource.dict() for resource in resources]
         except Exception as e:
             logger.error(f"Failed to list resources from {self.name}: {e}")
-            return []
+            raise
     
     async def read_resource(self, uri: str) -> str:
         """Read a resource."""
@@ -2,11 +2,16 @@
 
 import os
 import sys
+import time
+import signal
 import asyncio
+import threading
 import readline
 import atexit
 import logging
 import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List, Dict, Any
 from rich.console import Console
 from rich.prompt import Confirm
@@ -14,15 +19,37 @@ from rich.panel import Panel
 from rich.syntax import Syntax
 from rich.table import Table
 from rich.json import JSON
+from rich.live import Live
+from rich.spinner import Spinner
 
 from .config.manager import ConfigManager
-from .llm.base import LLMManager, LLMMessage
+from .llm.base import LLMManager, LLMMessage, LLMResponse, StreamAccumulator
+from .llm.agent import AgentLoop
 from .mcp.client import MCPClient
 from .utils.bash import BashExecutor
-from .tools.manager import ToolManager
+from .utils.completion import CommandCompleter, COMPLETER_DELIMS
+from .utils.http import TransportManager
+from .tools.manager import ToolManager, ToolResult
+from .tools.selector import ToolSelector
+from .tools.blobs import BlobStore
 from .tools.builtin import BuiltinTools
 from .tools.mcp_tools import MCPToolWrapper
 
+# ! commands and their subcommands, for tab completion
+SPECIAL_COMMANDS = {
+    "help": [],
+    "exit": [],
+    "quit": [],
+    "providers": [],
+    "config": [],
+    "mcp": ["list", "tools"],
+    "tools": ["list", "info", "refresh", "select"],
+    "index": ["build", "info", "drop", "list"],
+    "cache": ["stats", "clear"],
+    "diag": [],
+    "context": ["stats", "clear"],
+}
+
 
 class TerminaiTerminal:
     """Main terminal interface."""
@@ -31,14 +58,53 @@ class TerminaiTerminal:
         """Initialize the terminal."""
         self.console = Console()
         self.config = ConfigManager()
-        self.llm_manager = LLMManager()
-        self.mcp_client = MCPClient()
+        self.transport_manager = TransportManager(
+            http2=self.config.get("http.http2", True),
+            max_connections=self.config.get("http.max_connections", 20),
+            max_keepalive_connections=self.config.get("http.max_keepalive_connections", 10),
+            keepalive_expiry=self.config.get("http.keepalive_expiry", 60),
+            dns_ttl=self.config.get("http.dns_ttl", 300)
+        )
+        self.llm_manager = LLMManager(transport_manager=self.transport_manager)
+        self.mcp_client = MCPClient(transport_manager=self.transport_manager)
         self.bash_executor = BashExecutor(
-            shell=self.config.get("bash.shell", "/bin/bash")
+            shell=self.config.get("bash.shell", "/bin/bash"),
+            max_output_bytes=self.config.get("bash.max_output_bytes", 64 * 1024),
+            persistent_session=self.config.get("bash.persistent_session", False)
+        )
+        self.blob_store = None
+        if self.config.get("tools.blobs.enabled", True):
+            self.blob_store = BlobStore(
+                self.config.config_dir / "blobs",
+                spill_bytes=self.config.get("tools.blobs.spill_bytes", 16 * 1024),
+                max_bytes=self.config.get("tools.blobs.max_bytes", 100 * 1024 * 1024)
+            )
+        self.tool_manager = ToolManager(blob_store=self.blob_store)
+        self.tool_selector = None
+        if self.config.get("tools.selection.enabled", True):
+            self.tool_selector = ToolSelector(
+                top_k=self.config.get("tools.selection.top_k", 8),
+                pinned=self.config.get("tools.selection.pinned", None),
+                serialize=self.tool_manager.get_tool_definition_json
+            )
+        self.builtin_tools = BuiltinTools(
+            self.bash_executor,
+            index_dir=self.config.config_dir / "index",
+            blob_store=self.blob_store,
+            index_refresh=self.config.get("tools.index.refresh", 10.0)
         )
-        self.tool_manager = ToolManager()
-        self.builtin_tools = BuiltinTools(self.bash_executor)
-        self.mcp_tool_wrapper = MCPToolWrapper(self.mcp_client)
+        self.mcp_tool_wrapper = MCPToolWrapper(
+            self.mcp_client,
+            cache_dir=self.config.config_dir / "mcp_cache" if self.config.get("mcp.cache_tools", True) else None
+        )
+        self._mcp_connect_tasks: Dict[str, asyncio.Task] = {}
+        self._prewarm_urls: List[str] = []
+        self._prewarm_task: Optional[asyncio.Task] = None
+        
+        # The prompt is read on a worker thread so background tasks keep running
+        self._input_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="terminai-input")
+        self._foreground_task: Optional[asyncio.Future] = None
+        self._interrupted = False
         
         # Setup logging
         log_level = logging.INFO
@@ -62,6 +128,10 @@ class TerminaiTerminal:
         
         # Current LLM provider
         self.current_provider = None
+        self.router = None
+        self.context = None
+        self.response_cache = None
+        self._semantic_cache = None
         self.setup_llm_provider()
     
     def setup_history(self):
@@ -72,11 +142,17 @@ class TerminaiTerminal:
         except FileNotFoundError:
             pass
         
-        # Set up history search
+        # Set up tab completion and history search
+        self.completer = CommandCompleter(self.bash_executor.executable_index, SPECIAL_COMMANDS)
+        readline.set_completer(self.completer.readline_completer)
+        readline.set_completer_delims(COMPLETER_DELIMS)
         readline.parse_and_bind('tab: complete')
         readline.parse_and_bind('"\\e[A": history-search-backward')
         readline.parse_and_bind('"\\e[B": history-search-forward')
         
+        # Build the command trie off the prompt thread so the first tab is instant
+        threading.Thread(target=self.completer.sync, name="terminai-completion", daemon=True).start()
+        
         # Save history on exit
         atexit.register(self.save_history)
     
@@ -116,7 +192,77 @@ class TerminaiTerminal:
         if self.current_provider and not self.current_provider.is_configured():
             self.console.print(f"[yellow]Warning: Provider '{provider_name}' is not properly configured[/yellow]")
             self.console.print(f"[yellow]Please set the required API keys in {self.config.config_file}[/yellow]")
-
+        
+        # Conversation history is kept across inputs, within the model's token budget
+        if self.current_provider and self.config.get("llm.context.enabled", True):
+            from .llm.context import ConversationContext
+            
+            max_tokens = self.config.get("llm.context.max_tokens", 16000)
+            context_window = provider_config.get("context_window")
+            self.context = ConversationContext(
+                max_tokens=min(max_tokens, context_window) if context_window else max_tokens,
+                reserve_tokens=self.current_provider.max_tokens or 0
+            )
+        
+        # Fall back to (and hedge with) other configured providers
+        if self.current_provider:
+            routed = [(provider_name, self.current_provider)]
+            for name in self.config.get("llm.routing.fallback", []):
+                fallback_config = self.config.get_llm_config(name)
+                if name == provider_name or not self.llm_manager.is_provider_configured(name, fallback_config):
+                    continue
+                fallback = self.llm_manager.get_provider(name, fallback_config)
+                if fallback is not None:
+                    routed.append((name, fallback))
+            
+            if len(routed) > 1:
+                from .llm.router import RoutingProvider
+                
+                self.router = RoutingProvider(
+                    routed,
+                    hedge=self.config.get("llm.routing.hedge", True),
+                    hedge_min_samples=self.config.get("llm.routing.hedge_min_samples", 5),
+                    cooldown=self.config.get("llm.routing.cooldown", 30)
+                )
+                self.current_provider = self.router
+        
+        # Repeated deterministic requests are answered from the response cache
+        if self.current_provider and self.config.get("llm.cache.enabled", True):
+            from .llm.cache import CachingProvider, ResponseCache
+            
+            self.response_cache = ResponseCache(
+                self.config.config_dir / "response_cache.db",
+                ttl=self.config.get("llm.cache.ttl", 24 * 3600),
+                max_entries=self.config.get("llm.cache.max_entries", 1000)
+            )
+            self.current_provider = CachingProvider(
+                self.current_provider,
+                self.response_cache,
+                provider_name,
+                max_temperature=self.config.get("llm.cache.max_temperature", 0.0),
+                tool_manager=self.tool_manager
+            )
+        
+        # Connections are opened while the user types; the loop starts in run()
+        if self.current_provider and self.config.get("http.prewarm", True):
+            routed = self.router.providers if self.router else [(provider_name, self.current_provider)]
+            self._prewarm_urls = [
+                provider.get_base_url() for _, provider in routed
+                if provider.get_base_url() and provider.is_configured()
+            ]
+            for server in self.config.get("mcp.servers", []):
+                if server.get("type") == "http" and server.get("url") and server.get("enabled", True):
+                    self._prewarm_urls.append(server["url"])
+    
+    def start_prewarm(self):
+        """Start warming the provider and HTTP MCP connections in the background."""
+        if not self._prewarm_urls or self._prewarm_task is not None:
+            return
+        self._prewarm_task = asyncio.ensure_future(self.transport_manager.keep_warm(
+            self._prewarm_urls,
+            idle_limit=self.config.get("http.rewarm_idle_limit", 600)
+        ))
+    
     def setup_mcp_servers(self):
         """Setup and connect to configured MCP servers."""
         mcp_servers = self.config.get("mcp.servers", [])
@@ -127,35 +273,79 @@ class TerminaiTerminal:
         self._mcp_servers_to_connect = mcp_servers
     
     async def _connect_mcp_servers_async(self):
-        """Asynchronously connect to MCP servers."""
+        """Connect to all MCP servers in parallel, waiting at most each server's deadline.
+        
+        Servers that miss their deadline keep connecting in the background and
+        register their tools once they are ready.
+        """
         servers = getattr(self, '_mcp_servers_to_connect', [])
         if not servers:
             return
-            
+        
+        default_deadline = self.config.get("mcp.startup_deadline", 2.0)
+        waiters = []
+        
         for server_config in servers:
-            try:
-                name = server_config.get("name")
-                if not name:
-                    self.console.print("[yellow]Warning: MCP server missing name in configuration[/yellow]")
-                    continue
-                
-                self.console.print(f"[blue]Connecting to MCP server: {name}[/blue]")
-                success = await self.mcp_client.connect_server(name, server_config)
-                
-                if success:
+            name = server_config.get("name")
+            if not name:
+                self.console.print("[yellow]Warning: MCP server missing name in configuration[/yellow]")
+                continue
+            
+            # Tools from the cached catalog are usable right away; the live server is checked in the background
+            if self.mcp_tool_wrapper.register_from_cache(self.tool_manager, name, server_config):
+                self.console.print(f"[green]✓ Loaded cached tools for MCP server: {name}[/green]")
+                task = asyncio.ensure_future(self._connect_mcp_server(name, server_config, revalidate=True))
+                self._mcp_connect_tasks[name] = task
+                continue
+            
+            self.console.print(f"[blue]Connecting to MCP server: {name}[/blue]")
+            task = asyncio.ensure_future(self._connect_mcp_server(name, server_config))
+            self._mcp_connect_tasks[name] = task
+            
+            deadline = server_config.get("startup_deadline", default_deadline)
+            waiters.append(self._wait_for_mcp_server(name, task, deadline))
+        
+        await asyncio.gather(*waiters)
+    
+    async def _wait_for_mcp_server(self, name: str, task: asyncio.Task, deadline: float):
+        """Wait for a server's startup up to its deadline, leaving it running afterwards."""
+        try:
+            await asyncio.wait_for(asyncio.shield(task), timeout=deadline)
+        except asyncio.TimeoutError:
+            self.console.print(f"[yellow]… MCP server {name} is still connecting in the background[/yellow]")
+    
+    async def _connect_mcp_server(self, name: str, server_config: Dict[str, Any], revalidate: bool = False):
+        """Connect to one MCP server and register its tools.
+        
+        With ``revalidate`` the tools were already registered from the cache, so
+        only changes and failures are reported.
+        """
+        try:
+            success = await self.mcp_client.connect_server(name, server_config)
+            
+            if success:
+                if not revalidate:
                     self.console.print(f"[green]✓ Connected to MCP server: {name}[/green]")
-                    
-                    # Register MCP tools from this server
-                    try:
-                        await self.mcp_tool_wrapper.discover_and_register_tools(self.tool_manager, name)
+                
+                # Register MCP tools from this server
+                try:
+                    changes = await self.mcp_tool_wrapper.discover_and_register_tools(self.tool_manager, name)
+                    if not revalidate:
                         self.console.print(f"[green]✓ Registered tools from MCP server: {name}[/green]")
-                    except Exception as tool_error:
-                        self.console.print(f"[yellow]Warning: Failed to register tools from {name}: {tool_error}[/yellow]")
-                else:
-                    self.console.print(f"[red]✗ Failed to connect to MCP server: {name}[/red]")
-                    
-            except Exception as e:
-                self.console.print(f"[red]Error connecting to MCP server {server_config.get('name', 'unknown')}: {e}[/red]")
+                    elif any(changes.values()):
+                        self.console.print(
+                            f"[yellow]MCP server {name} tools changed: "
+                            f"{changes['added']} added, {changes['updated']} updated, {changes['removed']} removed[/yellow]"
+                        )
+                except Exception as tool_error:
+                    self.console.print(f"[yellow]Warning: Failed to register tools from {name}: {tool_error}[/yellow]")
+            else:
+                self.console.print(f"[red]✗ Failed to connect to MCP server: {name}[/red]")
+        
+        except Exception as e:
+            self.console.print(f"[red]Error connecting to MCP server {name}: {e}[/red]")
+        finally:
+            self._mcp_connect_tasks.pop(name, None)
     
     async def process_input(self, user_input: str) -> bool:
         """Process user input."""
@@ -198,82 +388,208 @@ class TerminaiTerminal:
             # Execute the suggested command
             return await self.execute_bash_command(suggested_command)
         
+        turn_start = None
         try:
+            # A rephrasing of an earlier request can reuse the tool calls suggested then
+            if await self.offer_semantic_match(text):
+                return True
+            
             # Use tool-calling for complex tasks
             messages = self.current_provider.format_prompt(text)
+            if self.context is not None:
+                # Earlier turns are kept, within the context's token budget
+                new_messages = [message for message in messages if message.role != "system"]
+                messages = self.context.start_turn(messages)
+                turn_start = len(messages) - len(new_messages)
             
-            # Get available tools
+            # Get available tools, narrowed to the ones relevant to this request
             tools = self.tool_manager.get_tool_definitions()
+            if self.tool_selector is not None:
+                query, keep = text, None
+                if self.context is not None:
+                    # Follow-ups like "now do the same for the other repo" rely on earlier turns
+                    query = "\n".join(self.context.recent_requests())
+                    keep = self.context.tools_called()
+                tools = self.tool_selector.select(query, tools, self.tool_manager.generation, keep).tools
             
-            # Generate response with tool-calling
-            response = await self.current_provider.generate(messages, tools=tools)
-            
-            # Handle tool calls
-            if response.tool_calls:
-                await self.handle_tool_calls(response.tool_calls, messages)
+            # Run the agent loop: tool results are fed back until the model answers
+            result = await self.create_agent_loop().run(messages, tools)
+            if self.context is not None:
+                if result.response is not None and not result.response.tool_calls:
+                    messages.append(LLMMessage(role="assistant", content=result.response.content))
+                self.remember_suggestion(text, self.context.current_turn(), result.failed_tool_calls)
             else:
-                # No tool calls, display the response
-                if response.content.strip():
-                    self.console.print(Panel(
-                        response.content.strip(),
-                        title="AI Response",
-                        expand=False
-                    ))
+                self.remember_suggestion(text, messages, result.failed_tool_calls)
             
-            return True
+            if result.stop_reason == "max_turns":
+                self.console.print(f"[yellow]Stopped after {result.turns} turns (agent.max_turns)[/yellow]")
+            elif result.stop_reason == "time_budget":
+                self.console.print("[yellow]Stopped: agent time budget exhausted (agent.time_budget)[/yellow]")
             
+            return True
+        
+        except asyncio.CancelledError:
+            self.rollback_turn(turn_start)
+            raise
         except Exception as e:
+            self.rollback_turn(turn_start)
             self.console.print(f"[red]Error processing request: {e}[/red]")
             return True
     
-    async def handle_tool_calls(self, tool_calls: List[Dict[str, Any]], messages: List[LLMMessage]):
-        """Handle tool calls from the LLM."""
-        for tool_call in tool_calls:
-            tool_name = tool_call["function"]["name"]
-            tool_args = json.loads(tool_call["function"]["arguments"])
-            tool_id = tool_call["id"]
-            
-            # Display tool call
+    def rollback_turn(self, turn_start: Optional[int]):
+        """Drop an unfinished turn from the conversation history."""
+        if self.context is not None and turn_start is not None:
+            self.context.truncate(turn_start)
+    
+    def get_semantic_cache(self):
+        """Open the semantic cache on first use; None when disabled or NumPy is missing."""
+        if self._semantic_cache is None:
+            self._semantic_cache = False
+            if self.config.get("llm.semantic_cache.enabled", True):
+                from .llm.semantic_cache import SemanticCache, numpy_available
+                
+                if numpy_available():
+                    self._semantic_cache = SemanticCache(
+                        self.config.config_dir / "semantic_cache",
+                        threshold=self.config.get("llm.semantic_cache.threshold", 0.8),
+                        max_entries=self.config.get("llm.semantic_cache.max_entries", 5000)
+                    )
+                else:
+                    logging.getLogger(__name__).info("NumPy is not installed; semantic cache disabled")
+        return self._semantic_cache or None
+    
+    async def offer_semantic_match(self, text: str) -> bool:
+        """Offer the tool calls suggested for a similar earlier request; True if they were reused."""
+        cache = self.get_semantic_cache()
+        if cache is None:
+            return False
+        
+        match = cache.lookup(text)
+        if match is None or not match.tool_calls:
+            return False
+        
+        calls = "\n".join(
+            f"{call['function']['name']} {call['function']['arguments']}" for call in match.tool_calls
+        )
+        self.console.print(Panel(
+            f"Similar to an earlier request ({match.similarity:.0%}): \"{match.prompt}\"\n{calls}",
+            title="Previous Suggestion",
+            expand=False
+        ))
+        if not Confirm.ask("Reuse these tool calls?"):
+            return False
+        
+        # Confirmed once for all of them above; fresh ids keep them distinct from earlier turns
+        tool_calls = [dict(call, id=f"call_{uuid.uuid4().hex[:24]}") for call in match.tool_calls]
+        loop = self.create_agent_loop()
+        loop.confirm_tool_call = None
+        results = await loop.execute_tool_calls(tool_calls)
+        
+        if self.context is not None:
+            # Record what ran so the next turn can refer to it
+            self.context.start_turn(self.current_provider.format_prompt(text))
+            self.context.messages.extend(AgentLoop.tool_turn("", tool_calls, results))
+            self.context.messages.append(LLMMessage(
+                role="assistant",
+                content=f"Reran the tool calls suggested for the earlier request \"{match.prompt}\"."
+            ))
+        return True
+    
+    def remember_suggestion(self, text: str, messages: List[LLMMessage], failed_tool_calls: Optional[List[str]] = None):
+        """Store the first tool calls the model suggested for a request in the semantic cache.
+        
+        They are only stored if every one of them was confirmed and succeeded.
+        """
+        cache = self.get_semantic_cache()
+        if cache is None:
+            return
+        
+        failed = set(failed_tool_calls or ())
+        for message in messages:
+            if message.role == "assistant" and message.tool_calls:
+                if not any(tool_call["id"] in failed for tool_call in message.tool_calls):
+                    cache.add(text, message.tool_calls)
+                return
+    
+    def create_agent_loop(self) -> AgentLoop:
+        """Create an agent loop bound to the current provider and tools."""
+        return AgentLoop(
+            generate=self.generate_response,
+            tool_manager=self.tool_manager,
+            max_turns=self.config.get("agent.max_turns", 8),
+            max_concurrency=self.config.get("agent.max_concurrency", 4),
+            time_budget=self.config.get("agent.time_budget", 120),
+            confirm_tool_call=self.confirm_tool_call,
+            on_tool_result=self.show_tool_result,
+            context=self.context
+        )
+    
+    async def generate_response(self, messages: List[LLMMessage], tools: Optional[List[Dict[str, Any]]] = None) -> LLMResponse:
+        """Generate one model turn and display its content."""
+        if self.config.get("terminal.stream_responses", True):
+            # Content is rendered live while it streams in
+            return await self.stream_response(messages, tools)
+        
+        response = await self.current_provider.generate(messages, tools=tools)
+        if response.content.strip():
             self.console.print(Panel(
-                f"Calling tool: {tool_name}\nArguments: {json.dumps(tool_args, indent=2)}",
-                title="Tool Call",
+                response.content.strip(),
+                title="AI Response",
                 expand=False
             ))
+        return response
+    
+    async def stream_response(self, messages: List[LLMMessage], tools: Optional[List[Dict[str, Any]]] = None) -> LLMResponse:
+        """Stream a response from the current provider, rendering content as it arrives."""
+        accumulator = StreamAccumulator()
+        
+        with Live(
+            Spinner("dots", text="Thinking..."),
+            console=self.console,
+            refresh_per_second=12,
+            vertical_overflow="visible"
+        ) as live:
+            async for chunk in self.current_provider.stream(messages, tools=tools):
+                accumulator.add(chunk)
+                if chunk.content:
+                    live.update(Panel(
+                        accumulator.content.strip(),
+                        title="AI Response",
+                        expand=False
+                    ))
             
-            # Ask for confirmation if enabled
-            if self.config.get("tools.confirm_tool_calls", True):
-                if not Confirm.ask("Execute this tool call?"):
-                    continue
-            
-            # Execute the tool
-            result = await self.tool_manager.execute_tool(tool_name, tool_args)
-            
-            if result.success:
-                self.console.print(Panel(
-                    result.content,
-                    title=f"Tool Result: {tool_name}",
-                    expand=False
-                ))
-                
-                # Add tool result to conversation
-                messages.append(
-                    LLMMessage(
-                        role="tool",
-                        content=result.content,
-                        tool_call_id=tool_id
-                    )
-                )
-            else:
-                self.console.print(f"[red]Tool execution failed: {result.error}[/red]")
-                
-                # Add error to conversation
-                messages.append(
-                    LLMMessage(
-                        role="tool",
-                        content=f"Error: {result.error}",
-                        tool_call_id=tool_id
-                    )
+            if not accumulator.content.strip():
+                live.update("")
+        
+        return accumulator.to_response()
+    
+    def confirm_tool_call(self, tool_name: str, tool_args: Dict[str, Any]) -> bool:
+        """Display a tool call and ask for confirmation if enabled."""
+        self.console.print(Panel(
+            f"Calling tool: {tool_name}\nArguments: {json.dumps(tool_args, indent=2)}",
+            title="Tool Call",
+            expand=False
+        ))
+        
+        if self.config.get("tools.confirm_tool_calls", True):
+            return Confirm.ask("Execute this tool call?")
+        return True
+    
+    def show_tool_result(self, tool_name: str, result: ToolResult):
+        """Display the result of a tool call."""
+        if result.success:
+            self.console.print(Panel(
+                result.content,
+                title=f"Tool Result: {tool_name}",
+                expand=False
+            ))
+            if result.truncated:
+                self.console.print(
+                    f"[dim]Showing part of {result.total_lines} lines ({result.total_bytes // 1024} KB); "
+                    f"full output in {self.blob_store.path(result.blob_id)}[/dim]"
                 )
+        else:
+            self.console.print(f"[red]Tool execution failed: {result.error}[/red]")
     
     async def execute_bash_command(self, command: str) -> bool:
         """Execute a bash command."""
@@ -284,20 +600,20 @@ class TerminaiTerminal:
             if not Confirm.ask("Execute anyway?"):
                 return True
         
-        # Execute the command
-        exit_code, stdout, stderr = self.bash_executor.execute_command(
+        # Execute the command, streaming output as it arrives
+        await self.bash_executor.execute_command_async(
             command,
-            timeout=self.config.get("terminal.timeout", 30)
+            timeout=self.config.get("terminal.timeout", 30),
+            on_output=self.print_command_output
         )
         
-        # Display results
-        if stdout:
-            self.console.print(stdout)
-        if stderr:
-            self.console.print(f"[red]{stderr}[/red]")
-        
         return True
     
+    def print_command_output(self, stream: str, line: str):
+        """Print a line of command output as soon as it is produced."""
+        style = "red" if stream == "stderr" else None
+        self.console.print(line, style=style, markup=False, highlight=False)
+    
     async def handle_special_command(self, command: str) -> bool:
         """Handle special commands starting with !."""
         parts = command.split()
@@ -318,6 +634,14 @@ class TerminaiTerminal:
             await self.handle_mcp_command(parts[1:])
         elif cmd == "tools":
             await self.handle_tools_command(parts[1:])
+        elif cmd == "index":
+            await self.handle_index_command(parts[1:])
+        elif cmd == "cache":
+            self.handle_cache_command(parts[1:])
+        elif cmd == "diag":
+            self.show_diagnostics()
+        elif cmd == "context":
+            self.handle_context_command(parts[1:])
         else:
             self.console.print(f"[red]Unknown command: !{command}[/red]")
             self.console.print("Type !help for available commands")
@@ -345,6 +669,10 @@ class TerminaiTerminal:
   !config                Show current configuration
   !mcp                   MCP server commands
   !tools                 Tool management commands
+  !index                 Search index commands
+  !cache                 Response cache statistics
+  !diag                  Connection diagnostics
+  !context               Conversation history size (clear to forget it)
 
 [bold]Configuration:[/bold]
   Edit ~/.terminai/config.json to configure LLM providers and tools
@@ -383,6 +711,7 @@ class TerminaiTerminal:
             self.console.print("  !tools list          List available tools")
             self.console.print("  !tools info <tool>   Show tool information")
             self.console.print("  !tools refresh       Refresh MCP tools from all servers")
+            self.console.print("  !tools select        Show or change which tools are sent with each request")
             return
         
         cmd = args[0].lower()
@@ -423,6 +752,9 @@ class TerminaiTerminal:
             else:
                 self.console.print(f"[red]Tool '{tool_name}' not found[/red]")
         
+        elif cmd == "select":
+            self.handle_tool_selection_command(args[1:])
+        
         elif cmd == "refresh":
             self.console.print("[blue]Refreshing MCP tools from all connected servers...[/blue]")
             servers = self.mcp_client.get_connected_servers()
@@ -433,11 +765,62 @@ class TerminaiTerminal:
             
             for server_name in servers:
                 try:
-                    await self.mcp_tool_wrapper.refresh_server_tools(self.tool_manager, server_name)
-                    self.console.print(f"[green]✓ Refreshed tools from {server_name}[/green]")
+                    changes = await self.mcp_tool_wrapper.refresh_server_tools(self.tool_manager, server_name)
+                    self.console.print(
+                        f"[green]✓ Refreshed tools from {server_name} "
+                        f"({changes['added']} added, {changes['updated']} updated, {changes['removed']} removed)[/green]"
+                    )
                 except Exception as e:
                     self.console.print(f"[red]✗ Failed to refresh tools from {server_name}: {e}[/red]")
     
+    def handle_tool_selection_command(self, args: list):
+        """Show or change tool selection for this session."""
+        if self.tool_selector is None:
+            self.tool_selector = ToolSelector(
+                top_k=self.config.get("tools.selection.top_k", 8),
+                serialize=self.tool_manager.get_tool_definition_json
+            )
+            self.tool_selector.enabled = False
+        selector = self.tool_selector
+        cmd = args[0].lower() if args else "stats"
+        
+        if cmd in ("on", "off"):
+            selector.enabled = cmd == "on"
+            self.console.print(f"[green]✓ Tool selection {'enabled' if selector.enabled else 'disabled'} for this session[/green]")
+        
+        elif cmd == "top" and len(args) > 1 and args[1].isdigit():
+            selector.top_k = int(args[1])
+            self.console.print(f"[green]✓ Sending the {selector.top_k} most relevant tools plus {len(selector.pinned)} pinned[/green]")
+        
+        elif cmd == "query" and len(args) > 1:
+            query = " ".join(args[1:])
+            definitions = self.tool_manager.get_tool_definitions()
+            # Scoring alone leaves the session counters untouched
+            scores = selector.score(query, definitions, self.tool_manager.generation)
+            ranked = sorted(zip(scores, (d["function"]["name"] for d in definitions)), reverse=True)
+            self.console.print(f"[bold]Tool scores for:[/bold] {query}")
+            for score, name in ranked[:selector.top_k]:
+                if score > 0:
+                    pinned = " (pinned)" if name in selector.pinned else ""
+                    self.console.print(f"  {score:6.2f}  {name}{pinned}")
+            if not any(score > 0 for score in scores):
+                self.console.print(f"  [dim]No tool matches; only the {len(selector.pinned)} pinned tools would be sent[/dim]")
+        
+        elif cmd == "stats":
+            stats = selector.stats()
+            self.console.print("[bold]Tool Selection:[/bold]")
+            self.console.print(f"  Enabled:    {'yes' if stats['enabled'] else 'no'}")
+            self.console.print(f"  Sending:    top {stats['top_k']} matches plus pinned {', '.join(stats['pinned']) or 'none'}")
+            self.console.print(f"  Requests:   {stats['requests']}")
+            self.console.print(f"  Tokens:     ~{stats['tokens_sent']} sent, ~{stats['tokens_saved']} saved")
+        
+        else:
+            self.console.print("[bold]Tool Selection Commands:[/bold]")
+            self.console.print("  !tools select              Show settings and tokens saved")
+            self.console.print("  !tools select on|off       Turn selection on or off for this session")
+            self.console.print("  !tools select top <k>      Send the k most relevant tools")
+            self.console.print("  !tools select query <text> Show how tools score for a request")
+    
     async def handle_mcp_command(self, args: list):
         """Handle MCP-related commands."""
         if not args:
@@ -470,28 +853,247 @@ class TerminaiTerminal:
             except Exception as e:
                 self.console.print(f"[red]Error: {e}[/red]")
     
+    def handle_cache_command(self, args: list):
+        """Handle response cache commands."""
+        if self.response_cache is None:
+            self.console.print("[yellow]Response cache is disabled (llm.cache.enabled)[/yellow]")
+            return
+        
+        cmd = args[0].lower() if args else "stats"
+        
+        if cmd == "stats":
+            stats = self.response_cache.stats()
+            self.console.print("[bold]Response Cache:[/bold]")
+            self.console.print(f"  Hits:       {stats['hits']}")
+            self.console.print(f"  Misses:     {stats['misses']}")
+            self.console.print(f"  Hit rate:   {stats['hit_rate']:.0%}")
+            self.console.print(f"  Entries:    {stats['entries']} / {stats['max_entries']} ({stats['evictions']} evicted)")
+            self.console.print(f"  TTL:        {stats['ttl']:.0f}s")
+            self.console.print(f"  Size:       {stats['bytes'] / 1024:.0f} KB at {stats['path']}")
+            self.console.print(f"  Caching at temperature <= {self.current_provider.max_temperature}")
+            
+            semantic_cache = self.get_semantic_cache()
+            if semantic_cache is not None:
+                stats = semantic_cache.stats()
+                self.console.print("[bold]Semantic Cache:[/bold]")
+                self.console.print(f"  Matches:    {stats['hits']} of {stats['hits'] + stats['misses']} lookups")
+                self.console.print(f"  Entries:    {stats['entries']} (similarity >= {stats['threshold']})")
+        
+        elif cmd == "clear":
+            removed = self.response_cache.clear()
+            self.console.print(f"[green]✓ Cleared {removed} cached responses[/green]")
+        
+        else:
+            self.console.print("[bold]Cache Commands:[/bold]")
+            self.console.print("  !cache [stats]       Show hit/miss counters and cache size")
+            self.console.print("  !cache clear         Remove all cached responses")
+    
+    def handle_context_command(self, args: list):
+        """Handle conversation history commands."""
+        if self.context is None:
+            self.console.print("[yellow]Conversation history is disabled (llm.context.enabled)[/yellow]")
+            return
+        
+        cmd = args[0].lower() if args else "stats"
+        
+        if cmd == "stats":
+            stats = self.context.stats()
+            self.console.print("[bold]Conversation:[/bold]")
+            self.console.print(f"  Turns:      {stats['turns']} ({stats['messages']} messages)")
+            self.console.print(f"  Tokens:     ~{stats['tokens']} of {stats['budget']}")
+            self.console.print(f"  Trimmed:    {stats['compacted']} tool outputs compacted, {stats['dropped']} turns dropped")
+        
+        elif cmd == "clear":
+            self.context.clear()
+            self.console.print("[green]✓ Conversation history cleared[/green]")
+        
+        else:
+            self.console.print("[bold]Context Commands:[/bold]")
+            self.console.print("  !context [stats]     Show history size against the token budget")
+            self.console.print("  !context clear       Forget earlier turns")
+    
+    def show_diagnostics(self):
+        """Show connection state for the provider and HTTP MCP servers."""
+        manager = self.transport_manager
+        base_url = self.current_provider.get_base_url() if self.current_provider else None
+        self.console.print("[bold]Connections:[/bold]")
+        self.console.print(f"  Provider:   {base_url or 'none'}")
+        self.console.print(f"  HTTP/2:     {'on' if manager.http2 else 'off'}")
+        self.console.print(f"  Pre-warm:   {'on' if self._prewarm_task is not None else 'off'}")
+        self.console.print(f"  DNS cache:  {manager.resolver.cache_hits} hits, {manager.resolver.lookups} lookups")
+        
+        if self.router is not None:
+            self.show_routing()
+        
+        statuses = manager.origin_status()
+        if not statuses:
+            self.console.print("  [dim]No connections opened yet[/dim]")
+            return
+        
+        total_saved = 0.0
+        for status in statuses:
+            color = "green" if status.state == "warm" else "yellow"
+            handshake = f"{status.handshake_ms:.0f} ms" if status.handshake_ms is not None else "unknown"
+            idle = f", idle {status.idle_seconds:.0f}s" if status.idle_seconds is not None else ""
+            self.console.print(f"  [{color}]{status.state:<4}[/{color}] {status.origin}")
+            self.console.print(
+                f"         {status.connections} open, handshake {handshake}, "
+                f"{status.reused_requests} requests reused a connection (~{status.saved_ms:.0f} ms saved){idle}"
+            )
+            total_saved += status.saved_ms
+        self.console.print(f"  Handshake time saved: ~{total_saved:.0f} ms")
+    
+    def show_routing(self):
+        """Show the health of each provider the router can fall back to."""
+        router = self.router
+        self.console.print(
+            f"  Routing:    {router.failovers} failovers, {router.hedges} hedged requests "
+            f"({router.hedge_wins} won by the fallback)"
+        )
+        for row in router.stats():
+            if not row["configured"]:
+                state = "[dim]not configured[/dim]"
+            elif not row["available"]:
+                state = "[red]cooling down[/red]"
+            else:
+                state = "[green]healthy[/green]"
+            latency = f"{row['latency'] * 1000:.0f} ms avg" if row["latency"] is not None else "no requests yet"
+            p95 = f", p95 {row['p95'] * 1000:.0f} ms" if row["p95"] is not None else ""
+            self.console.print(
+                f"    {row['name']:<12} {state} {latency}{p95}, "
+                f"{row['failures']} of {row['successes'] + row['failures']} failed ({row['error_rate']:.0%} recent)"
+            )
+    
+    async def handle_index_command(self, args: list):
+        """Handle search index commands."""
+        if not args:
+            self.console.print("[bold]Index Commands:[/bold]")
+            self.console.print("  !index build [path]  Build or update the search index for a directory")
+            self.console.print("  !index info [path]   Show index statistics")
+            self.console.print("  !index drop [path]   Delete the index for a directory")
+            self.console.print("  !index list          List indexed directories")
+            return
+        
+        cmd = args[0].lower()
+        path = os.path.abspath(os.path.expanduser(args[1] if len(args) > 1 else "."))
+        index_manager = self.builtin_tools.index_manager
+        loop = asyncio.get_running_loop()
+        
+        if cmd == "build":
+            if not os.path.isdir(path):
+                self.console.print(f"[red]Not a directory: {path}[/red]")
+                return
+            
+            self.console.print(f"[blue]Indexing {path}...[/blue]")
+            index = index_manager.open(path, create=True)
+            start = time.perf_counter()
+            stats = await loop.run_in_executor(None, index.update)
+            elapsed = time.perf_counter() - start
+            self.console.print(
+                f"[green]✓ Indexed {path} in {elapsed:.1f}s: {stats['added']} added, "
+                f"{stats['updated']} updated, {stats['removed']} removed, {stats['unchanged']} unchanged[/green]"
+            )
+        
+        elif cmd == "info":
+            found = index_manager.find(path)
+            if not found:
+                self.console.print(f"[yellow]No index covers {path}[/yellow]")
+                return
+            
+            info = await loop.run_in_executor(None, found[0].info)
+            self.console.print(f"[bold]Index for {info['root']}[/bold]")
+            self.console.print(f"  Files:      {info['files']} ({info['bytes'] / 1024 / 1024:.1f} MB)")
+            self.console.print(f"  Too large:  {info['unindexed_files']} (always scanned)")
+            self.console.print(f"  Trigrams:   {info['trigrams']}")
+            self.console.print(f"  Index size: {info['index_bytes'] / 1024 / 1024:.1f} MB at {info['path']}")
+            if info["updated_at"]:
+                self.console.print(f"  Updated:    {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(info['updated_at']))}")
+        
+        elif cmd == "drop":
+            if index_manager.drop(path):
+                self.console.print(f"[green]✓ Dropped index for {path}[/green]")
+            else:
+                self.console.print(f"[yellow]No index for {path}[/yellow]")
+        
+        elif cmd == "list":
+            roots = index_manager.list_roots()
+            if not roots:
+                self.console.print("[yellow]No indexed directories[/yellow]")
+            for root in roots:
+                self.console.print(f"  - {root}")
+        
+        else:
+            self.console.print(f"[red]Unknown index command: {cmd}[/red]")
+    
+    async def _run_foreground(self, awaitable) -> Any:
+        """Run an awaitable as the task that Ctrl-C interrupts."""
+        self._foreground_task = asyncio.ensure_future(awaitable)
+        try:
+            return await self._foreground_task
+        finally:
+            self._foreground_task = None
+    
+    def _on_interrupt(self):
+        """Handle Ctrl-C by cancelling whatever is running in the foreground."""
+        if self._foreground_task and not self._foreground_task.done():
+            self._interrupted = True
+            self._foreground_task.cancel()
+    
     async def run(self):
         """Run the terminal."""
         self.console.print("[bold green]Welcome to Terminai![/bold green]")
         self.console.print("Type !help for commands, or just start typing!")
         
-        # Connect to MCP servers
-        await self._connect_mcp_servers_async()
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGINT, self._on_interrupt)
         
         prompt = self.config.get_prompt()
+        pending_input = None
+        self.start_prewarm()
+        
+        try:
+            # Connect to MCP servers; slow ones finish in the background
+            await self._run_foreground(self._connect_mcp_servers_async())
+        except asyncio.CancelledError:
+            if not self._interrupted:
+                raise
+            self._interrupted = False
+            self.console.print("\n[yellow]MCP servers continue connecting in the background[/yellow]")
         
         try:
             while True:
                 try:
-                    user_input = input(prompt)
-                    if not await self.process_input(user_input):
+                    # A line typed after Ctrl-C still belongs to the same pending read
+                    if pending_input is None:
+                        pending_input = loop.run_in_executor(self._input_executor, input, prompt)
+                    user_input = await self._run_foreground(asyncio.shield(pending_input))
+                    pending_input = None
+                    
+                    if not await self._run_foreground(self.process_input(user_input)):
                         break
-                except KeyboardInterrupt:
+                except asyncio.CancelledError:
+                    if not self._interrupted:
+                        raise
+                    self._interrupted = False
                     self.console.print("\n[yellow]Use !exit to quit[/yellow]")
+                    if pending_input is not None:
+                        # The read is still in progress; redraw its prompt
+                        print(prompt, end="", flush=True)
                 except EOFError:
                     break
         except Exception as e:
             self.console.print(f"[red]Error: {e}[/red]")
         finally:
+            loop.remove_signal_handler(signal.SIGINT)
+            for task in list(self._mcp_connect_tasks.values()):
+                task.cancel()
+            if self._prewarm_task is not None:
+                self._prewarm_task.cancel()
             await self.mcp_client.disconnect_all()
+            await self.bash_executor.close()
+            await self.transport_manager.aclose()
+            self._input_executor.shutdown(wait=False)
+            self.builtin_tools.index_manager.close()
+            if self.response_cache:
+                self.response_cache.close()
             self.console.print("[green]Goodbye![/green]")
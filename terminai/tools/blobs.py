@@ -0,0 +1,185 @@
+"""Content-addressed storage for tool output too large to send to the model in full."""
+
+import os
+import re
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Union
+
+from .manager import ToolResult
+
+logger = logging.getLogger(__name__)
+
+_BLOB_ID = re.compile(r"^[0-9a-f]{16}$")
+
+
+class BlobStore:
+    """Stores large tool output under its SHA-256 and serves it back a page at a time.
+
+    ``spill`` replaces a large result's content with a head/tail preview that
+    names the blob; the model reads the rest with the fetch_tool_output tool.
+    Identical output is stored once. The oldest blobs are removed when the
+    store grows past ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        spill_bytes: int = 16 * 1024,
+        head_lines: int = 40,
+        tail_lines: int = 20,
+        max_bytes: int = 100 * 1024 * 1024
+    ):
+        """Initialize the store; the directory is created on first write."""
+        self.directory = Path(directory).expanduser()
+        self.spill_bytes = spill_bytes
+        self.head_lines = head_lines
+        self.tail_lines = tail_lines
+        self.max_bytes = max_bytes
+        self.spilled = 0
+        self.bytes_withheld = 0
+        self._lock = threading.Lock()
+
+    def path(self, blob_id: str) -> Path:
+        """Get the file a blob is stored in."""
+        return self.directory / blob_id[:2] / blob_id
+
+    def put(self, text: str) -> str:
+        """Store text and return its id (the first 16 hex digits of its SHA-256)."""
+        data = text.encode("utf-8")
+        blob_id = hashlib.sha256(data).hexdigest()[:16]
+        path = self.path(blob_id)
+        with self._lock:
+            if path.exists():
+                # Already stored; mark it recently used so pruning keeps it
+                os.utime(path)
+                return blob_id
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._prune()
+        return blob_id
+
+    def _prune(self):
+        """Remove the least recently written blobs while the store is over ``max_bytes``."""
+        blobs = []
+        total = 0
+        for path in self.directory.glob("*/*"):
+            if path.suffix == ".tmp":
+                continue
+            stat = path.stat()
+            blobs.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        for _, size, path in sorted(blobs):
+            if total <= self.max_bytes:
+                break
+            path.unlink()
+            total -= size
+            logger.debug(f"Pruned tool output blob {path.name}")
+
+    def read(self, blob_id: str) -> Optional[str]:
+        """Get a blob's full text, or None if it does not exist."""
+        if not _BLOB_ID.match(blob_id or ""):
+            return None
+        try:
+            return self.path(blob_id).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def preview(self, text: str, blob_id: str) -> str:
+        """Build the head/tail preview sent in place of the full text."""
+        lines = text.splitlines()
+        head_budget = self.spill_bytes * 2 // 3
+        tail_budget = self.spill_bytes // 3
+
+        head = self._fit(lines[:self.head_lines], head_budget)
+        tail = self._fit(lines[len(head):][-self.tail_lines:], tail_budget, from_end=True)
+        omitted_lines = len(lines) - len(head) - len(tail)
+        note = (
+            f"[... {omitted_lines} of {len(lines)} lines ({len(text.encode('utf-8')) // 1024} KB in total) omitted. "
+            f"Full output saved as \"{blob_id}\": call fetch_tool_output with this id and offset/limit "
+            f"(or pattern) to read more ...]"
+        )
+        return "\n".join(head + [note] + tail)
+
+    @staticmethod
+    def _fit(lines: List[str], budget: int, from_end: bool = False) -> List[str]:
+        """Keep whole lines (cutting a single overlong one) within a byte budget."""
+        kept: List[str] = []
+        used = 0
+        for line in (reversed(lines) if from_end else lines):
+            size = len(line.encode("utf-8")) + 1
+            if used + size > budget:
+                if not kept:
+                    kept.append(line[-budget:] if from_end else line[:budget])
+                break
+            kept.append(line)
+            used += size
+        return list(reversed(kept)) if from_end else kept
+
+    def spill(self, result: ToolResult) -> ToolResult:
+        """Store a result's content if it is too large, returning a result carrying a preview."""
+        size = len(result.content.encode("utf-8"))
+        if size <= self.spill_bytes:
+            return result
+        try:
+            blob_id = self.put(result.content)
+        except OSError as e:
+            logger.warning(f"Could not save large tool output: {e}")
+            return result
+
+        preview = self.preview(result.content, blob_id)
+        self.spilled += 1
+        self.bytes_withheld += size - len(preview.encode("utf-8"))
+        return result.model_copy(update={
+            "content": preview,
+            "truncated": True,
+            "blob_id": blob_id,
+            "total_bytes": size,
+            "total_lines": len(result.content.splitlines())
+        })
+
+    def page(self, blob_id: str, offset: int = 0, limit: int = 200, pattern: Optional[str] = None) -> ToolResult:
+        """Read lines ``offset`` to ``offset + limit`` of a blob, optionally only those matching ``pattern``."""
+        text = self.read(blob_id)
+        if text is None:
+            return ToolResult(success=False, content="", error=f"No saved tool output with id '{blob_id}'")
+
+        lines = text.splitlines()
+        numbered = list(enumerate(lines))
+        if pattern:
+            try:
+                regex = re.compile(pattern)
+            except re.error as e:
+                return ToolResult(success=False, content="", error=f"Invalid pattern: {e}")
+            numbered = [(i, line) for i, line in numbered if regex.search(line)]
+
+        offset = max(0, offset)
+        page = numbered[offset:offset + max(1, limit)]
+        what = f"matches for {pattern!r}" if pattern else "lines"
+
+        def header(end: int) -> str:
+            if end <= offset:
+                return f"[{blob_id}: no {what} from offset {offset}]"
+            return f"[{blob_id}: {what} {offset + 1}-{end} of {len(numbered)}]"
+
+        def footer(end: int) -> str:
+            return f"\n[More available: call again with offset={end}]" if end < len(numbered) else ""
+
+        # The whole page, header and footer included, stays within spill_bytes
+        reserve = len((header(len(numbered)) + "\n" + footer(0)).encode("utf-8")) + len(str(len(numbered)))
+        body = self._fit([f"{i + 1}: {line}" for i, line in page], max(1, self.spill_bytes - reserve))
+        end = offset + len(body)
+        return ToolResult(success=True, content=header(end) + "\n" + "\n".join(body) + footer(end))
+
+    def stats(self) -> Dict[str, Any]:
+        """Get this session's spill counters."""
+        return {
+            "path": str(self.directory),
+            "spilled": self.spilled,
+            "bytes_withheld": self.bytes_withheld,
+        }
@@ -3,18 +3,41 @@
 import os
 import json
 import re
+import time
+import asyncio
+import fnmatch
+import functools
 from typing import Dict, Any, List
 from pathlib import Path
 
 from .manager import ToolManager, ToolResult
+from ..utils.search import SearchEngine, SearchResult
+from ..utils.trigram_index import IndexManager
+from ..utils.file_reader import FileReader
+from ..utils.replace import stream_replace
+from ..utils.walker import iter_entries
+
+# read_file never returns more than this much of a file at once
+READ_FILE_MAX_BYTES = 256 * 1024
+# Default page size for list_files
+LIST_FILES_PAGE_SIZE = 500
 
 
 class BuiltinTools:
     """Builtin tools for file operations and command execution."""
     
-    def __init__(self, bash_executor):
-        """Initialize builtin tools."""
+    def __init__(self, bash_executor, index_dir: str = "~/.terminai/index", blob_store=None, index_refresh: float = 10.0):
+        """Initialize builtin tools; fetch_tool_output is only offered with a BlobStore.
+        
+        Searches through an index walk its tree at most once every
+        ``index_refresh`` seconds, and again after any command or file write.
+        """
         self.bash_executor = bash_executor
+        self.blob_store = blob_store
+        self.search_engine = SearchEngine()
+        self.index_manager = IndexManager(index_dir)
+        self.index_refresh = index_refresh
+        self.file_reader = FileReader()
     
     def register_all(self, tool_manager: ToolManager):
         """Register all builtin tools."""
@@ -24,6 +47,8 @@ class BuiltinTools:
         self._register_replace_in_file(tool_manager)
         self._register_list_files(tool_manager)
         self._register_search_files(tool_manager)
+        if self.blob_store is not None:
+            self._register_fetch_tool_output(tool_manager)
     
     def _register_execute_command(self, tool_manager: ToolManager):
         """Register the execute_command tool."""
@@ -47,8 +72,9 @@ class BuiltinTools:
     
     async def _execute_command(self, command: str, timeout: int = 30) -> ToolResult:
         """Execute a bash command."""
+        self.index_manager.mark_stale()
         try:
-            exit_code, stdout, stderr = self.bash_executor.execute_command(
+            exit_code, stdout, stderr = await self.bash_executor.execute_command_async(
                 command,
                 timeout=timeout
             )
@@ -81,19 +107,61 @@ class BuiltinTools:
         """Register the read_file tool."""
         tool_manager.register_tool(
             name="read_file",
-            description="Read the contents of a file",
+            description=(
+                "Read the contents of a file. Large files are returned in pieces: use start_line/end_line, "
+                "offset/length (bytes), head or tail to choose which part to read."
+            ),
             parameters={
                 "path": {
                     "type": "string",
                     "description": "Path to the file to read",
                     "required": True
+                },
+                "start_line": {
+                    "type": "integer",
+                    "description": "First line to read (1-based)",
+                    "required": False
+                },
+                "end_line": {
+                    "type": "integer",
+                    "description": "Last line to read (inclusive)",
+                    "required": False
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "Byte offset to start reading at (negative counts from the end)",
+                    "required": False
+                },
+                "length": {
+                    "type": "integer",
+                    "description": "Number of bytes to read from offset",
+                    "required": False
+                },
+                "head": {
+                    "type": "integer",
+                    "description": "Read only the first N lines",
+                    "required": False
+                },
+                "tail": {
+                    "type": "integer",
+                    "description": "Read only the last N lines",
+                    "required": False
                 }
             },
             executor=self._read_file
         )
     
-    async def _read_file(self, path: str) -> ToolResult:
-        """Read a file."""
+    async def _read_file(
+        self,
+        path: str,
+        start_line: int = None,
+        end_line: int = None,
+        offset: int = None,
+        length: int = None,
+        head: int = None,
+        tail: int = None
+    ) -> ToolResult:
+        """Read a file, or part of it."""
         try:
             file_path = Path(path)
             if not file_path.exists():
@@ -110,7 +178,54 @@ class BuiltinTools:
                     error=f"Path is not a file: {path}"
                 )
             
-            content = file_path.read_text()
+            modes = [
+                name for name, used in (
+                    ("line range", start_line is not None or end_line is not None),
+                    ("byte range", offset is not None or length is not None),
+                    ("head", head is not None),
+                    ("tail", tail is not None)
+                ) if used
+            ]
+            if len(modes) > 1:
+                return ToolResult(
+                    success=False,
+                    content="",
+                    error=f"Choose only one of: {', '.join(modes)}"
+                )
+            
+            if start_line is not None or end_line is not None:
+                read = functools.partial(
+                    self.file_reader.read_lines, path, int(start_line or 1),
+                    int(end_line) if end_line is not None else None, READ_FILE_MAX_BYTES
+                )
+            elif offset is not None or length is not None:
+                read = functools.partial(
+                    self.file_reader.read_bytes, path, int(offset or 0),
+                    int(length) if length is not None else None, READ_FILE_MAX_BYTES
+                )
+            elif head is not None:
+                read = functools.partial(self.file_reader.head, path, int(head), READ_FILE_MAX_BYTES)
+            elif tail is not None:
+                read = functools.partial(self.file_reader.tail, path, int(tail), READ_FILE_MAX_BYTES)
+            else:
+                read = functools.partial(self.file_reader.read_lines, path, 1, None, READ_FILE_MAX_BYTES)
+            
+            piece = await asyncio.get_running_loop().run_in_executor(None, read)
+            content = piece.content
+            
+            # Say which part of the file this is whenever it is not the whole file
+            if piece.offset > 0 or piece.end_offset < piece.file_size:
+                if piece.start_line is not None:
+                    where = f"lines {piece.start_line}-{piece.end_line}"
+                else:
+                    where = f"bytes {piece.offset}-{piece.end_offset}"
+                note = f"[Showing {where} of {path} ({piece.file_size} bytes)"
+                if piece.truncated:
+                    note += f"; output capped at {READ_FILE_MAX_BYTES} bytes, request a narrower range to see more"
+                if not content.endswith("\n"):
+                    content += "\n"
+                content += f"{note}]"
+            
             return ToolResult(
                 success=True,
                 content=content,
@@ -150,6 +265,7 @@ class BuiltinTools:
     
     async def _write_to_file(self, path: str, content: str, append: bool = False) -> ToolResult:
         """Write content to a file."""
+        self.index_manager.mark_stale()
         try:
             file_path = Path(path)
             
@@ -180,7 +296,10 @@ class BuiltinTools:
         """Register the replace_in_file tool."""
         tool_manager.register_tool(
             name="replace_in_file",
-            description="Replace content in a file",
+            description=(
+                "Replace content in a file. old_content is matched literally, or as a regex if it does not "
+                "occur literally. Reports the number of replacements and their lines; dry_run shows a diff instead."
+            ),
             parameters={
                 "path": {
                     "type": "string",
@@ -196,13 +315,20 @@ class BuiltinTools:
                     "type": "string",
                     "description": "Content to replace with",
                     "required": True
+                },
+                "dry_run": {
+                    "type": "boolean",
+                    "description": "Show a diff of the changes without modifying the file",
+                    "required": False
                 }
             },
             executor=self._replace_in_file
         )
     
-    async def _replace_in_file(self, path: str, old_content: str, new_content: str) -> ToolResult:
+    async def _replace_in_file(self, path: str, old_content: str, new_content: str, dry_run: bool = False) -> ToolResult:
         """Replace content in a file."""
+        if not dry_run:
+            self.index_manager.mark_stale()
         try:
             file_path = Path(path)
             if not file_path.exists():
@@ -212,27 +338,44 @@ class BuiltinTools:
                     error=f"File not found: {path}"
                 )
             
-            content = file_path.read_text()
+            if not old_content:
+                return ToolResult(
+                    success=False,
+                    content="",
+                    error="old_content must not be empty"
+                )
             
-            # Try exact match first, then regex
-            if old_content in content:
-                new_content_str = content.replace(old_content, new_content)
-            else:
-                # Try regex replacement
-                try:
-                    new_content_str = re.sub(old_content, new_content, content)
-                except re.error:
-                    return ToolResult(
-                        success=False,
-                        content="",
-                        error=f"Invalid regex pattern: {old_content}"
-                    )
+            try:
+                result = await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+                    stream_replace, path, old_content, new_content, dry_run=dry_run
+                ))
+            except re.error:
+                return ToolResult(
+                    success=False,
+                    content="",
+                    error=f"Invalid regex pattern: {old_content}"
+                )
             
-            file_path.write_text(new_content_str)
+            if not result.replacements:
+                return ToolResult(
+                    success=False,
+                    content="",
+                    error=f"No occurrences of old_content found in file: {path}"
+                )
+            
+            lines = ", ".join(str(line) for line in result.lines)
+            if len(result.lines) < result.replacements:
+                lines += ", ..."
+            match_kind = "regex matches" if result.mode == "regex" else "occurrences"
+            
+            if dry_run:
+                content = f"Would replace {result.replacements} {match_kind} in file: {path} (lines {lines})\n\n{result.diff}"
+            else:
+                content = f"Replaced {result.replacements} {match_kind} in file: {path} (lines {lines})"
             
             return ToolResult(
                 success=True,
-                content=f"Replaced content in file: {path}",
+                content=content,
                 error=None
             )
         except Exception as e:
@@ -246,7 +389,10 @@ class BuiltinTools:
         """Register the list_files tool."""
         tool_manager.register_tool(
             name="list_files",
-            description="List files and directories in a path",
+            description=(
+                "List files and directories in a path (directories end with '/'). Results are paginated: "
+                "when more entries exist, the output ends with a cursor to pass back for the next page."
+            ),
             parameters={
                 "path": {
                     "type": "string",
@@ -262,12 +408,53 @@ class BuiltinTools:
                     "type": "string",
                     "description": "File pattern to filter (e.g., '*.py')",
                     "required": False
+                },
+                "depth": {
+                    "type": "integer",
+                    "description": "Maximum depth when listing recursively (1 = direct children only)",
+                    "required": False
+                },
+                "max_entries": {
+                    "type": "integer",
+                    "description": f"Maximum number of entries to return (default {LIST_FILES_PAGE_SIZE})",
+                    "required": False
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "Number of entries to skip",
+                    "required": False
+                },
+                "cursor": {
+                    "type": "string",
+                    "description": "Continue after this entry (the cursor from the previous page)",
+                    "required": False
+                },
+                "details": {
+                    "type": "boolean",
+                    "description": "Include type, size and modification time for each entry",
+                    "required": False
+                },
+                "include_ignored": {
+                    "type": "boolean",
+                    "description": "Include paths ignored by .gitignore",
+                    "required": False
                 }
             },
             executor=self._list_files
         )
     
-    async def _list_files(self, path: str, recursive: bool = False, pattern: str = None) -> ToolResult:
+    async def _list_files(
+        self,
+        path: str,
+        recursive: bool = False,
+        pattern: str = None,
+        depth: int = None,
+        max_entries: int = LIST_FILES_PAGE_SIZE,
+        offset: int = 0,
+        cursor: str = None,
+        details: bool = False,
+        include_ignored: bool = False
+    ) -> ToolResult:
         """List files and directories."""
         try:
             base_path = Path(path)
@@ -285,19 +472,18 @@ class BuiltinTools:
                     error=f"Path is not a directory: {path}"
                 )
             
-            files = []
-            if recursive:
-                if pattern:
-                    files = [str(p.relative_to(base_path)) for p in base_path.rglob(pattern)]
-                else:
-                    files = [str(p.relative_to(base_path)) for p in base_path.rglob('*') if p.is_file()]
-            else:
-                if pattern:
-                    files = [str(p.name) for p in base_path.glob(pattern)]
-                else:
-                    files = [str(p.name) for p in base_path.iterdir()]
-            
-            content = "\n".join(sorted(files))
+            max_depth = (int(depth) if depth else None) if recursive else 1
+            content = await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+                self._list_page,
+                path,
+                max_depth,
+                pattern,
+                max(1, int(max_entries)),
+                max(0, int(offset or 0)),
+                cursor,
+                details,
+                not include_ignored
+            ))
             return ToolResult(
                 success=True,
                 content=content,
@@ -310,11 +496,57 @@ class BuiltinTools:
                 error=str(e)
             )
     
+    def _list_page(
+        self,
+        path: str,
+        max_depth: int,
+        pattern: str,
+        max_entries: int,
+        offset: int,
+        cursor: str,
+        details: bool,
+        use_ignore: bool
+    ) -> str:
+        """Walk just far enough to produce one page of entries."""
+        lines = []
+        last_path = None
+        has_more = False
+        skipped = 0
+        
+        for rel_path, entry, is_dir in iter_entries(path, max_depth, use_ignore, after=cursor):
+            if pattern and not fnmatch.fnmatch(entry.name, pattern):
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            if len(lines) >= max_entries:
+                has_more = True
+                break
+            
+            display = rel_path + "/" if is_dir else rel_path
+            if details:
+                try:
+                    stat = entry.stat(follow_symlinks=False)
+                    kind = "l" if entry.is_symlink() else ("d" if is_dir else "f")
+                    modified = time.strftime("%Y-%m-%d %H:%M", time.localtime(stat.st_mtime))
+                    display = f"{kind} {stat.st_size:>12} {modified} {display}"
+                except OSError:
+                    display = f"? {'':>12} {'':16} {display}"
+            lines.append(display)
+            last_path = rel_path
+        
+        if has_more:
+            lines.append(f'[More entries available; call again with cursor="{last_path}"]')
+        return "\n".join(lines)
+    
     def _register_search_files(self, tool_manager: ToolManager):
         """Register the search_files tool."""
         tool_manager.register_tool(
             name="search_files",
-            description="Search for files or content in files",
+            description=(
+                "Search for files by name, or search file contents and get matching lines with "
+                "line numbers and context. Skips binary files and paths ignored by .gitignore."
+            ),
             parameters={
                 "pattern": {
                     "type": "string",
@@ -340,56 +572,167 @@ class BuiltinTools:
                     "type": "boolean",
                     "description": "Whether to search file content instead of filenames",
                     "required": False
+                },
+                "regex": {
+                    "type": "boolean",
+                    "description": "Treat the pattern as a regular expression when searching content",
+                    "required": False
+                },
+                "case_sensitive": {
+                    "type": "boolean",
+                    "description": "Whether content matching is case sensitive (default true)",
+                    "required": False
+                },
+                "context_lines": {
+                    "type": "integer",
+                    "description": "Lines of context to show around each content match (default 2)",
+                    "required": False
+                },
+                "max_results": {
+                    "type": "integer",
+                    "description": "Maximum number of matches to return (default 100)",
+                    "required": False
                 }
             },
             executor=self._search_files
         )
     
-    async def _search_files(self, pattern: str, path: str, recursive: bool = True, file_pattern: str = None, search_content: bool = False) -> ToolResult:
+    async def _search_files(
+        self,
+        pattern: str,
+        path: str,
+        recursive: bool = True,
+        file_pattern: str = None,
+        search_content: bool = False,
+        regex: bool = False,
+        case_sensitive: bool = True,
+        context_lines: int = 2,
+        max_results: int = 100
+    ) -> ToolResult:
         """Search for files or content."""
         try:
-            base_path = Path(path)
-            if not base_path.exists():
+            if not os.path.exists(path):
                 return ToolResult(
                     success=False,
                     content="",
                     error=f"Path not found: {path}"
                 )
             
-            results = []
+            context_lines = max(0, int(context_lines))
+            max_results = max(1, int(max_results))
+            loop = asyncio.get_running_loop()
             
+            # The walk and scan are blocking, so they run off the event loop
             if search_content:
-                # Search file content
-                search_files = base_path.rglob(file_pattern or '*') if recursive else base_path.glob(file_pattern or '*')
-                
-                for file_path in search_files:
-                    if file_path.is_file():
-                        try:
-                            content = file_path.read_text()
-                            if pattern in content:
-                                results.append(str(file_path))
-                        except (UnicodeDecodeError, PermissionError):
-                            continue
+                result = await loop.run_in_executor(None, functools.partial(
+                    self._search_content,
+                    path,
+                    pattern,
+                    regex=regex,
+                    case_sensitive=case_sensitive,
+                    file_pattern=file_pattern,
+                    recursive=recursive,
+                    context_lines=context_lines,
+                    max_results=max_results
+                ))
+                content = result.format()
             else:
-                # Search filenames
-                search_files = base_path.rglob('*') if recursive else base_path.iterdir()
-                
-                for file_path in search_files:
-                    if file_path.is_file():
-                        if file_pattern and not file_path.match(file_pattern):
-                            continue
-                        if pattern in str(file_path):
-                            results.append(str(file_path))
+                paths, truncated = await loop.run_in_executor(None, functools.partial(
+                    self.search_engine.search_names,
+                    path,
+                    pattern,
+                    file_pattern=file_pattern,
+                    recursive=recursive,
+                    max_results=max_results
+                ))
+                content = "\n".join(paths)
+                if truncated:
+                    content += f"\n\n[Results capped at {max_results} files; narrow the search to see more]"
             
-            content = "\n".join(sorted(results))
             return ToolResult(
                 success=True,
                 content=content,
                 error=None
             )
+        except re.error as e:
+            return ToolResult(
+                success=False,
+                content="",
+                error=f"Invalid regular expression: {e}"
+            )
         except Exception as e:
             return ToolResult(
                 success=False,
                 content="",
                 error=str(e)
             )
+    
+    def _search_content(self, path: str, pattern: str, regex: bool, file_pattern: str, recursive: bool, **options) -> SearchResult:
+        """Search file contents, narrowing to index candidates when the path is indexed."""
+        candidates = None
+        found = self.index_manager.find(path) if not regex and os.path.isdir(path) else None
+        
+        if found:
+            index, prefix = found
+            index.refresh(self.index_refresh)
+            indexed = index.candidates(pattern, prefix)
+            if indexed is not None:
+                # Candidates are relative to the index root; make them relative to the search path
+                strip = len(prefix) + 1 if prefix else 0
+                candidates = []
+                for rel_path in indexed:
+                    rel_path = rel_path[strip:]
+                    if not recursive and "/" in rel_path:
+                        continue
+                    if file_pattern and not fnmatch.fnmatch(os.path.basename(rel_path), file_pattern):
+                        continue
+                    candidates.append(rel_path)
+        
+        return self.search_engine.search(
+            path,
+            pattern,
+            regex=regex,
+            file_pattern=file_pattern,
+            recursive=recursive,
+            candidates=candidates,
+            **options
+        )
+    
+    def _register_fetch_tool_output(self, tool_manager: ToolManager):
+        """Register the fetch_tool_output tool."""
+        tool_manager.register_tool(
+            name="fetch_tool_output",
+            description=(
+                "Read more of a tool output that was too large to return in full. "
+                "Use the id given in the truncated output; page with offset/limit or filter lines with pattern."
+            ),
+            parameters={
+                "id": {
+                    "type": "string",
+                    "description": "Id of the saved output",
+                    "required": True
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "Index of the first line (or match) to return (default: 0)",
+                    "required": False
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of lines to return (default: 200)",
+                    "required": False
+                },
+                "pattern": {
+                    "type": "string",
+                    "description": "Only return lines matching this regular expression",
+                    "required": False
+                }
+            },
+            executor=self._fetch_tool_output,
+            spill=False
+        )
+    
+    async def _fetch_tool_output(self, id: str, offset: int = 0, limit: int = 200, pattern: str = None) -> ToolResult:
+        """Page through saved tool output."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self.blob_store.page, id, offset, limit, pattern))
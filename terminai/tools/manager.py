@@ -21,31 +21,53 @@ class ToolDefinition(BaseModel):
     description: str
     parameters: Dict[str, ToolParameter] = Field(default_factory=dict)
     required: List[str] = Field(default_factory=list)
+    spill: bool = True
 
 
 class ToolResult(BaseModel):
-    """Represents the result of a tool execution."""
+    """Represents the result of a tool execution.
+    
+    When output was too large to send in full, ``content`` holds a head/tail
+    preview and the full text is saved under ``blob_id``.
+    """
     success: bool
     content: str
     error: Optional[str] = None
+    truncated: bool = False
+    blob_id: Optional[str] = None
+    total_bytes: Optional[int] = None
+    total_lines: Optional[int] = None
 
 
 class ToolManager:
-    """Manages tool registration and execution."""
+    """Manages tool registration and execution.
+    
+    ``generation`` is bumped whenever a tool is registered or unregistered.
+    Tool definitions, and their compact JSON serialization, are built once
+    per generation and sorted by name, so identical tool sets always produce
+    identical bytes.
+    """
     
-    def __init__(self):
-        """Initialize the tool manager."""
+    def __init__(self, blob_store=None):
+        """Initialize the tool manager, optionally with a BlobStore for oversized output."""
+        self.blob_store = blob_store
         self.tools: Dict[str, ToolDefinition] = {}
         self.executors: Dict[str, Callable[..., Awaitable[ToolResult]]] = {}
+        self.generation = 0
+        self._definitions: Optional[List[Dict[str, Any]]] = None
+        self._definitions_json: Optional[bytes] = None
+        self._serialized: Dict[int, bytes] = {}
+        self._cached_generation = -1
     
     def register_tool(
         self,
         name: str,
         description: str,
         parameters: Dict[str, Dict[str, Any]],
-        executor: Callable[..., Awaitable[ToolResult]]
+        executor: Callable[..., Awaitable[ToolResult]],
+        spill: bool = True
     ):
-        """Register a new tool."""
+        """Register a new tool; with ``spill=False`` its output is never saved to the blob store."""
         tool_def = ToolDefinition(
             name=name,
             description=description,
@@ -53,17 +75,19 @@ class ToolManager:
                 param_name: ToolParameter(**param_def)
                 for param_name, param_def in parameters.items()
             },
-            required=[name for name, param in parameters.items() if param.get("required", True)]
+            required=[name for name, param in parameters.items() if param.get("required", True)],
+            spill=spill
         )
         
         self.tools[name] = tool_def
         self.executors[name] = executor
+        self.generation += 1
         logger.info(f"Registered tool: {name}")
     
-    def get_tool_definitions(self) -> List[Dict[str, Any]]:
-        """Get all tool definitions for LLM consumption."""
+    def _build_definitions(self) -> List[Dict[str, Any]]:
+        """Build the tool definitions in name order."""
         definitions = []
-        for tool_def in self.tools.values():
+        for tool_def in sorted(self.tools.values(), key=lambda tool: tool.name):
             definition = {
                 "type": "function",
                 "function": {
@@ -87,6 +111,47 @@ class ToolManager:
         
         return definitions
     
+    def _refresh_cache(self):
+        """Rebuild the cached definitions if tools changed since they were built."""
+        if self._cached_generation != self.generation:
+            self._definitions = self._build_definitions()
+            # Keyed by identity: the definitions list keeps each dict alive until the next rebuild
+            self._serialized = {
+                id(definition): json.dumps(definition, separators=(",", ":")).encode()
+                for definition in self._definitions
+            }
+            self._definitions_json = b"[" + b",".join(self._serialized[id(d)] for d in self._definitions) + b"]"
+            self._cached_generation = self.generation
+    
+    def get_tool_definitions(self) -> List[Dict[str, Any]]:
+        """Get all tool definitions for LLM consumption.
+        
+        The list is shared between calls until the tools change; callers must
+        not modify it.
+        """
+        self._refresh_cache()
+        return self._definitions
+    
+    def get_tool_definition_json(self, definition: Dict[str, Any]) -> bytes:
+        """Get one definition serialized as compact JSON, reusing the cached bytes when it is one of ours."""
+        self._refresh_cache()
+        serialized = self._serialized.get(id(definition))
+        if serialized is None:
+            serialized = json.dumps(definition, separators=(",", ":")).encode()
+        return serialized
+    
+    def get_tool_definitions_json(self, definitions: Optional[List[Dict[str, Any]]] = None) -> bytes:
+        """Get tool definitions serialized as a compact JSON array.
+        
+        Defaults to every tool. A subset, such as the tools chosen by a
+        ToolSelector, is put in name order and joined from the cached bytes.
+        """
+        self._refresh_cache()
+        if definitions is None:
+            return self._definitions_json
+        ordered = sorted(definitions, key=lambda definition: definition["function"]["name"])
+        return b"[" + b",".join(self.get_tool_definition_json(definition) for definition in ordered) + b"]"
+    
     async def execute_tool(self, name: str, arguments: Dict[str, Any]) -> ToolResult:
         """Execute a tool with given arguments."""
         if name not in self.tools:
@@ -120,6 +185,9 @@ class ToolManager:
             
             # Execute the tool
             result = await self.executors[name](**arguments)
+            if self.blob_store is not None and tool_def.spill:
+                # Large output is saved to disk; the model gets a preview it can page through
+                result = self.blob_store.spill(result)
             return result
             
         except Exception as e:
@@ -136,6 +204,7 @@ class ToolManager:
             del self.tools[name]
             if name in self.executors:
                 del self.executors[name]
+            self.generation += 1
             logger.info(f"Unregistered tool: {name}")
             return True
         return False
@@ -1,8 +1,13 @@
 """MCP tool wrapper for integrating MCP tools with terminai tool system."""
 
+import os
 import json
+import time
+import hashlib
 import logging
-from typing import Dict, Any, List, Optional
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Union
 
 from .manager import ToolManager, ToolResult, ToolDefinition, ToolParameter
 from ..mcp.client import MCPClient
@@ -13,30 +18,139 @@ logger = logging.getLogger(__name__)
 class MCPToolWrapper:
     """Wrapper for integrating MCP tools with terminai tool system."""
     
-    def __init__(self, mcp_client: MCPClient):
-        """Initialize MCP tool wrapper."""
+    def __init__(self, mcp_client: MCPClient, cache_dir: Optional[Union[str, Path]] = None):
+        """Initialize MCP tool wrapper; ``cache_dir`` enables the on-disk tool catalog."""
         self.mcp_client = mcp_client
         self.mcp_tools: Dict[str, Dict[str, Any]] = {}  # tool_name -> {server, definition}
         self.mcp_resources: Dict[str, List[Dict[str, Any]]] = {}  # server -> resources
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
     
-    async def discover_and_register_tools(self, tool_manager: ToolManager, server_name: str):
+    async def discover_and_register_tools(self, tool_manager: ToolManager, server_name: str) -> Dict[str, int]:
         """Discover tools from an MCP server and register them."""
         try:
-            # Get tools from the MCP server
-            tools = await self.mcp_client.list_tools(server_name)
-            
-            for tool in tools:
-                await self._register_mcp_tool(tool_manager, server_name, tool)
-            
-            # Also discover resources and create resource access tools
-            await self._discover_and_register_resources(tool_manager, server_name)
-            
-            logger.info(f"Registered {len(tools)} tools from MCP server: {server_name}")
+            changes = await self.refresh_server_tools(tool_manager, server_name)
+            logger.info(f"Registered {len(self._server_tool_names(server_name))} tools from MCP server: {server_name}")
+            return changes
             
         except Exception as e:
             logger.error(f"Failed to discover tools from MCP server {server_name}: {e}")
+            return {"added": 0, "updated": 0, "removed": 0}
+    
+    @staticmethod
+    def config_hash(server_config: Dict[str, Any]) -> str:
+        """Hash a server configuration into a cache key."""
+        encoded = json.dumps(server_config, sort_keys=True, default=str).encode()
+        return hashlib.sha256(encoded).hexdigest()
+    
+    def _cache_path(self, server_config: Dict[str, Any]) -> Optional[Path]:
+        """Get the catalog cache file for a server configuration."""
+        if not self.cache_dir:
+            return None
+        return self.cache_dir / f"{self.config_hash(server_config)}.json"
+    
+    def load_cached_catalog(self, server_config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Load the cached tool catalog for a server configuration, if any."""
+        path = self._cache_path(server_config)
+        if not path or not path.exists():
+            return None
+        
+        try:
+            with open(path, "r") as f:
+                catalog = json.load(f)
+            if not isinstance(catalog.get("tools"), list) or not isinstance(catalog.get("resources"), list):
+                raise ValueError("malformed catalog")
+            return catalog
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable MCP tool cache {path}: {e}")
+            return None
+    
+    def _save_cached_catalog(
+        self,
+        server_name: str,
+        server_config: Dict[str, Any],
+        tools: List[Dict[str, Any]],
+        resources: List[Dict[str, Any]]
+    ):
+        """Write a server's tool catalog to the cache atomically."""
+        path = self._cache_path(server_config)
+        if not path:
+            return
+        
+        catalog = {
+            "server": server_name,
+            "saved_at": time.time(),
+            "tools": tools,
+            "resources": resources
+        }
+        
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=".catalog-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(catalog, f, default=str)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logger.warning(f"Failed to write MCP tool cache for {server_name}: {e}")
+    
+    def register_from_cache(self, tool_manager: ToolManager, server_name: str, server_config: Dict[str, Any]) -> bool:
+        """Register a server's tools from the on-disk catalog without contacting it."""
+        catalog = self.load_cached_catalog(server_config)
+        if catalog is None:
+            return False
+        
+        self._apply_catalog(tool_manager, server_name, catalog["tools"], catalog["resources"])
+        logger.info(f"Registered {len(catalog['tools'])} cached tools for MCP server: {server_name}")
+        return True
+    
+    def _server_tool_names(self, server_name: str) -> List[str]:
+        """Get the registered MCP tool names belonging to a server."""
+        return [
+            tool_name for tool_name, tool_info in self.mcp_tools.items()
+            if tool_info["server"] == server_name
+        ]
+    
+    def _apply_catalog(
+        self,
+        tool_manager: ToolManager,
+        server_name: str,
+        tools: List[Dict[str, Any]],
+        resources: List[Dict[str, Any]]
+    ) -> Dict[str, int]:
+        """Bring a server's registered tools in line with a catalog, touching only what changed."""
+        changes = {"added": 0, "updated": 0, "removed": 0}
+        
+        wanted = {}
+        for tool in tools:
+            if tool.get("name"):
+                wanted[f"mcp_{server_name}_{tool['name']}"] = tool
+        
+        for tool_name in self._server_tool_names(server_name):
+            if tool_name not in wanted:
+                tool_manager.unregister_tool(tool_name)
+                del self.mcp_tools[tool_name]
+                changes["removed"] += 1
+        
+        for tool_name, tool_def in wanted.items():
+            existing = self.mcp_tools.get(tool_name)
+            if existing is not None and existing["definition"] == tool_def and tool_name in tool_manager.tools:
+                continue
+            self._register_mcp_tool(tool_manager, server_name, tool_def)
+            changes["updated" if existing is not None else "added"] += 1
+        
+        resource_tools = (f"mcp_{server_name}_read_resource", f"mcp_{server_name}_list_resources")
+        before = {name for name in resource_tools if name in tool_manager.tools}
+        self._register_resources(tool_manager, server_name, resources)
+        after = {name for name in resource_tools if name in tool_manager.tools}
+        changes["added"] += len(after - before)
+        changes["removed"] += len(before - after)
+        
+        return changes
     
-    async def _register_mcp_tool(self, tool_manager: ToolManager, server_name: str, tool_def: Dict[str, Any]):
+    def _register_mcp_tool(self, tool_manager: ToolManager, server_name: str, tool_def: Dict[str, Any]):
         """Register a single MCP tool with the tool manager."""
         tool_name = tool_def.get("name")
         if not tool_name:
@@ -170,42 +284,44 @@ class MCPToolWrapper:
             logger.error(f"Error serializing MCP response: {e}")
             return str(result)
     
-    async def _discover_and_register_resources(self, tool_manager: ToolManager, server_name: str):
-        """Discover resources from MCP server and create access tools."""
-        try:
-            resources = await self.mcp_client.list_resources(server_name)
-            self.mcp_resources[server_name] = resources
-            
-            if resources:
-                # Register a general resource access tool for this server
-                tool_name = f"mcp_{server_name}_read_resource"
-                
-                tool_manager.register_tool(
-                    name=tool_name,
-                    description=f"[MCP:{server_name}] Read a resource from {server_name} MCP server",
-                    parameters={
-                        "uri": {
-                            "type": "string",
-                            "description": f"Resource URI to read from {server_name}",
-                            "required": True
-                        }
-                    },
-                    executor=self._create_resource_executor(server_name)
-                )
-                
-                # Also register a tool to list available resources
-                list_tool_name = f"mcp_{server_name}_list_resources"
-                tool_manager.register_tool(
-                    name=list_tool_name,
-                    description=f"[MCP:{server_name}] List available resources from {server_name} MCP server",
-                    parameters={},
-                    executor=self._create_resource_list_executor(server_name)
-                )
-                
-                logger.info(f"Registered resource access tools for {len(resources)} resources from {server_name}")
+    def _register_resources(self, tool_manager: ToolManager, server_name: str, resources: List[Dict[str, Any]]):
+        """Record a server's resources and register or drop the resource access tools."""
+        self.mcp_resources[server_name] = resources
+        tool_name = f"mcp_{server_name}_read_resource"
+        list_tool_name = f"mcp_{server_name}_list_resources"
         
-        except Exception as e:
-            logger.error(f"Failed to discover resources from MCP server {server_name}: {e}")
+        if not resources:
+            tool_manager.unregister_tool(tool_name)
+            tool_manager.unregister_tool(list_tool_name)
+            return
+        
+        if tool_name in tool_manager.tools and list_tool_name in tool_manager.tools:
+            # The list tool reads self.mcp_resources, so nothing to re-register
+            return
+        
+        # Register a general resource access tool for this server
+        tool_manager.register_tool(
+            name=tool_name,
+            description=f"[MCP:{server_name}] Read a resource from {server_name} MCP server",
+            parameters={
+                "uri": {
+                    "type": "string",
+                    "description": f"Resource URI to read from {server_name}",
+                    "required": True
+                }
+            },
+            executor=self._create_resource_executor(server_name)
+        )
+        
+        # Also register a tool to list available resources
+        tool_manager.register_tool(
+            name=list_tool_name,
+            description=f"[MCP:{server_name}] List available resources from {server_name} MCP server",
+            parameters={},
+            executor=self._create_resource_list_executor(server_name)
+        )
+        
+        logger.info(f"Registered resource access tools for {len(resources)} resources from {server_name}")
     
     def _create_resource_executor(self, server_name: str):
         """Create an executor for reading MCP resources."""
@@ -272,21 +388,26 @@ class MCPToolWrapper:
         """Get all discovered MCP resources."""
         return self.mcp_resources.copy()
     
-    async def refresh_server_tools(self, tool_manager: ToolManager, server_name: str):
-        """Refresh tools from a specific MCP server."""
-        # Remove existing tools for this server
-        tools_to_remove = [
-            tool_name for tool_name, tool_info in self.mcp_tools.items()
-            if tool_info["server"] == server_name
-        ]
+    async def refresh_server_tools(self, tool_manager: ToolManager, server_name: str) -> Dict[str, int]:
+        """Sync a server's tools with the live server, applying only the differences.
         
-        for tool_name in tools_to_remove:
-            tool_manager.unregister_tool(tool_name)
-            del self.mcp_tools[tool_name]
+        If the tools cannot be listed, the error propagates and nothing is
+        changed or cached. A failed resource listing keeps the resources
+        already known, since many servers do not offer resources at all.
+        """
+        tools = await self.mcp_client.list_tools(server_name)
+        try:
+            resources = await self.mcp_client.list_resources(server_name)
+        except Exception as e:
+            logger.warning(f"Could not list resources from MCP server {server_name}: {e}")
+            resources = self.mcp_resources.get(server_name, [])
+        
+        changes = self._apply_catalog(tool_manager, server_name, tools, resources)
+        if any(changes.values()):
+            logger.info(f"Updated tools from MCP server {server_name}: {changes}")
         
-        # Remove resources
-        if server_name in self.mcp_resources:
-            del self.mcp_resources[server_name]
+        connection = self.mcp_client.connections.get(server_name)
+        if connection is not None:
+            self._save_cached_catalog(server_name, connection.config, tools, resources)
         
-        # Re-discover and register
-        await self.discover_and_register_tools(tool_manager, server_name)
+        return changes
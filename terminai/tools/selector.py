@@ -0,0 +1,209 @@
+"""Relevance-based tool selection: only send the model the tools a request needs."""
+
+import re
+import json
+import math
+import logging
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from pydantic import BaseModel
+
+from ..llm.context import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+
+# Words that say nothing about which tool is wanted
+STOP_WORDS = frozenset({
+    "a", "an", "the", "please", "can", "could", "would", "you", "me", "my", "i", "we", "to", "of",
+    "for", "in", "on", "at", "it", "this", "that", "is", "are", "be", "and", "or", "with", "from",
+    "by", "as", "if", "all", "any", "some", "do", "does", "mcp",
+})
+
+# Tools always sent, whatever the request
+DEFAULT_PINNED = ("execute_command", "read_file", "list_files", "search_files", "fetch_tool_output")
+
+# How much a word counts depending on where it appears
+FIELD_WEIGHTS = {"name": 3, "parameters": 2, "description": 1}
+
+
+def _serialize(definition: Dict[str, Any]) -> bytes:
+    """Serialize a tool definition as compact JSON."""
+    return json.dumps(definition, separators=(",", ":")).encode()
+
+
+def _normalize(word: str) -> str:
+    """Strip a plural or verb suffix so 'files' matches 'file' and 'listing' matches 'list'."""
+    if word.endswith("ss"):
+        return word
+    for suffix in ("ing", "ed", "s"):
+        if len(word) - len(suffix) >= 3 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text, including snake_case, kebab-case and camelCase names, into normalized words."""
+    words = (word.lower() for word in _WORD.findall(text))
+    return [_normalize(word) for word in words if word not in STOP_WORDS]
+
+
+class ToolSelection(BaseModel):
+    """The tools chosen for one request and what leaving the rest out saved."""
+    tools: List[Dict[str, Any]]
+    selected: List[str]
+    scores: Dict[str, float] = {}
+    total: int = 0
+    tokens_sent: int = 0
+    tokens_saved: int = 0
+
+
+class ToolSelector:
+    """Scores tools against a request with BM25 and keeps the best ``top_k`` plus a pinned set.
+
+    Each tool is indexed as a document made of its name, parameter names
+    and description, with name and parameter words weighted more heavily.
+    The index is rebuilt only when the set of tool definitions changes: pass
+    the ToolManager's ``generation`` to skip comparing the definitions.
+    Pass its ``get_tool_definition_json`` as ``serialize`` to size the tools
+    from the bytes it already holds.
+    """
+
+    def __init__(
+        self,
+        top_k: int = 8,
+        pinned: Optional[List[str]] = None,
+        k1: float = 1.5,
+        b: float = 0.75,
+        serialize: Optional[Callable[[Dict[str, Any]], bytes]] = None
+    ):
+        """Initialize the selector."""
+        self.top_k = top_k
+        self.pinned = list(DEFAULT_PINNED if pinned is None else pinned)
+        self.k1 = k1
+        self.b = b
+        self.serialize = serialize or _serialize
+        self.enabled = True
+        self.requests = 0
+        self.tokens_sent = 0
+        self.tokens_saved = 0
+        self._signature: Optional[Tuple] = None
+        self._documents: List[Dict[str, int]] = []
+        self._lengths: List[int] = []
+        self._idf: Dict[str, float] = {}
+        self._tokens: List[int] = []
+
+    @staticmethod
+    def _document(definition: Dict[str, Any]) -> Dict[str, int]:
+        """Get the weighted term frequencies of a tool definition."""
+        function = definition["function"]
+        fields = {
+            "name": function["name"],
+            "parameters": " ".join(function.get("parameters", {}).get("properties", {})),
+            "description": function.get("description", ""),
+        }
+        terms: Dict[str, int] = {}
+        for field, text in fields.items():
+            for word in tokenize(text):
+                terms[word] = terms.get(word, 0) + FIELD_WEIGHTS[field]
+        return terms
+
+    def _index(self, definitions: List[Dict[str, Any]], generation: Optional[int] = None):
+        """Build the BM25 statistics for a set of tool definitions, unless already built."""
+        if generation is not None:
+            signature: Tuple = ("generation", generation)
+        else:
+            signature = tuple(
+                (definition["function"]["name"], definition["function"].get("description", ""))
+                for definition in definitions
+            )
+        if signature == self._signature:
+            return
+
+        self._documents = [self._document(definition) for definition in definitions]
+        self._lengths = [sum(terms.values()) for terms in self._documents]
+        self._tokens = [estimate_tokens(self.serialize(definition)) for definition in definitions]
+
+        document_frequency: Dict[str, int] = {}
+        for terms in self._documents:
+            for word in terms:
+                document_frequency[word] = document_frequency.get(word, 0) + 1
+        count = len(self._documents)
+        self._idf = {
+            word: math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+            for word, frequency in document_frequency.items()
+        }
+        self._signature = signature
+
+    def score(self, query: str, definitions: List[Dict[str, Any]], generation: Optional[int] = None) -> List[float]:
+        """Get the BM25 score of every definition for a query."""
+        self._index(definitions, generation)
+        words = set(tokenize(query))
+        if not self._documents:
+            return []
+        average_length = sum(self._lengths) / len(self._lengths) or 1.0
+
+        scores = []
+        for terms, length in zip(self._documents, self._lengths):
+            score = 0.0
+            for word in words:
+                frequency = terms.get(word)
+                if frequency:
+                    norm = self.k1 * (1 - self.b + self.b * length / average_length)
+                    score += self._idf[word] * frequency * (self.k1 + 1) / (frequency + norm)
+            scores.append(score)
+        return scores
+
+    def select(
+        self,
+        query: str,
+        definitions: List[Dict[str, Any]],
+        generation: Optional[int] = None,
+        keep: Optional[List[str]] = None
+    ) -> ToolSelection:
+        """Choose the pinned tools, any ``keep`` tools and the ``top_k`` best matches for a request.
+
+        ``keep`` names tools to send whatever the query, such as those already
+        called earlier in the conversation. Tools with no matching words are
+        never chosen for their rank alone. Selected tools keep their original
+        order, but the subset changes from request to request, so pruning
+        gives up provider-side prompt caching of the tool list.
+        """
+        scores = self.score(query, definitions, generation)
+        names = [definition["function"]["name"] for definition in definitions]
+
+        if not self.enabled or len(definitions) <= self.top_k + len(self.pinned):
+            chosen = set(range(len(definitions)))
+        else:
+            ranked = sorted((i for i, score in enumerate(scores) if score > 0), key=lambda i: -scores[i])
+            chosen = set(ranked[:self.top_k])
+            always = set(self.pinned) | set(keep or ())
+            chosen.update(i for i, name in enumerate(names) if name in always)
+
+        order = sorted(chosen)
+        tokens_sent = sum(self._tokens[i] for i in order)
+        selection = ToolSelection(
+            tools=[definitions[i] for i in order],
+            selected=[names[i] for i in order],
+            scores={names[i]: round(scores[i], 3) for i in order if scores[i] > 0},
+            total=len(definitions),
+            tokens_sent=tokens_sent,
+            tokens_saved=sum(self._tokens) - tokens_sent
+        )
+
+        self.requests += 1
+        self.tokens_sent += selection.tokens_sent
+        self.tokens_saved += selection.tokens_saved
+        logger.debug(f"Selected {len(order)} of {len(definitions)} tools, saving ~{selection.tokens_saved} tokens")
+        return selection
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the settings and this session's savings."""
+        return {
+            "enabled": self.enabled,
+            "top_k": self.top_k,
+            "pinned": list(self.pinned),
+            "requests": self.requests,
+            "tokens_sent": self.tokens_sent,
+            "tokens_saved": self.tokens_saved,
+        }
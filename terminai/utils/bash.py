@@ -1,21 +1,93 @@
 """Bash command execution utilities."""
 
 import os
+import signal
+import asyncio
+import codecs
 import subprocess
 import shlex
 import re
-from typing import List, Tuple, Optional
+from collections import deque
+from typing import List, Tuple, Optional, Callable
 import logging
 
+from .classifier import Classification, CommandClassifier
+from .path_index import ExecutableIndex
+
 logger = logging.getLogger(__name__)
 
+# Read size for subprocess pipes
+_CHUNK_SIZE = 64 * 1024
+
+
+class OutputBuffer:
+    """Keeps the first and last bytes of a stream within a fixed budget.
+    
+    The head is kept verbatim; the tail is a ring of recent chunks, so memory
+    stays bounded no matter how much output a command produces.
+    """
+    
+    def __init__(self, max_bytes: int = 64 * 1024):
+        """Initialize the buffer with a total byte budget."""
+        self.head_limit = max_bytes // 2
+        self.tail_limit = max_bytes - self.head_limit
+        self.head = bytearray()
+        self.tail: deque = deque()
+        self.tail_size = 0
+        self.total_bytes = 0
+    
+    def write(self, data: bytes):
+        """Append data to the buffer."""
+        self.total_bytes += len(data)
+        
+        if len(self.head) < self.head_limit:
+            room = self.head_limit - len(self.head)
+            self.head += data[:room]
+            data = data[room:]
+        
+        if not data or self.tail_limit <= 0:
+            return
+        
+        self.tail.append(data)
+        self.tail_size += len(data)
+        while self.tail_size - len(self.tail[0]) >= self.tail_limit:
+            self.tail_size -= len(self.tail.popleft())
+    
+    @property
+    def omitted_bytes(self) -> int:
+        """Number of bytes dropped between head and tail."""
+        return max(0, self.total_bytes - self.head_limit - self.tail_limit)
+    
+    def getvalue(self) -> str:
+        """Get the buffered output, marking any omitted middle section."""
+        tail = b"".join(self.tail)
+        if self.tail_size > self.tail_limit:
+            tail = tail[self.tail_size - self.tail_limit:]
+        
+        text = self.head.decode(errors="replace")
+        if self.omitted_bytes:
+            text += f"\n... [{self.omitted_bytes} bytes omitted] ...\n"
+        return text + tail.decode(errors="replace")
+
 
 class BashExecutor:
     """Executes bash commands safely."""
     
-    def __init__(self, shell: str = "/bin/bash"):
+    def __init__(
+        self,
+        shell: str = "/bin/bash",
+        max_output_bytes: int = 64 * 1024,
+        kill_grace_period: float = 2.0,
+        persistent_session: bool = False
+    ):
         """Initialize bash executor."""
         self.shell = shell
+        self.max_output_bytes = max_output_bytes
+        self.kill_grace_period = kill_grace_period
+        self.persistent_session = persistent_session
+        self._session = None
+        self.executable_index = ExecutableIndex()
+        self._classifier: Optional[CommandClassifier] = None
         self.forbidden_patterns = [
             r'rm\s+-rf\s+/$',
             r'rm\s+-rf\s+/\s',
@@ -25,75 +97,13 @@ class BashExecutor:
     
     def is_bash_command(self, text: str) -> bool:
         """Determine if text is a bash command or natural language."""
-        text = text.strip()
-        
-        # First, check for natural language indicators
-        text_lower = text.lower()
-        
-        # Natural language indicators
-        natural_language_indicators = [
-            r'^please\b',  # starts with "please"
-            r'^can you\b',  # starts with "can you"
-            r'^could you\b',  # starts with "could you"
-            r'^would you\b',  # starts with "would you"
-            r'^what\b',  # starts with "what"
-            r'^how\b',  # starts with "how"
-            r'^where\b',  # starts with "where"
-            r'^when\b',  # starts with "when"
-            r'^why\b',  # starts with "why"
-            r'^create a\b',  # starts with "create a"
-            r'^make a\b',  # starts with "make a"
-            r'^write a\b',  # starts with "write a"
-            r'^find all\b',  # starts with "find all"
-            r'^list all\b',  # starts with "list all"
-            r'^show me\b',  # starts with "show me"
-            r'^tell me\b',  # starts with "tell me"
-        ]
-        
-        # Check for natural language indicators
-        for pattern in natural_language_indicators:
-            if re.match(pattern, text_lower):
-                return False
-        
-        # Check for special characters that indicate natural language
-        if text.startswith(('-', '*', '?', '!')):
-            return False
-        
-        # Common bash command patterns - more specific patterns
-        bash_patterns = [
-            r'^[a-zA-Z][a-zA-Z0-9_-]*\s+',  # command with space and arguments
-            r'^[a-zA-Z][a-zA-Z0-9_-]*$',   # single command
-            r'^\.?/',                     # path
-            r'^\.\s+',                    # dot command with space
-            r'^ls\b', r'^cd\b', r'^pwd\b', r'^cat\b', r'^grep\b',
-            r'^find\b', r'^mkdir\b', r'^rm\b', r'^cp\b', r'^mv\b',
-            r'^echo\b', r'^printf\b', r'^head\b', r'^tail\b',
-            r'^wc\b', r'^sort\b', r'^uniq\b', r'^cut\b', r'^awk\b',
-            r'^sed\b', r'^tr\b', r'^xargs\b', r'^tar\b', r'^zip\b',
-            r'^unzip\b', r'^curl\b', r'^wget\b', r'^git\b', r'^docker\b',
-            r'^python\b', r'^python3\b', r'^node\b', r'^npm\b', r'^yarn\b',
-            r'^chmod\b', r'^chown\b', r'^sudo\b', r'^apt\b', r'^apt-get\b',
-            r'^systemctl\b', r'^service\b', r'^journalctl\b',
-        ]
-        
-        # Check if it matches any bash pattern
-        for pattern in bash_patterns:
-            if re.match(pattern, text):
-                return True
-        
-        # Check for pipes, redirects, or other bash operators
-        bash_operators = ['|', '>', '<', '&&', '||', ';', '&', '$', '`', '$(', '${']
-        for op in bash_operators:
-            if op in text:
-                return True
-        
-        # Additional check: if it has articles and natural language structure
-        natural_language_words = ['a', 'an', 'the', 'and', 'or', 'but', 'with', 'for', 'to', 'from', 'in', 'on', 'at', 'by']
-        words = text_lower.split()
-        if len(words) > 3 and any(word in natural_language_words for word in words):
-            return False
-        
-        return False
+        return self.classify_input(text).is_bash
+    
+    def classify_input(self, text: str) -> Classification:
+        """Classify text as a bash command or natural language, with a confidence."""
+        if self._classifier is None:
+            self._classifier = CommandClassifier(self.executable_index)
+        return self._classifier.classify(text.strip())
     
     def is_safe_command(self, command: str) -> Tuple[bool, Optional[str]]:
         """Check if command is safe to execute."""
@@ -158,6 +168,157 @@ class BashExecutor:
         except Exception as e:
             return -1, "", str(e)
     
+    async def execute_command_async(
+        self,
+        command: str,
+        timeout: int = 30,
+        on_output: Optional[Callable[[str, str], None]] = None,
+        max_output_bytes: Optional[int] = None
+    ) -> Tuple[int, str, str]:
+        """Execute a bash command without blocking the event loop.
+        
+        Output lines are passed to ``on_output(stream_name, line)`` as they
+        arrive. Only the head and tail of each stream (up to
+        ``max_output_bytes``) are kept for the returned result. On timeout or
+        cancellation the command's whole process group is killed.
+        """
+        command = command.strip()
+        if not command:
+            return 0, "", ""
+        
+        limit = max_output_bytes or self.max_output_bytes
+        
+        if self.persistent_session:
+            return await self._execute_in_session(command, timeout, on_output, limit)
+        stdout_buffer = OutputBuffer(limit)
+        stderr_buffer = OutputBuffer(limit)
+        
+        try:
+            # New session so the command and its children share a killable process group
+            process = await asyncio.create_subprocess_exec(
+                self.shell, '-c', command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True
+            )
+        except Exception as e:
+            if on_output:
+                on_output("stderr", str(e))
+            return -1, "", str(e)
+        
+        readers = [
+            asyncio.ensure_future(self._read_stream(process.stdout, stdout_buffer, "stdout", on_output)),
+            asyncio.ensure_future(self._read_stream(process.stderr, stderr_buffer, "stderr", on_output)),
+        ]
+        
+        timed_out = False
+        try:
+            await asyncio.wait_for(process.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            timed_out = True
+            await self._kill_process_group(process)
+        except asyncio.CancelledError:
+            await self._kill_process_group(process)
+            for reader in readers:
+                reader.cancel()
+            raise
+        
+        # Drain what is left in the pipes; don't wait on detached children holding them open
+        _, pending = await asyncio.wait(readers, timeout=1.0)
+        for reader in pending:
+            reader.cancel()
+        
+        stdout = stdout_buffer.getvalue()
+        stderr = stderr_buffer.getvalue()
+        
+        if timed_out:
+            message = f"Command timed out after {timeout} seconds"
+            if on_output:
+                on_output("stderr", message)
+            return -1, stdout, f"{stderr}\n{message}" if stderr else message
+        
+        return process.returncode, stdout, stderr
+    
+    async def _execute_in_session(
+        self,
+        command: str,
+        timeout: int,
+        on_output: Optional[Callable[[str, str], None]],
+        max_output_bytes: int
+    ) -> Tuple[int, str, str]:
+        """Run a command in the persistent shell session."""
+        if self._session is None:
+            from .shell_session import ShellSession
+            self._session = ShellSession(self.shell, kill_grace_period=self.kill_grace_period)
+        
+        result = await self._session.run(command, timeout, on_output, max_output_bytes)
+        
+        # Follow the session's `cd` so relative paths in file tools resolve the same way
+        if self._session.cwd != os.getcwd():
+            try:
+                os.chdir(self._session.cwd)
+            except OSError as e:
+                logger.warning(f"Could not follow shell session to {self._session.cwd}: {e}")
+        
+        return result
+    
+    async def close(self):
+        """Stop the persistent shell session, if one is running."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    async def _read_stream(
+        self,
+        stream: asyncio.StreamReader,
+        buffer: OutputBuffer,
+        name: str,
+        on_output: Optional[Callable[[str, str], None]]
+    ):
+        """Read a subprocess pipe in chunks, buffering and emitting complete lines."""
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        pending = ""
+        
+        while True:
+            data = await stream.read(_CHUNK_SIZE)
+            if not data:
+                break
+            
+            buffer.write(data)
+            if on_output:
+                pending += decoder.decode(data)
+                *lines, pending = pending.split("\n")
+                for line in lines:
+                    on_output(name, line)
+        
+        if on_output:
+            pending += decoder.decode(b"", final=True)
+            if pending:
+                on_output(name, pending)
+    
+    async def _kill_process_group(self, process: asyncio.subprocess.Process):
+        """Terminate a command's whole process group, escalating to SIGKILL."""
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return
+        except OSError as e:
+            logger.warning(f"Failed to signal process group {process.pid}: {e}")
+            return
+        
+        try:
+            await asyncio.wait_for(process.wait(), timeout=self.kill_grace_period)
+        except asyncio.TimeoutError:
+            pass
+        
+        # Anything left in the group, including children ignoring SIGTERM, is killed outright
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        
+        await process.wait()
+    
     def get_command_suggestion(self, natural_language: str) -> str:
         """Convert natural language to a bash command suggestion."""
         # This is a simple fallback - the actual conversion is done by LLM
@@ -0,0 +1,124 @@
+"""Classifies terminal input as a bash command or natural language in a single pass."""
+
+import re
+import logging
+from typing import Optional
+from pydantic import BaseModel
+
+from .path_index import ExecutableIndex, SHELL_BUILTINS
+
+logger = logging.getLogger(__name__)
+
+BASH = "bash"
+NATURAL_LANGUAGE = "natural_language"
+
+# Openings that mark a request to the assistant even when the first word is a command
+NATURAL_LANGUAGE_PREFIXES = [
+    "please", "can you", "could you", "would you", "what", "how", "where", "when", "why",
+    "create a", "make a", "write a", "find all", "list all", "show me", "tell me",
+]
+
+# Commands treated as bash even on machines where they are not installed
+COMMON_COMMANDS = frozenset({
+    "ls", "cd", "pwd", "cat", "grep", "find", "mkdir", "rm", "cp", "mv", "echo", "printf",
+    "head", "tail", "wc", "sort", "uniq", "cut", "awk", "sed", "tr", "xargs", "tar", "zip",
+    "unzip", "curl", "wget", "git", "docker", "python", "python3", "node", "npm", "yarn",
+    "chmod", "chown", "sudo", "apt", "apt-get", "systemctl", "service", "journalctl",
+})
+
+# Words that make a run of plain words read as prose
+NATURAL_LANGUAGE_WORDS = frozenset({
+    "a", "an", "the", "and", "or", "but", "with", "for", "to", "from", "in", "on", "at", "by",
+    "this", "that", "these", "those", "my", "me", "is", "are", "it",
+})
+
+# Everything about the start of the input is decided by this one match
+_PREFIX_PATTERN = (
+    r"\s*(?:"
+    r"(?P<natural>(?i:{prefixes})\b)"
+    r"|(?P<marker>[-*?!])"
+    r"|(?P<path>\.?\.?/|~/|\.\s)"
+    r"|(?P<assignment>[A-Za-z_][A-Za-z0-9_]*=)"
+    r"|(?P<word>[^\s|&;<>()$`'\"\\]+)"
+    r"|(?P<syntax>[$`(\"'{\\])"
+    r")"
+)
+
+# Shell syntax anywhere in the input: operators, expansions, quoting, flags, paths
+_SHELL_SYNTAX = re.compile(r"[|<>;&$`]|(?:^|\s)--?[A-Za-z0-9]|[~./][\w.-]*/|\\\s")
+
+
+class Classification(BaseModel):
+    """How a line of input was classified."""
+    kind: str  # BASH or NATURAL_LANGUAGE
+    confidence: float  # 0.0 - 1.0
+    reason: str
+    command: Optional[str] = None  # first word, when the input starts with one
+
+    @property
+    def is_bash(self) -> bool:
+        """Whether the input should run as a bash command."""
+        return self.kind == BASH
+
+
+class CommandClassifier:
+    """Single-pass classifier deciding whether input is a bash command.
+
+    The input's opening is classified by one precompiled alternation regex;
+    a first word is then looked up among shell builtins and the executables
+    on $PATH, so real installed commands are recognised however they are named.
+    """
+
+    def __init__(self, executable_index: Optional[ExecutableIndex] = None):
+        """Compile the classifier's patterns."""
+        prefixes = "|".join(
+            r"\s+".join(re.escape(word) for word in prefix.split())
+            for prefix in sorted(NATURAL_LANGUAGE_PREFIXES, key=len, reverse=True)
+        )
+        self._prefix = re.compile(_PREFIX_PATTERN.replace("{prefixes}", prefixes))
+        self.executables = executable_index or ExecutableIndex()
+
+    def is_known_command(self, word: str) -> bool:
+        """Check if a word names a builtin, a common command or an executable on PATH."""
+        return word in SHELL_BUILTINS or word in COMMON_COMMANDS or word in self.executables
+
+    def classify(self, text: str) -> Classification:
+        """Classify one line of input."""
+        match = self._prefix.match(text)
+        if match is None:
+            return Classification(kind=NATURAL_LANGUAGE, confidence=0.5, reason="empty input")
+
+        group = match.lastgroup
+        if group == "natural":
+            return Classification(kind=NATURAL_LANGUAGE, confidence=0.95, reason="starts like a request")
+        if group == "marker":
+            return Classification(kind=NATURAL_LANGUAGE, confidence=0.9, reason="starts with a marker character")
+        if group == "path":
+            return Classification(kind=BASH, confidence=0.95, reason="starts with a path")
+        if group == "assignment":
+            return Classification(kind=BASH, confidence=0.9, reason="starts with a variable assignment")
+        if group == "syntax":
+            return Classification(kind=BASH, confidence=0.8, reason="starts with shell syntax")
+
+        word = match.group("word")
+        rest = text[match.end():]
+        words = rest.split()
+        syntax = _SHELL_SYNTAX.search(rest) is not None
+        prose = not syntax and len(words) >= 3 and any(w.lower() in NATURAL_LANGUAGE_WORDS for w in words)
+
+        if self.is_known_command(word):
+            return Classification(
+                kind=BASH,
+                confidence=0.7 if prose else 0.95,
+                reason="known command",
+                command=word
+            )
+        if "/" in word:
+            return Classification(kind=BASH, confidence=0.9, reason="starts with a path", command=word)
+        if syntax:
+            return Classification(kind=BASH, confidence=0.8, reason="uses shell syntax", command=word)
+        if prose:
+            return Classification(kind=NATURAL_LANGUAGE, confidence=0.8, reason="reads as prose", command=word)
+        if len(words) >= 2:
+            return Classification(kind=NATURAL_LANGUAGE, confidence=0.6, reason="unknown command with plain words", command=word)
+        return Classification(kind=BASH, confidence=0.5, reason="unknown command", command=word)
@@ -0,0 +1,217 @@
+"""Tab completion for the terminai prompt: commands, ! commands and paths."""
+
+import os
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .path_index import ExecutableIndex, SHELL_BUILTINS
+
+logger = logging.getLogger(__name__)
+
+# Characters that separate the word being completed; '/' and '!' are kept inside words
+COMPLETER_DELIMS = " \t\n\"'`;|&<>()="
+
+# Tokens after which the next word is a command again
+_COMMAND_SEPARATORS = ("|", "||", "&&", ";", "&", "(")
+
+_END = ""  # key marking the end of a word in a trie node
+
+
+class PrefixTrie:
+    """Character trie supporting incremental inserts, removals and prefix listing."""
+
+    def __init__(self, words: Iterable[str] = ()):
+        """Initialize the trie with some words."""
+        self.root: Dict[str, dict] = {}
+        self.size = 0
+        for word in words:
+            self.insert(word)
+
+    def insert(self, word: str):
+        """Add a word."""
+        node = self.root
+        for char in word:
+            node = node.setdefault(char, {})
+        if _END not in node:
+            node[_END] = {}
+            self.size += 1
+
+    def remove(self, word: str):
+        """Remove a word, pruning nodes that become empty."""
+        path = []
+        node = self.root
+        for char in word:
+            child = node.get(char)
+            if child is None:
+                return
+            path.append((node, char))
+            node = child
+        if _END not in node:
+            return
+        del node[_END]
+        self.size -= 1
+        for parent, char in reversed(path):
+            if parent[char]:
+                break
+            del parent[char]
+
+    def __contains__(self, word: str) -> bool:
+        """Check whether a word is in the trie."""
+        node = self.root
+        for char in word:
+            node = node.get(char)
+            if node is None:
+                return False
+        return _END in node
+
+    def complete(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        """List words starting with ``prefix`` in sorted order, up to ``limit``."""
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+
+        results: List[str] = []
+        stack: List[Tuple[str, dict]] = [(prefix, node)]
+        while stack:
+            word, node = stack.pop()
+            if _END in node:
+                results.append(word)
+                if limit is not None and len(results) >= limit:
+                    break
+            # Push in reverse so the smallest child is visited first
+            for char in sorted((c for c in node if c != _END), reverse=True):
+                stack.append((word + char, node[char]))
+        return results
+
+
+class PathCompleter:
+    """Completes filesystem paths from cached directory listings.
+
+    A directory is listed the first time it is completed in and only listed
+    again once its mtime changes, so repeated keystrokes cost one stat.
+    """
+
+    def __init__(self, max_cached_dirs: int = 64):
+        """Initialize the completer."""
+        self.max_cached_dirs = max_cached_dirs
+        self._listings: Dict[str, Tuple[int, List[Tuple[str, bool]]]] = {}
+
+    def _list(self, directory: str) -> List[Tuple[str, bool]]:
+        """Get sorted (name, is_dir) entries of a directory, from cache when unchanged."""
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            return []
+
+        cached = self._listings.get(directory)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        entries = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        entries.append((entry.name, entry.is_dir()))
+                    except OSError:
+                        continue
+        except OSError:
+            return []
+        entries.sort()
+
+        if len(self._listings) >= self.max_cached_dirs:
+            self._listings.pop(next(iter(self._listings)))
+        self._listings[directory] = (mtime, entries)
+        return entries
+
+    def complete(self, text: str) -> List[str]:
+        """Complete a path; directories get a trailing '/'."""
+        head, _, partial = text.rpartition("/")
+        if "/" in text:
+            head += "/"
+        directory = os.path.expanduser(head) if head else "."
+
+        matches = []
+        for name, is_dir in self._list(directory):
+            if not name.startswith(partial):
+                continue
+            # Hidden entries only when asked for
+            if name.startswith(".") and not partial.startswith("."):
+                continue
+            matches.append(head + name + ("/" if is_dir else ""))
+        return matches
+
+
+class CommandCompleter:
+    """Completes the prompt line the way bash would, plus terminai's ! commands.
+
+    Command names come from a prefix trie of shell builtins and $PATH
+    executables, which is updated incrementally (only the names that changed)
+    whenever the executable index reports a change.
+    """
+
+    def __init__(
+        self,
+        executable_index: Optional[ExecutableIndex] = None,
+        special_commands: Optional[Dict[str, List[str]]] = None
+    ):
+        """Initialize with the ! commands and their subcommands (without the '!')."""
+        self.executables = executable_index or ExecutableIndex()
+        self.special_commands = special_commands or {}
+        self.special_trie = PrefixTrie("!" + name for name in self.special_commands)
+        self.paths = PathCompleter()
+        self._commands = PrefixTrie(SHELL_BUILTINS)
+        self._executables: Set[str] = set()
+        self._version = -1
+        self._lock = threading.Lock()
+        self._matches: List[str] = []
+
+    def sync(self):
+        """Bring the command trie up to date with the executable index."""
+        self.executables.refresh()
+        if self.executables.version == self._version:
+            return
+        with self._lock:
+            version = self.executables.version
+            current = set(self.executables.names())
+            for name in self._executables - current:
+                if name not in SHELL_BUILTINS:
+                    self._commands.remove(name)
+            for name in current - self._executables:
+                self._commands.insert(name)
+            self._executables = current
+            self._version = version
+
+    def complete(self, line: str, begidx: int, endidx: int) -> List[str]:
+        """Get completions for the word at ``line[begidx:endidx]``."""
+        text = line[begidx:endidx]
+        before = line[:begidx].split()
+
+        if line.lstrip().startswith("!"):
+            if not before:
+                return self.special_trie.complete(text)
+            if len(before) == 1:
+                subcommands = self.special_commands.get(before[0][1:].lower(), [])
+                return [name for name in subcommands if name.startswith(text)]
+            return self.paths.complete(text)
+
+        command_position = not before or before[-1] in _COMMAND_SEPARATORS or line[:begidx].rstrip().endswith(_COMMAND_SEPARATORS)
+        if command_position and "/" not in text and not text.startswith(("~", ".")):
+            self.sync()
+            with self._lock:
+                return self._commands.complete(text)
+        return self.paths.complete(text)
+
+    def readline_completer(self, text: str, state: int) -> Optional[str]:
+        """Completer function for ``readline.set_completer``."""
+        if state == 0:
+            import readline
+            try:
+                self._matches = self.complete(readline.get_line_buffer(), readline.get_begidx(), readline.get_endidx())
+            except Exception as e:
+                logger.debug(f"Completion failed: {e}")
+                self._matches = []
+        return self._matches[state] if state < len(self._matches) else None
@@ -0,0 +1,207 @@
+"""Ranged file reads through mmap with cached sparse line-offset indexes."""
+
+import os
+import mmap
+import bisect
+import logging
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Optional, Tuple
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class FileSlice(BaseModel):
+    """A piece of a file and where it came from."""
+    content: str
+    file_size: int
+    offset: int
+    end_offset: int
+    start_line: Optional[int] = None  # 1-based, when known
+    end_line: Optional[int] = None  # 1-based inclusive, when known
+    truncated: bool = False  # cut short by max_bytes
+
+
+class LineIndex:
+    """Sparse line-offset index: the number of newlines before each fixed-size block.
+
+    Finding a line costs a binary search plus a scan of at most one block, and
+    the index is only extended as far as the furthest line requested so far.
+    Indexes are shared between reads, so extending and searching hold a lock.
+    """
+
+    def __init__(self, size: int, block_size: int):
+        """Initialize an empty index for a file of ``size`` bytes."""
+        self.size = size
+        self.block_size = block_size
+        self.counts = array("Q", [0])  # counts[i] = newlines in [0, i * block_size)
+        self._lock = threading.Lock()
+
+    def _extend(self, mm: mmap.mmap, line: int):
+        """Index blocks until the ``line``-th newline is covered or the file ends; call with the lock held."""
+        while self.counts[-1] < line and (len(self.counts) - 1) * self.block_size < self.size:
+            start = (len(self.counts) - 1) * self.block_size
+            self.counts.append(self.counts[-1] + mm[start:start + self.block_size].count(b"\n"))
+
+    def line_offset(self, mm: mmap.mmap, line: int) -> Optional[int]:
+        """Get the byte offset where 0-based ``line`` starts, or None past the end."""
+        if line == 0:
+            return 0
+
+        with self._lock:
+            self._extend(mm, line)
+            if self.counts[-1] < line:
+                return None
+
+            # Block holding the line-th newline; one split finds it within the block
+            block = bisect.bisect_left(self.counts, line) - 1
+            before = self.counts[block]
+        block_start = block * self.block_size
+        chunk = mm[block_start:block_start + self.block_size]
+        remainder = chunk.split(b"\n", line - before)[-1]
+        start = block_start + len(chunk) - len(remainder)
+        return start if start < self.size else None
+
+
+class FileReader:
+    """Reads byte ranges, line ranges, heads and tails of files without loading them whole."""
+
+    def __init__(self, block_size: int = 64 * 1024, max_cached_files: int = 32):
+        """Initialize the reader."""
+        self.block_size = block_size
+        self.max_cached_files = max_cached_files
+        self._indexes: "OrderedDict[str, Tuple[Tuple[int, int, int], LineIndex]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _line_index(self, path: str, stat: os.stat_result) -> LineIndex:
+        """Get the cached line index for a file, rebuilding it if the file changed."""
+        key = os.path.realpath(path)
+        signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._indexes.get(key)
+            if cached and cached[0] == signature:
+                self._indexes.move_to_end(key)
+                return cached[1]
+
+            index = LineIndex(stat.st_size, self.block_size)
+            self._indexes[key] = (signature, index)
+            self._indexes.move_to_end(key)
+            while len(self._indexes) > self.max_cached_files:
+                self._indexes.popitem(last=False)
+            return index
+
+    def _slice(self, mm: mmap.mmap, start: int, end: int, max_bytes: int, size: int) -> FileSlice:
+        """Decode a byte range, clipped to ``max_bytes``."""
+        truncated = end - start > max_bytes
+        if truncated:
+            end = start + max_bytes
+            # Cut at a line boundary when one is reasonably close
+            newline = mm.rfind(b"\n", start, end)
+            if newline > start + max_bytes // 2:
+                end = newline + 1
+        return FileSlice(
+            content=mm[start:end].decode("utf-8", errors="replace"),
+            file_size=size,
+            offset=start,
+            end_offset=end,
+            truncated=truncated
+        )
+
+    def _open(self, path: str):
+        """Open a file and map it; returns (file, mmap or None for empty files, stat)."""
+        f = open(path, "rb")
+        try:
+            stat = os.fstat(f.fileno())
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else None
+        except BaseException:
+            f.close()
+            raise
+        return f, mm, stat
+
+    def read_bytes(self, path: str, offset: int, length: Optional[int] = None, max_bytes: int = 256 * 1024) -> FileSlice:
+        """Read ``length`` bytes from ``offset`` (negative offsets count from the end)."""
+        f, mm, stat = self._open(path)
+        try:
+            size = stat.st_size
+            if mm is None:
+                return FileSlice(content="", file_size=0, offset=0, end_offset=0)
+            start = max(0, size + offset) if offset < 0 else min(offset, size)
+            end = size if length is None else min(size, start + max(0, length))
+            return self._slice(mm, start, end, max_bytes, size)
+        finally:
+            if mm is not None:
+                mm.close()
+            f.close()
+
+    def read_lines(self, path: str, start_line: int = 1, end_line: Optional[int] = None, max_bytes: int = 256 * 1024) -> FileSlice:
+        """Read 1-based lines ``start_line`` to ``end_line`` inclusive (to EOF if omitted)."""
+        start_line = max(1, start_line)
+        f, mm, stat = self._open(path)
+        try:
+            size = stat.st_size
+            if mm is None:
+                return FileSlice(content="", file_size=0, offset=0, end_offset=0)
+
+            index = self._line_index(path, stat)
+            start = index.line_offset(mm, start_line - 1)
+            if start is None:
+                return FileSlice(content="", file_size=size, offset=size, end_offset=size)
+
+            end = size
+            if end_line is not None:
+                next_start = index.line_offset(mm, max(end_line, start_line))
+                end = size if next_start is None else next_start
+
+            result = self._slice(mm, start, end, max_bytes, size)
+            result.start_line = start_line
+            if end_line is not None and end != size and not result.truncated:
+                result.end_line = end_line
+            else:
+                # Count the lines actually returned
+                result.end_line = start_line + result.content.count("\n") - (1 if result.content.endswith("\n") else 0)
+            return result
+        finally:
+            if mm is not None:
+                mm.close()
+            f.close()
+
+    def head(self, path: str, lines: int, max_bytes: int = 256 * 1024) -> FileSlice:
+        """Read the first ``lines`` lines."""
+        return self.read_lines(path, 1, max(1, lines), max_bytes)
+
+    def tail(self, path: str, lines: int, max_bytes: int = 256 * 1024) -> FileSlice:
+        """Read the last ``lines`` lines by scanning backwards from the end."""
+        f, mm, stat = self._open(path)
+        try:
+            size = stat.st_size
+            if mm is None:
+                return FileSlice(content="", file_size=0, offset=0, end_offset=0)
+
+            # A trailing newline ends the last line rather than starting a new one
+            position = size - 1 if mm[size - 1:size] == b"\n" else size
+            for _ in range(max(1, lines)):
+                position = mm.rfind(b"\n", 0, position)
+                if position == -1:
+                    break
+            start = position + 1
+
+            if size - start > max_bytes:
+                # Keep the end of the file rather than the start of the range
+                start = size - max_bytes
+                newline = mm.find(b"\n", start, start + max_bytes // 2)
+                if newline != -1:
+                    start = newline + 1
+                return FileSlice(
+                    content=mm[start:size].decode("utf-8", errors="replace"),
+                    file_size=size,
+                    offset=start,
+                    end_offset=size,
+                    truncated=True
+                )
+            return self._slice(mm, start, size, max_bytes, size)
+        finally:
+            if mm is not None:
+                mm.close()
+            f.close()
@@ -0,0 +1,462 @@
+"""Shared, pooled HTTP clients for LLM providers and HTTP MCP servers."""
+
+import time
+import socket
+import asyncio
+import logging
+import importlib.util
+import urllib.request
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import httpx
+import httpcore
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+def http2_available() -> bool:
+    """Check whether the h2 package needed for HTTP/2 is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+class CachingResolverBackend(httpcore.AsyncNetworkBackend):
+    """Network backend that caches DNS lookups for ``ttl`` seconds.
+
+    Connections are opened to the cached addresses in order; if none of them
+    accept, the entry is dropped so the next attempt resolves afresh. TLS
+    still verifies the original host name.
+    """
+
+    def __init__(self, ttl: float = 300.0, backend: Optional[httpcore.AsyncNetworkBackend] = None):
+        """Initialize the resolver cache around ``backend`` (AnyIO by default)."""
+        self.ttl = ttl
+        self.backend = backend or httpcore.AnyIOBackend()
+        self._cache: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+        self.lookups = 0
+        self.cache_hits = 0
+
+    async def resolve(self, host: str, port: int) -> List[str]:
+        """Get the addresses for a host, from cache when fresh."""
+        now = time.monotonic()
+        cached = self._cache.get((host, port))
+        if cached is not None and now - cached[0] < self.ttl:
+            self.cache_hits += 1
+            return cached[1]
+
+        self.lookups += 1
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses = []
+        for _, _, _, _, sockaddr in infos:
+            if sockaddr[0] not in addresses:
+                addresses.append(sockaddr[0])
+        self._cache[(host, port)] = (now, addresses)
+        return addresses
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: Optional[float] = None,
+        local_address: Optional[str] = None,
+        socket_options: Optional[Iterable] = None
+    ) -> httpcore.AsyncNetworkStream:
+        """Connect to the first reachable address of ``host``."""
+        try:
+            socket.inet_pton(socket.AF_INET6 if ":" in host else socket.AF_INET, host)
+            addresses = [host]
+        except OSError:
+            addresses = await self.resolve(host, port)
+
+        error: Optional[Exception] = None
+        for address in addresses:
+            try:
+                return await self.backend.connect_tcp(address, port, timeout, local_address, socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout, OSError) as e:
+                error = e
+        self._cache.pop((host, port), None)
+        raise error or httpcore.ConnectError(f"No addresses found for {host}")
+
+    async def connect_unix_socket(self, path: str, timeout: Optional[float] = None, socket_options: Optional[Iterable] = None) -> httpcore.AsyncNetworkStream:
+        """Connect to a Unix socket."""
+        return await self.backend.connect_unix_socket(path, timeout, socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        """Sleep using the wrapped backend."""
+        await self.backend.sleep(seconds)
+
+
+# httpcore errors and the httpx errors raised in their place, most specific first
+_HTTPCORE_ERRORS = (
+    (httpcore.ConnectTimeout, httpx.ConnectTimeout),
+    (httpcore.ReadTimeout, httpx.ReadTimeout),
+    (httpcore.WriteTimeout, httpx.WriteTimeout),
+    (httpcore.PoolTimeout, httpx.PoolTimeout),
+    (httpcore.TimeoutException, httpx.TimeoutException),
+    (httpcore.ConnectError, httpx.ConnectError),
+    (httpcore.ReadError, httpx.ReadError),
+    (httpcore.WriteError, httpx.WriteError),
+    (httpcore.NetworkError, httpx.NetworkError),
+    (httpcore.ProxyError, httpx.ProxyError),
+    (httpcore.RemoteProtocolError, httpx.RemoteProtocolError),
+    (httpcore.LocalProtocolError, httpx.LocalProtocolError),
+    (httpcore.ProtocolError, httpx.ProtocolError),
+    (httpcore.UnsupportedProtocol, httpx.UnsupportedProtocol),
+)
+
+
+def _httpx_error(error: Exception) -> Exception:
+    """Get the httpx equivalent of an httpcore error, or the error itself."""
+    for core_type, httpx_type in _HTTPCORE_ERRORS:
+        if isinstance(error, core_type):
+            return httpx_type(str(error))
+    return error
+
+
+def environment_proxy(url: str) -> Optional[str]:
+    """Get the proxy the environment (HTTPS_PROXY, HTTP_PROXY, ALL_PROXY, NO_PROXY) sets for a URL."""
+    parsed = httpx.URL(url)
+    proxies = urllib.request.getproxies()
+    proxy = proxies.get(parsed.scheme) or proxies.get("all")
+    if not proxy or urllib.request.proxy_bypass(parsed.host):
+        return None
+    return proxy
+
+
+class _ResponseStream(httpx.AsyncByteStream):
+    """Response body read from httpcore; tells the transport when the connection is released."""
+
+    def __init__(self, stream, transport: "PooledTransport"):
+        self._stream = stream
+        self._transport = transport
+        self._closed = False
+
+    async def __aiter__(self):
+        try:
+            async for part in self._stream:
+                yield part
+        except Exception as e:
+            error = _httpx_error(e)
+            if error is e:
+                raise
+            raise error from e
+
+    async def aclose(self):
+        if not self._closed:
+            self._closed = True
+            self._transport._released()
+        if hasattr(self._stream, "aclose"):
+            await self._stream.aclose()
+
+
+class PooledTransport(httpx.AsyncBaseTransport):
+    """httpx transport over an httpcore pool that uses a shared DNS-caching backend.
+
+    The pool is built once through httpcore's public constructors, directly
+    or through ``proxy``, with the same SSL settings httpx would use. The
+    transport also tracks when its last response was released, which is what
+    diagnostics use to tell whether a kept-alive connection should still be
+    open.
+    """
+
+    def __init__(
+        self,
+        limits: httpx.Limits,
+        http2: bool,
+        network_backend: httpcore.AsyncNetworkBackend,
+        proxy: Optional[str] = None,
+        verify: bool = True
+    ):
+        """Initialize the transport."""
+        self.keepalive_expiry = limits.keepalive_expiry
+        self.in_flight = 0
+        self.released_at: Optional[float] = None
+        ssl_context = httpx.create_ssl_context(verify=verify)
+        options = dict(
+            ssl_context=ssl_context,
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http1=True,
+            http2=http2,
+            network_backend=network_backend
+        )
+        if proxy is None:
+            self.pool: httpcore.AsyncConnectionPool = httpcore.AsyncConnectionPool(**options)
+            return
+
+        proxy_config = httpx.Proxy(proxy)
+        proxy_url = httpcore.URL(
+            scheme=proxy_config.url.raw_scheme,
+            host=proxy_config.url.raw_host,
+            port=proxy_config.url.port,
+            target=proxy_config.url.raw_path
+        )
+        if proxy_config.url.scheme in ("socks5", "socks5h"):
+            # Needs the socksio package, as with httpx itself
+            self.pool = httpcore.AsyncSOCKSProxy(
+                proxy_url=proxy_url,
+                proxy_auth=proxy_config.raw_auth,
+                **options
+            )
+        else:
+            self.pool = httpcore.AsyncHTTPProxy(
+                proxy_url=proxy_url,
+                proxy_auth=proxy_config.raw_auth,
+                proxy_headers=proxy_config.headers.raw,
+                proxy_ssl_context=httpx.create_ssl_context() if proxy_config.url.scheme == "https" else None,
+                **options
+            )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request through the pool."""
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions
+        )
+        self.in_flight += 1
+        try:
+            response = await self.pool.handle_async_request(core_request)
+        except Exception as e:
+            self.in_flight -= 1
+            error = _httpx_error(e)
+            if error is e:
+                raise
+            raise error from e
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=_ResponseStream(response.stream, self),
+            extensions=response.extensions
+        )
+
+    def _released(self):
+        """Record that a response finished and its connection went back to the pool."""
+        self.in_flight -= 1
+        self.released_at = time.monotonic()
+
+    def connection_count(self) -> int:
+        """Number of open connections in the pool."""
+        return len(self.pool.connections)
+
+    def is_warm(self) -> bool:
+        """Whether a kept-alive connection should be open: a request is running or one ended within the keep-alive window."""
+        if self.in_flight:
+            return True
+        if self.released_at is None:
+            return False
+        expiry = self.keepalive_expiry if self.keepalive_expiry is not None else float("inf")
+        return time.monotonic() - self.released_at < expiry
+
+    async def aclose(self):
+        """Close every pooled connection."""
+        await self.pool.aclose()
+
+
+class OriginStatus(BaseModel):
+    """Connection state of one origin, as shown in diagnostics."""
+    origin: str
+    state: str
+    connections: int = 0
+    handshake_ms: Optional[float] = None
+    warmed: int = 0
+    reused_requests: int = 0
+    saved_ms: float = 0.0
+    idle_seconds: Optional[float] = None
+
+
+class _OriginActivity:
+    """Timing and reuse counters for one origin."""
+
+    def __init__(self):
+        """Initialize empty counters."""
+        self.handshake_ms: Optional[float] = None
+        self.warmed = 0
+        self.reused_requests = 0
+        self.saved_ms = 0.0
+        self.last_request_at: Optional[float] = None
+        self.last_used_at: Optional[float] = None
+        self.warming = False
+
+
+class TransportManager:
+    """Owns one tuned ``httpx.AsyncClient`` per origin, shared by everything talking to it.
+
+    Clients keep connections alive between requests, use HTTP/2 when the h2
+    package is installed, and share one DNS cache. Consumers must not close
+    the clients they are given; ``aclose`` shuts all of them down.
+    """
+
+    def __init__(
+        self,
+        http2: bool = True,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 60.0,
+        dns_ttl: float = 300.0,
+        timeout: float = 60.0
+    ):
+        """Initialize the manager; clients are created on first use."""
+        self.http2 = http2 and http2_available()
+        if http2 and not self.http2:
+            logger.debug("h2 is not installed; shared HTTP clients use HTTP/1.1")
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(timeout, connect=min(timeout, 10.0))
+        self.resolver = CachingResolverBackend(ttl=dns_ttl)
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._transports: Dict[str, PooledTransport] = {}
+        self._activity: Dict[str, _OriginActivity] = {}
+
+    @staticmethod
+    def origin(url: str) -> str:
+        """Get the scheme://host:port a URL points at."""
+        parsed = httpx.URL(url)
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        return f"{parsed.scheme}://{parsed.host}:{port}"
+
+    def client_for(self, url: str) -> httpx.AsyncClient:
+        """Get the shared client for a URL's origin, creating it if needed."""
+        origin = self.origin(url)
+        client = self._clients.get(origin)
+        if client is None or client.is_closed:
+            proxy = environment_proxy(url)
+            if proxy is not None:
+                logger.debug(f"Using proxy {httpx.URL(proxy).host} for {origin}")
+            transport = PooledTransport(self.limits, self.http2, self.resolver, proxy=proxy)
+            client = httpx.AsyncClient(
+                transport=transport,
+                timeout=self.timeout,
+                follow_redirects=True,
+                event_hooks={"request": [self._request_hook(origin)]}
+            )
+            self._clients[origin] = client
+            self._transports[origin] = transport
+            logger.debug(f"Created shared HTTP client for {origin}")
+        return client
+
+    def _request_hook(self, origin: str):
+        """Build the hook that records each request's timing and connection reuse."""
+        activity = self._activity.setdefault(origin, _OriginActivity())
+
+        async def on_request(request: httpx.Request):
+            now = time.monotonic()
+            activity.last_request_at = now
+            if activity.warming:
+                return
+            activity.last_used_at = now
+            transport = self._transports.get(origin)
+            # A live pooled connection means this request skips DNS, TCP and TLS setup
+            if transport is not None and activity.handshake_ms is not None and transport.is_warm():
+                activity.reused_requests += 1
+                activity.saved_ms += activity.handshake_ms
+
+        return on_request
+
+    async def warm(self, url: str) -> bool:
+        """Open (or refresh) a keep-alive connection to a URL's origin.
+
+        Sends a HEAD request and ignores the status: any response leaves a
+        pooled connection behind. When a new connection had to be opened,
+        the time it took is remembered as the origin's handshake cost.
+        Returns False if the origin could not be reached.
+        """
+        origin = self.origin(url)
+        client = self.client_for(url)
+        transport = self._transports[origin]
+        activity = self._activity.setdefault(origin, _OriginActivity())
+        was_cold = not transport.is_warm()
+
+        activity.warming = True
+        start = time.perf_counter()
+        try:
+            await client.head(url)
+        except httpx.HTTPError as e:
+            logger.debug(f"Could not pre-warm {origin}: {e}")
+            return False
+        finally:
+            activity.warming = False
+
+        if was_cold:
+            activity.handshake_ms = (time.perf_counter() - start) * 1000
+        activity.warmed += 1
+        logger.debug(f"Pre-warmed {origin} ({'new' if was_cold else 'kept'} connection)")
+        return True
+
+    async def keep_warm(self, urls: List[str], idle_limit: float = 600.0, check_interval: Optional[float] = None):
+        """Warm every URL's origin now, then re-warm each before its keep-alive expires.
+
+        An origin is re-warmed once it has gone unused for most of the
+        keep-alive window. Re-warming stops for an origin after ``idle_limit``
+        seconds without a real request, so an abandoned session goes quiet.
+        Runs until cancelled.
+        """
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return
+        started = time.monotonic()
+        await asyncio.gather(*(self.warm(url) for url in urls))
+
+        expiry = self.limits.keepalive_expiry or 60.0
+        rewarm_after = expiry * 0.8
+        interval = check_interval or max(rewarm_after / 4, 0.05)
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            for url in urls:
+                activity = self._activity.get(self.origin(url))
+                if activity is None or activity.last_request_at is None:
+                    continue
+                last_used = activity.last_used_at or started
+                if now - activity.last_request_at >= rewarm_after and now - last_used < idle_limit:
+                    await self.warm(url)
+
+    def origin_status(self) -> List[OriginStatus]:
+        """Get the warm/cold state and reuse counters of every origin."""
+        now = time.monotonic()
+        statuses = []
+        for origin, client in self._clients.items():
+            if client.is_closed:
+                continue
+            activity = self._activity.get(origin) or _OriginActivity()
+            transport = self._transports[origin]
+            statuses.append(OriginStatus(
+                origin=origin,
+                state="warm" if transport.is_warm() else "cold",
+                connections=transport.connection_count(),
+                handshake_ms=activity.handshake_ms,
+                warmed=activity.warmed,
+                reused_requests=activity.reused_requests,
+                saved_ms=activity.saved_ms,
+                idle_seconds=now - activity.last_request_at if activity.last_request_at is not None else None
+            ))
+        return statuses
+
+    def stats(self) -> Dict[str, int]:
+        """Get open connections per origin."""
+        return {
+            origin: self._transports[origin].connection_count()
+            for origin, client in self._clients.items()
+            if not client.is_closed
+        }
+
+    async def aclose(self):
+        """Close every shared client."""
+        clients, self._clients, self._transports = list(self._clients.values()), {}, {}
+        self._activity = {}
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.debug(f"Error closing shared HTTP client: {e}")
@@ -0,0 +1,131 @@
+"""Index of executables on $PATH, refreshed lazily when PATH or its directories change."""
+
+import os
+import time
+import logging
+import threading
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bash builtins and keywords; these run without anything on PATH
+SHELL_BUILTINS = frozenset({
+    ".", ":", "[", "[[", "alias", "bg", "bind", "break", "builtin", "caller", "case", "cd",
+    "command", "compgen", "complete", "compopt", "continue", "declare", "dirs", "disown",
+    "echo", "enable", "eval", "exec", "exit", "export", "false", "fc", "fg", "for",
+    "function", "getopts", "hash", "help", "history", "if", "jobs", "kill", "let", "local",
+    "logout", "mapfile", "popd", "printf", "pushd", "pwd", "read", "readarray", "readonly",
+    "return", "select", "set", "shift", "shopt", "source", "suspend", "test", "time",
+    "times", "trap", "true", "type", "typeset", "ulimit", "umask", "unalias", "unset",
+    "until", "wait", "while",
+})
+
+
+class ExecutableIndex:
+    """Names of the executables reachable through $PATH.
+
+    Directory listings are cached per directory. At most every
+    ``refresh_interval`` seconds (or at once when PATH itself changes) the
+    directories' mtimes are polled, and only directories whose mtime changed
+    (something was installed or removed) are rescanned. ``version`` is bumped
+    whenever the set of names may have changed.
+    """
+
+    def __init__(self, refresh_interval: float = 2.0):
+        """Initialize an empty index; nothing is scanned until the first lookup."""
+        self.refresh_interval = refresh_interval
+        self._path: Optional[str] = None
+        self._mtimes: List[Tuple[str, int]] = []
+        self._listings: Dict[str, Tuple[int, FrozenSet[str]]] = {}  # directory -> (mtime, names)
+        self._names: Dict[str, str] = {}  # name -> first PATH directory containing it
+        self._checked_at = 0.0
+        self.version = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _directories(path: str) -> List[str]:
+        """Split PATH into existing, de-duplicated directories."""
+        seen = set()
+        directories = []
+        for directory in path.split(os.pathsep):
+            directory = directory or "."
+            if directory not in seen:
+                seen.add(directory)
+                directories.append(directory)
+        return directories
+
+    def _snapshot(self, directories: List[str]) -> List[Tuple[str, int]]:
+        """Get the mtime of each PATH directory (-1 when missing)."""
+        mtimes = []
+        for directory in directories:
+            try:
+                mtimes.append((directory, os.stat(directory).st_mtime_ns))
+            except OSError:
+                mtimes.append((directory, -1))
+        return mtimes
+
+    @staticmethod
+    def _list_directory(directory: str) -> FrozenSet[str]:
+        """List the executable files in one directory."""
+        names = set()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        if entry.is_file() and os.access(entry.path, os.X_OK):
+                            names.add(entry.name)
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.debug(f"Skipping unreadable PATH directory {directory}: {e}")
+        return frozenset(names)
+
+    def _rebuild(self, mtimes: List[Tuple[str, int]], force: bool):
+        """Rebuild the name table, rescanning only directories that changed."""
+        listings = {}
+        names: Dict[str, str] = {}
+        rescanned = 0
+        for directory, mtime in mtimes:
+            if mtime < 0:
+                continue
+            cached = self._listings.get(directory)
+            if force or cached is None or cached[0] != mtime:
+                cached = (mtime, self._list_directory(directory))
+                rescanned += 1
+            listings[directory] = cached
+            for name in cached[1]:
+                names.setdefault(name, directory)
+        self._listings = listings
+        self._names = names
+        self.version += 1
+        logger.debug(f"Indexed {len(names)} executables on PATH ({rescanned} directories rescanned)")
+
+    def refresh(self, force: bool = False):
+        """Rescan if PATH changed or, at most every refresh_interval, if a directory changed."""
+        path = os.environ.get("PATH", "")
+        now = time.monotonic()
+        with self._lock:
+            if not force and path == self._path and now - self._checked_at < self.refresh_interval:
+                return
+            self._checked_at = now
+            mtimes = self._snapshot(self._directories(path))
+            if force or path != self._path or mtimes != self._mtimes:
+                self._path = path
+                self._mtimes = mtimes
+                self._rebuild(mtimes, force)
+
+    def lookup(self, name: str) -> Optional[str]:
+        """Get the full path ``name`` would run from, or None if it is not on PATH."""
+        self.refresh()
+        directory = self._names.get(name)
+        return os.path.join(directory, name) if directory is not None else None
+
+    def __contains__(self, name: str) -> bool:
+        """Check whether ``name`` is an executable on PATH."""
+        self.refresh()
+        return name in self._names
+
+    def names(self) -> List[str]:
+        """Get all executable names on PATH, sorted."""
+        self.refresh()
+        return sorted(self._names)
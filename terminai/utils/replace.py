@@ -0,0 +1,282 @@
+"""Streaming, atomic find-and-replace for files of any size."""
+
+import os
+import re
+import shutil
+import logging
+import tempfile
+from typing import Callable, List, Optional, Pattern, Tuple
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# Regex matches may span at most this many characters across a chunk boundary
+REGEX_OVERLAP = 64 * 1024
+# Only the first replacements' line numbers are kept
+MAX_REPORTED_LINES = 1000
+# Diff output for dry runs is capped to keep tool results small
+MAX_DIFF_HUNKS = 100
+MAX_DIFF_LINE_CHARS = 500
+
+# A newline not already part of a CRLF pair
+_BARE_LF = re.compile(r"(?<!\r)\n")
+
+
+class ReplaceResult(BaseModel):
+    """Represents the outcome of a replace."""
+    mode: str = "literal"  # "literal" or "regex"
+    replacements: int = 0
+    lines: List[int] = []  # 1-based line of each replacement in the original file (first MAX_REPORTED_LINES)
+    diff: str = ""
+    written: bool = False
+
+
+class _Hunk:
+    """Original and replaced text of the lines touched by adjacent matches."""
+
+    def __init__(self, line: int, start: int, end: int):
+        self.line = line
+        self.start = start
+        self.end = end
+        self.matches: List[Tuple[int, int, str]] = []
+
+
+def _clip(line: str) -> str:
+    """Clip a diff line for display."""
+    return line if len(line) <= MAX_DIFF_LINE_CHARS else line[:MAX_DIFF_LINE_CHARS] + "…"
+
+
+class _DiffBuilder:
+    """Collects unified-diff hunks for replacements, up to a cap."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.hunks: List[str] = []
+        self.line_delta = 0
+        self.omitted = 0
+
+    def add(self, text: str, hunk: _Hunk):
+        """Render one hunk from the window text it was found in."""
+        old = text[hunk.start:hunk.end]
+        pieces = []
+        position = hunk.start
+        for start, end, replacement in hunk.matches:
+            pieces.append(text[position:start])
+            pieces.append(replacement)
+            position = end
+        pieces.append(text[position:hunk.end])
+        new = "".join(pieces)
+
+        old_lines = old.split("\n")
+        new_lines = new.split("\n")
+        new_line = hunk.line + self.line_delta
+        self.line_delta += len(new_lines) - len(old_lines)
+
+        if len(self.hunks) >= MAX_DIFF_HUNKS:
+            self.omitted += 1
+            return
+        body = [f"@@ -{hunk.line},{len(old_lines)} +{new_line},{len(new_lines)} @@"]
+        body.extend(f"-{_clip(line)}" for line in old_lines)
+        body.extend(f"+{_clip(line)}" for line in new_lines)
+        self.hunks.append("\n".join(body))
+
+    def render(self) -> str:
+        """Render the collected hunks as a unified diff."""
+        if not self.hunks:
+            return ""
+        diff = [f"--- a/{self.path}", f"+++ b/{self.path}"] + self.hunks
+        if self.omitted:
+            diff.append(f"... {self.omitted} more hunks omitted")
+        return "\n".join(diff)
+
+
+def _uses_crlf(path: str) -> bool:
+    """Check whether a file's first line ends with CRLF."""
+    with open(path, "rb") as f:
+        head = f.read(64 * 1024)
+    newline = head.find(b"\n")
+    return newline > 0 and head[newline - 1:newline] == b"\r"
+
+
+def _replace_pass(
+    path: str,
+    pattern: Pattern[str],
+    replace: Callable[["re.Match"], str],
+    overlap: int,
+    write: Optional[Callable[[str], object]],
+    diff: Optional[_DiffBuilder],
+    chunk_size: int
+) -> Tuple[int, List[int]]:
+    """Stream ``path`` through the pattern, writing output to ``write`` if given.
+
+    The unprocessed tail of each window (``overlap`` characters) is carried
+    into the next one so matches crossing chunk boundaries are still found,
+    and up to ``overlap`` characters of already-processed text are kept in
+    front as context for lookbehinds and anchors. A match still growing once
+    ``2 * overlap + chunk_size`` characters are buffered is taken as it
+    stands rather than buffering the rest of the file.
+    """
+    count = 0
+    lines: List[int] = []
+    context = ""
+    pending = ""
+    line_at_base = 1
+
+    with open(path, "r", encoding="utf-8", errors="surrogateescape", newline="") as f:
+        while True:
+            data = f.read(chunk_size)
+            eof = not data
+            pending += data
+
+            text = context + pending
+            base = len(context)
+            cut = len(text) if eof else max(base, len(text) - overlap)
+
+            out = []
+            position = base
+            counted_to, counted_lines = base, line_at_base
+            hunk: Optional[_Hunk] = None
+
+            for match in pattern.finditer(text, base):
+                if not eof and (match.start() >= cut or match.end() > cut):
+                    if match.start() < cut and len(text) - match.start() > 2 * overlap + chunk_size:
+                        # Already longer than a match may span: keep it instead of buffering further
+                        logger.warning(f"Match at character {match.start()} is longer than {overlap} characters; cut at the window end")
+                        cut = match.end()
+                    else:
+                        # Might extend or move once more text arrives; decide in the next window
+                        cut = max(position, min(cut, match.start()))
+                        break
+
+                replacement = replace(match)
+                counted_lines += text.count("\n", counted_to, match.start())
+                counted_to = match.start()
+                if len(lines) < MAX_REPORTED_LINES:
+                    lines.append(counted_lines)
+                count += 1
+
+                if diff is not None:
+                    line_start = text.rfind("\n", 0, match.start()) + 1
+                    line_end = text.find("\n", match.end())
+                    line_end = len(text) if line_end == -1 else line_end
+                    if hunk is None or line_start > hunk.end:
+                        if hunk is not None:
+                            diff.add(text, hunk)
+                        hunk = _Hunk(counted_lines, line_start, line_end)
+                    hunk.end = max(hunk.end, line_end)
+                    hunk.matches.append((match.start(), match.end(), replacement))
+
+                out.append(text[position:match.start()])
+                out.append(replacement)
+                position = match.end()
+
+            if hunk is not None:
+                diff.add(text, hunk)
+
+            out.append(text[position:cut])
+            if write is not None:
+                write("".join(out))
+
+            line_at_base += text.count("\n", base, cut)
+            context = text[max(0, cut - overlap):cut]
+            pending = text[cut:]
+
+            if eof:
+                break
+
+    return count, lines
+
+
+def stream_replace(
+    path: str,
+    old: str,
+    new: str,
+    dry_run: bool = False,
+    chunk_size: int = 1024 * 1024,
+    regex_overlap: int = REGEX_OVERLAP
+) -> ReplaceResult:
+    """Replace ``old`` with ``new`` in a file using roughly constant memory.
+
+    ``old`` is matched literally; if it never occurs it is tried as a regex,
+    with ``new`` as a ``re.sub``-style template. Output goes to a temporary
+    file in the same directory, which atomically replaces the original only
+    once it is complete. With ``dry_run`` nothing is written and a unified
+    diff of the changes is returned instead. Line endings are kept as they
+    are, but in a CRLF file a literal ``old`` written with bare ``\n`` also
+    matches, and ``new`` is then written with CRLF endings too.
+
+    Raises ``re.error`` when ``old`` only makes sense as a regex and is invalid.
+    """
+    result = ReplaceResult()
+
+    attempts = [("literal", old, new)]
+    if _BARE_LF.search(old) and _uses_crlf(path):
+        attempts.append(("literal", _BARE_LF.sub("\r\n", old), _BARE_LF.sub("\r\n", new)))
+    attempts.append(("regex", old, new))
+
+    for mode, old_text, new_text in attempts:
+        if mode == "literal":
+            pattern = re.compile(re.escape(old_text))
+            replace = lambda match: new_text
+            overlap = max(len(old_text), 1)
+        else:
+            # No literal occurrence: fall back to treating old as a regex
+            pattern = re.compile(old_text)
+            replace = lambda match: match.expand(new_text)
+            overlap = regex_overlap
+
+        if dry_run:
+            diff = _DiffBuilder(path)
+            count, lines = _replace_pass(path, pattern, replace, overlap, None, diff, chunk_size)
+        else:
+            diff = None
+            count, lines = _write_atomically(path, pattern, replace, overlap, chunk_size)
+
+        if count:
+            result.mode = mode
+            result.replacements = count
+            result.lines = lines
+            result.diff = diff.render() if diff else ""
+            result.written = not dry_run
+            return result
+
+    return result
+
+
+def _write_atomically(
+    path: str,
+    pattern: Pattern[str],
+    replace: Callable[["re.Match"], str],
+    overlap: int,
+    chunk_size: int
+) -> Tuple[int, List[int]]:
+    """Run a replace pass into a temporary file and move it over ``path`` if anything changed.
+
+    Symlinks are resolved so the link itself survives, and the file's mode,
+    owner and group are carried over to the replacement where permitted.
+    """
+    path = os.path.realpath(path)
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", errors="surrogateescape", newline="") as tmp:
+            count, lines = _replace_pass(path, pattern, replace, overlap, tmp.write, None, chunk_size)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+
+        if count:
+            shutil.copymode(path, tmp_path)
+            if hasattr(os, "chown"):
+                stat = os.stat(path)
+                try:
+                    os.chown(tmp_path, stat.st_uid, stat.st_gid)
+                except PermissionError:
+                    logger.debug(f"Could not keep the owner of {path}")
+            os.replace(tmp_path, path)
+        else:
+            os.unlink(tmp_path)
+        return count, lines
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
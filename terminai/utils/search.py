@@ -0,0 +1,285 @@
+"""Streaming content search over directory trees."""
+
+import os
+import re
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, List, Optional, Pattern, Tuple
+from pydantic import BaseModel
+
+from .walker import walk_files, ordered_map
+
+logger = logging.getLogger(__name__)
+
+# Bytes sniffed for NUL bytes to decide whether a file is binary
+BINARY_SNIFF_BYTES = 8192
+# Matched and context lines are clipped to this many characters
+MAX_LINE_CHARS = 500
+
+
+class SearchMatch(BaseModel):
+    """A matching line with its surrounding context."""
+    path: str
+    line_number: int
+    line: str
+    before: List[str] = []
+    after: List[str] = []
+
+
+class SearchResult(BaseModel):
+    """Represents the outcome of a search."""
+    matches: List[SearchMatch] = []
+    files_scanned: int = 0
+    binary_files_skipped: int = 0
+    truncated: bool = False
+
+    def format(self) -> str:
+        """Format matches grep-style: ``path:line:text`` with ``path-line-text`` context."""
+        blocks = []
+        for match in self.matches:
+            first = match.line_number - len(match.before)
+            lines = [f"{match.path}-{first + i}-{text}" for i, text in enumerate(match.before)]
+            lines.append(f"{match.path}:{match.line_number}:{match.line}")
+            lines.extend(f"{match.path}-{match.line_number + 1 + i}-{text}" for i, text in enumerate(match.after))
+            blocks.append("\n".join(lines))
+
+        separator = "\n--\n" if any(m.before or m.after for m in self.matches) else "\n"
+        content = separator.join(blocks)
+        if self.truncated:
+            content += f"\n\n[Results capped at {len(self.matches)} matches; narrow the search to see more]"
+        return content
+
+
+def _decode_line(line: bytes) -> str:
+    """Decode a line for display."""
+    text = line.rstrip(b"\r").decode("utf-8", errors="replace")
+    if len(text) > MAX_LINE_CHARS:
+        text = text[:MAX_LINE_CHARS] + "…"
+    return text
+
+
+def is_binary(data: bytes) -> bool:
+    """Guess whether file data is binary from a NUL byte near the start."""
+    return b"\0" in data[:BINARY_SNIFF_BYTES]
+
+
+def compile_pattern(pattern: str, regex: bool = False, case_sensitive: bool = True) -> Pattern[bytes]:
+    """Compile a literal or regex search pattern for byte-level scanning."""
+    source = pattern.encode("utf-8") if regex else re.escape(pattern.encode("utf-8"))
+    # Blocks hold many lines, so ^ and $ must anchor at line boundaries
+    flags = re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE
+    return re.compile(source, flags)
+
+
+class SearchEngine:
+    """Searches file contents without loading whole files.
+
+    Files are read in chunks cut at line boundaries and scanned with a
+    compiled byte regex; chunks without a match cost one regex pass and a
+    newline count. Files are scanned concurrently on a thread pool, and
+    results keep the walk order so capped output is deterministic.
+    """
+
+    def __init__(self, max_workers: int = 8, chunk_size: int = 1024 * 1024):
+        """Initialize the search engine."""
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+
+    def search(
+        self,
+        root: str,
+        pattern: str,
+        regex: bool = False,
+        case_sensitive: bool = True,
+        file_pattern: Optional[str] = None,
+        recursive: bool = True,
+        context_lines: int = 2,
+        max_results: int = 100,
+        use_ignore: bool = True,
+        candidates: Optional[List[str]] = None
+    ) -> SearchResult:
+        """Search file contents under ``root``.
+
+        ``candidates`` restricts the scan to these root-relative paths (for
+        example from an index) instead of walking the tree.
+        """
+        compiled = compile_pattern(pattern, regex, case_sensitive)
+        result = SearchResult()
+
+        if os.path.isfile(root):
+            paths: List[Tuple[str, str]] = [(root, root)]
+        elif candidates is not None:
+            paths = [(os.path.join(root, rel_path), os.path.join(root, rel_path)) for rel_path in candidates]
+        else:
+            paths = (
+                (os.path.join(root, rel_path), os.path.join(root, rel_path))
+                for rel_path, _ in walk_files(root, recursive, file_pattern, use_ignore, self.max_workers)
+            )
+
+        def scan(item: Tuple[str, str]) -> Optional[List[SearchMatch]]:
+            full_path, display_path = item
+            # One match past the cap tells whether the results were truncated
+            return self.scan_file(full_path, display_path, compiled, context_lines, max_results + 1)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="terminai-search") as executor:
+            for matches in ordered_map(executor, scan, paths, self.max_workers * 2):
+                if matches is None:
+                    result.binary_files_skipped += 1
+                    continue
+                result.files_scanned += 1
+                result.matches.extend(matches)
+                if len(result.matches) > max_results:
+                    result.truncated = True
+                    del result.matches[max_results:]
+                    break
+
+        return result
+
+    def scan_file(
+        self,
+        path: str,
+        display_path: str,
+        pattern: Pattern[bytes],
+        context_lines: int = 2,
+        max_matches: int = 100
+    ) -> Optional[List[SearchMatch]]:
+        """Scan one file in chunks; returns None for binary files."""
+        matches: List[SearchMatch] = []
+        # Matches still waiting for after-context lines from later chunks
+        pending: List[SearchMatch] = []
+        # The last few lines of previous chunks, for before-context
+        history: Deque[bytes] = deque(maxlen=context_lines)
+        lines_before_block = 0
+        rest = b""
+
+        try:
+            with open(path, "rb") as f:
+                data = f.read(max(self.chunk_size, BINARY_SNIFF_BYTES))
+                if is_binary(data):
+                    return None
+
+                while True:
+                    buffer = rest + data
+                    if not data:
+                        block, rest = buffer, b""
+                    else:
+                        cut = buffer.rfind(b"\n") + 1
+                        if cut == 0 and len(buffer) >= 8 * self.chunk_size:
+                            # A single enormous line: scan it in pieces rather than buffering it all
+                            cut = len(buffer)
+                        block, rest = buffer[:cut], buffer[cut:]
+
+                    if block:
+                        lines_before_block = self._scan_block(
+                            block, display_path, pattern, context_lines, max_matches,
+                            matches, pending, history, lines_before_block
+                        )
+                    if not data or len(matches) >= max_matches:
+                        break
+                    data = f.read(self.chunk_size)
+        except OSError as e:
+            logger.debug(f"Skipping unreadable file {path}: {e}")
+
+        return matches
+
+    def _scan_block(
+        self,
+        block: bytes,
+        display_path: str,
+        pattern: Pattern[bytes],
+        context_lines: int,
+        max_matches: int,
+        matches: List[SearchMatch],
+        pending: List[SearchMatch],
+        history: Deque[bytes],
+        lines_before_block: int
+    ) -> int:
+        """Scan a block of whole lines, returning the line count after it."""
+        if pending:
+            # Complete after-context for matches near the end of the previous block
+            start = 0
+            for i in range(context_lines):
+                end = block.find(b"\n", start)
+                line = block[start:] if end == -1 else block[start:end]
+                for match in list(pending):
+                    match.after.append(_decode_line(line))
+                    if len(match.after) >= context_lines:
+                        pending.remove(match)
+                if end == -1 or not pending:
+                    break
+                start = end + 1
+
+        line_count = lines_before_block
+        counted_to = 0
+        last_line_start = -1
+
+        for found in pattern.finditer(block):
+            line_start = block.rfind(b"\n", 0, found.start()) + 1
+            if line_start == last_line_start:
+                continue
+            last_line_start = line_start
+
+            line_end = block.find(b"\n", found.start())
+            if line_end == -1:
+                line_end = len(block)
+
+            line_count += block.count(b"\n", counted_to, line_start)
+            counted_to = line_start
+
+            match = SearchMatch(
+                path=display_path,
+                line_number=line_count + 1,
+                line=_decode_line(block[line_start:line_end])
+            )
+
+            if context_lines:
+                before: List[bytes] = []
+                position = line_start
+                while len(before) < context_lines and position > 0:
+                    previous_start = block.rfind(b"\n", 0, position - 1) + 1
+                    before.append(block[previous_start:position - 1])
+                    position = previous_start
+                if len(before) < context_lines and position == 0:
+                    before.extend(reversed(list(history)[-(context_lines - len(before)):]))
+                match.before = [_decode_line(line) for line in reversed(before)]
+
+                position = line_end + 1
+                while len(match.after) < context_lines and position < len(block):
+                    next_end = block.find(b"\n", position)
+                    if next_end == -1:
+                        next_end = len(block)
+                    match.after.append(_decode_line(block[position:next_end]))
+                    position = next_end + 1
+                if len(match.after) < context_lines:
+                    pending.append(match)
+
+            matches.append(match)
+            if len(matches) >= max_matches:
+                break
+
+        if context_lines:
+            # Remember the block's last lines for the next block's before-context
+            tail = block[:-1] if block.endswith(b"\n") else block
+            for line in tail.rsplit(b"\n", context_lines)[-context_lines:]:
+                history.append(line)
+
+        return lines_before_block + block.count(b"\n")
+
+    def search_names(
+        self,
+        root: str,
+        pattern: str,
+        file_pattern: Optional[str] = None,
+        recursive: bool = True,
+        max_results: int = 100,
+        use_ignore: bool = True
+    ) -> Tuple[List[str], bool]:
+        """Find files whose relative path contains ``pattern``; returns (paths, truncated)."""
+        paths = []
+        for rel_path, _ in walk_files(root, recursive, file_pattern, use_ignore, self.max_workers):
+            if pattern in rel_path:
+                if len(paths) >= max_results:
+                    return paths, True
+                paths.append(os.path.join(root, rel_path))
+        return paths, False
@@ -0,0 +1,210 @@
+"""Persistent shell session for running many commands in one bash process."""
+
+import os
+import pty
+import fcntl
+import shlex
+import shutil
+import signal
+import struct
+import asyncio
+import secrets
+import termios
+import logging
+from typing import Tuple, Optional, Callable
+
+from .bash import OutputBuffer
+
+logger = logging.getLogger(__name__)
+
+# Read size for the pty
+_CHUNK_SIZE = 64 * 1024
+
+
+class ShellSession:
+    """A long-lived shell whose output goes through a pty.
+
+    Commands are written to the shell's stdin one at a time, each followed by
+    a sentinel line carrying the exit code and working directory, so ``cd``,
+    ``export`` and aliases carry over between commands. stdout and stderr
+    share the pty and come back merged.
+    """
+
+    def __init__(self, shell: str = "/bin/bash", kill_grace_period: float = 2.0):
+        """Initialize the session; the shell is started on first use."""
+        self.shell = shell
+        self.kill_grace_period = kill_grace_period
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.cwd = os.getcwd()
+        self.last_exit_code: Optional[int] = None
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._transport = None
+        self._pending = b""
+        self._lock = asyncio.Lock()
+        self._marker = f"__TERMINAI_{secrets.token_hex(8)}__".encode()
+
+    def is_running(self) -> bool:
+        """Check whether the shell process is alive."""
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self):
+        """Start the shell behind a fresh pty."""
+        master_fd, slave_fd = pty.openpty()
+
+        # No echo and no \n -> \r\n translation, so output comes back verbatim
+        attrs = termios.tcgetattr(slave_fd)
+        attrs[1] &= ~termios.OPOST
+        attrs[3] &= ~termios.ECHO
+        termios.tcsetattr(slave_fd, termios.TCSANOW, attrs)
+
+        columns, lines = shutil.get_terminal_size()
+        fcntl.ioctl(slave_fd, termios.TIOCSWINSZ, struct.pack("HHHH", lines, columns, 0, 0))
+
+        env = dict(os.environ, PS1="", PS2="", TERM="dumb", PAGER="cat", GIT_PAGER="cat")
+        args = [self.shell]
+        if os.path.basename(self.shell) == "bash":
+            args += ["--noprofile", "--norc"]
+
+        # stdin stays a pipe so the shell is non-interactive and reads commands verbatim
+        try:
+            self.process = await asyncio.create_subprocess_exec(
+                *args,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=slave_fd,
+                stderr=slave_fd,
+                cwd=self.cwd,
+                env=env,
+                start_new_session=True
+            )
+        finally:
+            os.close(slave_fd)
+
+        loop = asyncio.get_running_loop()
+        self._reader = asyncio.StreamReader()
+        self._pending = b""
+        self._transport, _ = await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(self._reader),
+            os.fdopen(master_fd, "rb", 0)
+        )
+
+        await self._run("shopt -s expand_aliases 2>/dev/null; unset HISTFILE", timeout=10, on_output=None, max_output_bytes=1024)
+        logger.info(f"Started persistent shell session (pid {self.process.pid})")
+
+    async def run(
+        self,
+        command: str,
+        timeout: int = 30,
+        on_output: Optional[Callable[[str, str], None]] = None,
+        max_output_bytes: int = 64 * 1024
+    ) -> Tuple[int, str, str]:
+        """Run a command in the session and return (exit_code, output, error)."""
+        async with self._lock:
+            if not self.is_running():
+                await self.start()
+            return await self._run(command, timeout, on_output, max_output_bytes)
+
+    async def _run(
+        self,
+        command: str,
+        timeout: int,
+        on_output: Optional[Callable[[str, str], None]],
+        max_output_bytes: int
+    ) -> Tuple[int, str, str]:
+        """Send a framed command and collect output up to its sentinel."""
+        # eval keeps state changes in this shell; the sentinel reports $? and $PWD
+        script = (
+            f"{{ eval {shlex.quote(command)}\n}} </dev/null\n"
+            f"printf '\\n%s %d %s\\n' {self._marker.decode()} \"$?\" \"$PWD\"\n"
+        )
+        buffer = OutputBuffer(max_output_bytes)
+
+        try:
+            self.process.stdin.write(script.encode())
+            await self.process.stdin.drain()
+            exit_code = await asyncio.wait_for(self._read_until_marker(buffer, on_output), timeout=timeout)
+        except asyncio.TimeoutError:
+            await self.close()
+            message = f"Command timed out after {timeout} seconds (shell session restarted)"
+            if on_output:
+                on_output("stderr", message)
+            return -1, buffer.getvalue(), message
+        except asyncio.CancelledError:
+            await self.close()
+            raise
+        except (OSError, EOFError):
+            # The command ended the shell itself (e.g. `exit`), which closes the pty (EIO);
+            # the next command starts a new shell
+            exit_code = await self.process.wait()
+            await self.close()
+            return exit_code, buffer.getvalue(), ""
+
+        self.last_exit_code = exit_code
+        return exit_code, buffer.getvalue(), ""
+
+    async def _read_until_marker(self, buffer: OutputBuffer, on_output: Optional[Callable[[str, str], None]]) -> int:
+        """Read pty output line by line until the sentinel line appears."""
+        held_line: Optional[bytes] = None
+
+        while True:
+            newline = self._pending.find(b"\n")
+            if newline == -1:
+                if len(self._pending) > _CHUNK_SIZE and not self._pending.startswith(self._marker):
+                    # Very long line: pass it through instead of holding it all in memory
+                    if held_line is not None:
+                        buffer.write(held_line + b"\n")
+                        if on_output:
+                            on_output("stdout", held_line.decode(errors="replace"))
+                        held_line = None
+                    buffer.write(self._pending)
+                    if on_output:
+                        on_output("stdout", self._pending.decode(errors="replace"))
+                    self._pending = b""
+
+                data = await self._reader.read(_CHUNK_SIZE)
+                if not data:
+                    raise EOFError("Shell session exited")
+                self._pending += data
+                continue
+
+            line, self._pending = self._pending[:newline], self._pending[newline + 1:]
+
+            if line.startswith(self._marker):
+                _, exit_code, cwd = line.decode(errors="replace").split(" ", 2)
+                self.cwd = cwd
+                # The sentinel starts with a newline; drop it unless it ended a partial line
+                if held_line:
+                    buffer.write(held_line)
+                    if on_output:
+                        on_output("stdout", held_line.decode(errors="replace"))
+                return int(exit_code)
+
+            # Lines are emitted one behind so the sentinel's own newline can be recognised
+            if held_line is not None:
+                buffer.write(held_line + b"\n")
+                if on_output:
+                    on_output("stdout", held_line.decode(errors="replace"))
+            held_line = line
+
+    async def close(self):
+        """Stop the shell and release the pty."""
+        if self.process:
+            try:
+                os.killpg(self.process.pid, signal.SIGTERM)
+                try:
+                    await asyncio.wait_for(self.process.wait(), timeout=self.kill_grace_period)
+                except asyncio.TimeoutError:
+                    pass
+                # Commands still running in the session's group are killed outright
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+            except OSError as e:
+                logger.warning(f"Failed to stop shell session: {e}")
+            await self.process.wait()
+
+        if self._transport:
+            self._transport.close()
+        self._transport = None
+        self._reader = None
+        self._pending = b""
+        self.process = None
@@ -0,0 +1,358 @@
+"""Persistent trigram index for narrowing content searches to candidate files."""
+
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from .walker import walk_files
+from .search import is_binary, BINARY_SNIFF_BYTES
+
+logger = logging.getLogger(__name__)
+
+# File states in the index
+STATE_INDEXED = 1
+STATE_UNINDEXED = 0  # too large to index; always a candidate
+STATE_BINARY = 2  # never a candidate
+
+# Pending postings are written out after this many bytes of indexed content
+_FLUSH_BYTES = 64 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    state INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (trigram INTEGER PRIMARY KEY, ids BLOB NOT NULL);
+"""
+
+
+def extract_trigrams(data: bytes) -> Set[int]:
+    """Get the distinct case-folded trigrams of some bytes as 24-bit integers."""
+    data = data.lower()
+    return {(a << 16) | (b << 8) | c for a, b, c in set(zip(data, data[1:], data[2:]))}
+
+
+class TrigramIndex:
+    """Trigram index for one directory tree, stored in SQLite.
+
+    Each file gets an id and every trigram maps to the sorted ids of the files
+    containing it. Changed files (by mtime and size) get a fresh id, so stale
+    postings simply stop resolving; they are compacted away once they
+    outnumber live files. Ids are never reused.
+    """
+
+    def __init__(self, root: str, db_path: Union[str, Path], max_file_bytes: int = 16 * 1024 * 1024):
+        """Open (or create) the index for ``root`` stored at ``db_path``."""
+        self.root = os.path.realpath(root)
+        self.db_path = Path(db_path)
+        self.max_file_bytes = max_file_bytes
+        self._lock = threading.Lock()
+        self._refreshed_at: Optional[float] = None
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute("INSERT OR IGNORE INTO meta VALUES ('root', ?)", (self.root,))
+        self._conn.commit()
+
+    def _meta(self, key: str, default: str = "") -> str:
+        """Read a metadata value."""
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key: str, value) -> None:
+        """Write a metadata value."""
+        self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, str(value)))
+
+    def update(self, progress: Optional[Callable[[int], None]] = None) -> Dict[str, int]:
+        """Bring the index up to date with the tree, re-reading only changed files."""
+        with self._lock:
+            stats = self._update(progress)
+            self._refreshed_at = time.monotonic()
+            return stats
+
+    def refresh(self, max_age: float) -> Optional[Dict[str, int]]:
+        """Update the index unless this process updated it within the last ``max_age`` seconds.
+
+        Returns the update stats, or None if the index was fresh enough to skip the walk.
+        """
+        refreshed_at = self._refreshed_at
+        if refreshed_at is not None and time.monotonic() - refreshed_at < max_age:
+            return None
+        return self.update()
+
+    def mark_stale(self) -> None:
+        """Make the next refresh walk the tree, e.g. after files may have been changed."""
+        self._refreshed_at = None
+
+    def _update(self, progress: Optional[Callable[[int], None]]) -> Dict[str, int]:
+        """Walk the tree and index new or changed files."""
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        known: Dict[str, Tuple[int, int, int]] = {
+            path: (file_id, mtime_ns, size)
+            for file_id, path, mtime_ns, size in self._conn.execute("SELECT id, path, mtime_ns, size FROM files")
+        }
+        pending: Dict[int, List[int]] = {}
+        pending_bytes = 0
+        dead = int(self._meta("dead", "0"))
+
+        for rel_path, entry in walk_files(self.root):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+
+            previous = known.pop(rel_path, None)
+            if previous is not None and previous[1:] == (stat.st_mtime_ns, stat.st_size):
+                stats["unchanged"] += 1
+                continue
+
+            if previous is not None:
+                self._conn.execute("DELETE FROM files WHERE id = ?", (previous[0],))
+                dead += 1
+                stats["updated"] += 1
+            else:
+                stats["added"] += 1
+
+            state, trigrams = self._read_file(os.path.join(self.root, rel_path), stat.st_size)
+            cursor = self._conn.execute(
+                "INSERT INTO files (path, mtime_ns, size, state) VALUES (?, ?, ?, ?)",
+                (rel_path, stat.st_mtime_ns, stat.st_size, state)
+            )
+            for trigram in trigrams:
+                pending.setdefault(trigram, []).append(cursor.lastrowid)
+
+            pending_bytes += stat.st_size if state == STATE_INDEXED else 0
+            if pending_bytes >= _FLUSH_BYTES:
+                self._flush_postings(pending)
+                pending, pending_bytes = {}, 0
+            if progress and (stats["added"] + stats["updated"]) % 1000 == 0:
+                progress(stats["added"] + stats["updated"])
+
+        self._flush_postings(pending)
+
+        # Whatever was not seen during the walk has been deleted
+        for file_id, _, _ in known.values():
+            self._conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+            dead += 1
+            stats["removed"] += 1
+
+        live = self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        if dead > max(live, 1000):
+            self._compact()
+            dead = 0
+
+        self._set_meta("dead", dead)
+        self._set_meta("updated_at", time.time())
+        self._conn.commit()
+        return stats
+
+    def _read_file(self, path: str, size: int) -> Tuple[int, Set[int]]:
+        """Read a file and return its state and trigrams."""
+        if size > self.max_file_bytes:
+            return STATE_UNINDEXED, set()
+        try:
+            with open(path, "rb") as f:
+                data = f.read(self.max_file_bytes + 1)
+        except OSError:
+            return STATE_UNINDEXED, set()
+        if is_binary(data[:BINARY_SNIFF_BYTES]):
+            return STATE_BINARY, set()
+        if len(data) > self.max_file_bytes:
+            return STATE_UNINDEXED, set()
+        return STATE_INDEXED, extract_trigrams(data)
+
+    def _flush_postings(self, pending: Dict[int, List[int]]) -> None:
+        """Append pending file ids to their trigram posting lists."""
+        for trigram, ids in pending.items():
+            row = self._conn.execute("SELECT ids FROM postings WHERE trigram = ?", (trigram,)).fetchone()
+            posting = array("I")
+            if row:
+                posting.frombytes(row[0])
+            posting.extend(ids)
+            self._conn.execute("INSERT OR REPLACE INTO postings VALUES (?, ?)", (trigram, posting.tobytes()))
+
+    def _compact(self) -> None:
+        """Drop ids of deleted or replaced files from every posting list."""
+        live = {row[0] for row in self._conn.execute("SELECT id FROM files")}
+        rows = self._conn.execute("SELECT trigram, ids FROM postings").fetchall()
+        for trigram, blob in rows:
+            posting = array("I")
+            posting.frombytes(blob)
+            kept = array("I", (file_id for file_id in posting if file_id in live))
+            if not kept:
+                self._conn.execute("DELETE FROM postings WHERE trigram = ?", (trigram,))
+            elif len(kept) != len(posting):
+                self._conn.execute("UPDATE postings SET ids = ? WHERE trigram = ?", (kept.tobytes(), trigram))
+        logger.info(f"Compacted trigram index for {self.root}")
+
+    def candidates(self, literal: str, prefix: str = "") -> Optional[List[str]]:
+        """Get root-relative paths that may contain ``literal`` (case-insensitively).
+
+        Only paths under the root-relative ``prefix`` are returned. Returns None
+        when the literal is too short to narrow the search.
+        """
+        trigrams = extract_trigrams(literal.encode("utf-8"))
+        if not trigrams:
+            return None
+
+        with self._lock:
+            ids: Optional[Set[int]] = None
+            postings = []
+            for trigram in trigrams:
+                row = self._conn.execute("SELECT ids FROM postings WHERE trigram = ?", (trigram,)).fetchone()
+                if not row:
+                    postings = []
+                    ids = set()
+                    break
+                posting = array("I")
+                posting.frombytes(row[0])
+                postings.append(posting)
+
+            # Intersect from the rarest trigram up
+            for posting in sorted(postings, key=len):
+                ids = set(posting) if ids is None else ids.intersection(posting)
+                if not ids:
+                    break
+
+            paths = self._paths_for_ids(ids or set())
+            paths.extend(row[0] for row in self._conn.execute(
+                "SELECT path FROM files WHERE state = ?", (STATE_UNINDEXED,)
+            ))
+
+        if prefix:
+            prefix = prefix.rstrip("/") + "/"
+            paths = [path for path in paths if path.startswith(prefix)]
+        return sorted(paths)
+
+    def _paths_for_ids(self, ids: Iterable[int]) -> List[str]:
+        """Resolve live file ids to paths."""
+        ids = list(ids)
+        paths = []
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(ids), 900):
+            batch = ids[start:start + 900]
+            placeholders = ",".join("?" * len(batch))
+            paths.extend(row[0] for row in self._conn.execute(
+                f"SELECT path FROM files WHERE id IN ({placeholders})", batch
+            ))
+        return paths
+
+    def info(self) -> Dict[str, Union[str, int, float]]:
+        """Describe the index."""
+        with self._lock:
+            files, total_bytes = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM files").fetchone()
+            unindexed = self._conn.execute(
+                "SELECT COUNT(*) FROM files WHERE state = ?", (STATE_UNINDEXED,)
+            ).fetchone()[0]
+            trigrams = self._conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+            updated_at = float(self._meta("updated_at", "0") or 0)
+        return {
+            "root": self.root,
+            "path": str(self.db_path),
+            "files": files,
+            "bytes": total_bytes,
+            "unindexed_files": unindexed,
+            "trigrams": trigrams,
+            "index_bytes": self.db_path.stat().st_size if self.db_path.exists() else 0,
+            "updated_at": updated_at
+        }
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
+
+
+class IndexManager:
+    """Finds, opens and drops per-root trigram indexes under one directory."""
+
+    def __init__(self, index_dir: Union[str, Path] = "~/.terminai/index"):
+        """Initialize the manager."""
+        self.index_dir = Path(index_dir).expanduser()
+        self._open: Dict[str, TrigramIndex] = {}
+        self._lock = threading.Lock()
+
+    def _db_path(self, root: str) -> Path:
+        """Get the database file for a root directory."""
+        digest = hashlib.sha256(root.encode("utf-8")).hexdigest()[:16]
+        return self.index_dir / f"{digest}.sqlite"
+
+    def open(self, root: str, create: bool = False) -> Optional[TrigramIndex]:
+        """Open the index for exactly ``root``; only creates one when asked."""
+        root = os.path.realpath(root)
+        with self._lock:
+            if root in self._open:
+                return self._open[root]
+            db_path = self._db_path(root)
+            if not create and not db_path.exists():
+                return None
+            index = TrigramIndex(root, db_path)
+            self._open[root] = index
+            return index
+
+    def find(self, path: str) -> Optional[Tuple[TrigramIndex, str]]:
+        """Find the index covering ``path``, returning it with the path's root-relative prefix."""
+        path = os.path.realpath(path)
+        candidate = path
+        while True:
+            index = self.open(candidate)
+            if index is not None:
+                return index, os.path.relpath(path, candidate) if path != candidate else ""
+            parent = os.path.dirname(candidate)
+            if parent == candidate:
+                return None
+            candidate = parent
+
+    def list_roots(self) -> List[str]:
+        """List the roots that have an index."""
+        if not self.index_dir.exists():
+            return []
+        roots = []
+        for db_path in sorted(self.index_dir.glob("*.sqlite")):
+            try:
+                conn = sqlite3.connect(str(db_path))
+                try:
+                    row = conn.execute("SELECT value FROM meta WHERE key = 'root'").fetchone()
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                continue
+            if row:
+                roots.append(row[0])
+        return roots
+
+    def drop(self, root: str) -> bool:
+        """Delete the index for ``root``."""
+        root = os.path.realpath(root)
+        with self._lock:
+            index = self._open.pop(root, None)
+            if index is not None:
+                index.close()
+        db_path = self._db_path(root)
+        if not db_path.exists():
+            return False
+        db_path.unlink()
+        return True
+
+    def mark_stale(self) -> None:
+        """Make the next refresh of every open index walk its tree."""
+        with self._lock:
+            for index in self._open.values():
+                index.mark_stale()
+
+    def close(self) -> None:
+        """Close all open indexes."""
+        with self._lock:
+            for index in self._open.values():
+                index.close()
+            self._open.clear()
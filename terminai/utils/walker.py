@@ -0,0 +1,278 @@
+"""Directory walking with .gitignore rules and parallel directory scans."""
+
+import os
+import re
+import fnmatch
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, Pattern, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Version control metadata is never interesting to search or list
+VCS_DIRS = frozenset({".git", ".hg", ".svn", ".bzr"})
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def _translate_glob(pattern: str) -> str:
+    """Translate a gitignore glob into a regex fragment."""
+    parts = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif c == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif c == "?":
+            parts.append("[^/]")
+            i += 1
+        elif c == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                parts.append(re.escape(c))
+                i += 1
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                parts.append(f"[{body}]")
+                i = end + 1
+        elif c == "\\" and i + 1 < n:
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(c))
+            i += 1
+    return "".join(parts)
+
+
+class IgnoreRules:
+    """Stack of .gitignore rules; each directory adds its own file's rules on top of its parent's."""
+
+    def __init__(self, rules: Optional[List[Tuple[str, Pattern[str], bool, bool]]] = None):
+        """Initialize with (base directory, regex, negated, directory only) rules."""
+        self.rules = rules or []
+
+    @staticmethod
+    def parse(lines: Iterable[str], base: str = "") -> List[Tuple[str, Pattern[str], bool, bool]]:
+        """Parse .gitignore lines relative to ``base`` (a root-relative directory)."""
+        rules = []
+        for line in lines:
+            line = line.rstrip("\n").rstrip("\r")
+            if not line.endswith("\\ "):
+                line = line.rstrip(" ")
+            if not line or line.startswith("#"):
+                continue
+
+            negated = line.startswith("!")
+            if negated:
+                line = line[1:]
+            elif line.startswith("\\"):
+                line = line[1:]
+
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+
+            # A slash anywhere but the end anchors the pattern to the .gitignore's directory
+            anchored = "/" in line
+            line = line.lstrip("/")
+            prefix = "" if anchored else "(?:.*/)?"
+            rules.append((base, re.compile(f"^{prefix}{_translate_glob(line)}$"), negated, dir_only))
+        return rules
+
+    def child(self, base: str, gitignore_path: str) -> "IgnoreRules":
+        """Return the rules for a directory, adding its .gitignore if present."""
+        try:
+            with open(gitignore_path, "r", errors="replace") as f:
+                added = self.parse(f, base)
+        except OSError:
+            return self
+        return IgnoreRules(self.rules + added) if added else self
+
+    def is_ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """Check a root-relative path against the rules; the last matching rule wins."""
+        ignored = False
+        for base, regex, negated, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if base:
+                if not rel_path.startswith(base + "/"):
+                    continue
+                candidate = rel_path[len(base) + 1:]
+            else:
+                candidate = rel_path
+            if regex.match(candidate):
+                ignored = not negated
+        return ignored
+
+
+def ordered_map(
+    executor: ThreadPoolExecutor,
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    window: int
+) -> Iterator[R]:
+    """Map ``fn`` over ``items`` on ``executor`` with at most ``window`` calls in flight.
+
+    Results are yielded in input order, and stopping iteration early leaves at
+    most ``window`` calls to finish, so large inputs are never submitted at once.
+    """
+    pending: Deque = deque()
+    iterator = iter(items)
+    try:
+        for item in iterator:
+            pending.append(executor.submit(fn, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _scan_directory(
+    root: str,
+    rel_dir: str,
+    rules: IgnoreRules,
+    use_ignore: bool
+) -> Tuple[List[Tuple[str, os.DirEntry]], List[Tuple[str, IgnoreRules]]]:
+    """Scan one directory and split its entries into files and subdirectories to visit."""
+    directory = os.path.join(root, rel_dir) if rel_dir else root
+    if use_ignore:
+        rules = rules.child(rel_dir, os.path.join(directory, ".gitignore"))
+
+    files = []
+    subdirs = []
+    try:
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except OSError as e:
+        logger.debug(f"Skipping unreadable directory {directory}: {e}")
+        return files, subdirs
+
+    for entry in entries:
+        rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+            is_file = not is_dir and entry.is_file()
+        except OSError:
+            continue
+
+        if is_dir and entry.name in VCS_DIRS:
+            continue
+        if use_ignore and rules.is_ignored(rel_path, is_dir):
+            continue
+        if is_dir:
+            subdirs.append((rel_path, rules))
+        elif is_file:
+            files.append((rel_path, entry))
+
+    return files, subdirs
+
+
+def walk_files(
+    root: str,
+    recursive: bool = True,
+    file_pattern: Optional[str] = None,
+    use_ignore: bool = True,
+    max_workers: int = 8
+) -> Iterator[Tuple[str, os.DirEntry]]:
+    """Yield ``(relative path, DirEntry)`` for files under ``root``.
+
+    Directories are scanned breadth-first on a thread pool, several at a time,
+    while results come out in a deterministic order. VCS directories and paths
+    matched by .gitignore files are pruned; ``file_pattern`` filters file names.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="terminai-walk") as executor:
+        queue: Deque[Tuple[str, IgnoreRules]] = deque([("", IgnoreRules())])
+        in_flight: Deque = deque()
+
+        while queue or in_flight:
+            # Keep up to max_workers directory scans running ahead of the consumer
+            while queue and len(in_flight) < max_workers:
+                rel_dir, rules = queue.popleft()
+                in_flight.append(executor.submit(_scan_directory, root, rel_dir, rules, use_ignore))
+
+            files, subdirs = in_flight.popleft().result()
+            for rel_path, entry in files:
+                if file_pattern and not fnmatch.fnmatch(entry.name, file_pattern):
+                    continue
+                yield rel_path, entry
+            if recursive:
+                queue.extend(subdirs)
+
+
+def iter_entries(
+    root: str,
+    max_depth: Optional[int] = None,
+    use_ignore: bool = True,
+    after: Optional[str] = None
+) -> Iterator[Tuple[str, os.DirEntry, bool]]:
+    """Lazily yield ``(relative path, DirEntry, is_dir)`` depth-first in sorted order.
+
+    Only directories that are actually reached get scanned, so stopping early
+    is cheap. ``after`` resumes right after that relative path without
+    re-walking the subtrees before it. ``max_depth`` of 1 lists only direct
+    children.
+    """
+    cursor = after.strip("/").split("/") if after else None
+    return _iter_directory(root, "", IgnoreRules(), 1, max_depth, use_ignore, cursor)
+
+
+def _iter_directory(
+    root: str,
+    rel_dir: str,
+    rules: IgnoreRules,
+    depth: int,
+    max_depth: Optional[int],
+    use_ignore: bool,
+    cursor: Optional[List[str]]
+) -> Iterator[Tuple[str, os.DirEntry, bool]]:
+    """Yield one directory's entries, descending into subdirectories as they come up."""
+    directory = os.path.join(root, rel_dir) if rel_dir else root
+    if use_ignore:
+        rules = rules.child(rel_dir, os.path.join(directory, ".gitignore"))
+
+    try:
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except OSError as e:
+        logger.debug(f"Skipping unreadable directory {directory}: {e}")
+        return
+
+    for entry in entries:
+        child_cursor = None
+        if cursor:
+            if entry.name < cursor[0]:
+                continue
+            if entry.name == cursor[0]:
+                child_cursor = cursor[1:]
+            cursor = None
+
+        rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+        except OSError:
+            continue
+        if is_dir and entry.name in VCS_DIRS:
+            continue
+        if use_ignore and rules.is_ignored(rel_path, is_dir):
+            continue
+
+        # The cursor entry and its ancestors were returned on an earlier page
+        if child_cursor is None:
+            yield rel_path, entry, is_dir
+        if is_dir and (max_depth is None or depth < max_depth):
+            yield from _iter_directory(root, rel_path, rules, depth + 1, max_depth, use_ignore, child_cursor or None)
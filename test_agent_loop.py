@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Test the multi-turn agent loop and parallel tool execution."""
+
+import asyncio
+import json
+import time
+
+from terminai.llm.agent import AgentLoop
+from terminai.llm.base import LLMMessage, LLMResponse
+from terminai.tools.manager import ToolManager, ToolResult
+
+
+def make_tool_manager():
+    """Create a tool manager with a single sleeping tool."""
+    tool_manager = ToolManager()
+
+    async def sleep_tool(seconds: float, label: str) -> ToolResult:
+        await asyncio.sleep(float(seconds))
+        return ToolResult(success=True, content=label)
+
+    tool_manager.register_tool(
+        name="sleep",
+        description="Sleep and echo a label",
+        parameters={
+            "seconds": {"type": "number", "description": "Seconds to sleep", "required": True},
+            "label": {"type": "string", "description": "Label to return", "required": True}
+        },
+        executor=sleep_tool
+    )
+    return tool_manager
+
+
+def make_generate(delays):
+    """Create a fake model that calls the sleep tool once per delay, then answers."""
+    seen = []
+
+    async def generate(messages, tools=None):
+        seen.append(list(messages))
+        if len(seen) == 1:
+            return LLMResponse(content="", tool_calls=[
+                {"id": f"call_{i}", "type": "function",
+                 "function": {"name": "sleep", "arguments": json.dumps({"seconds": delay, "label": f"result_{i}"})}}
+                for i, delay in enumerate(delays)
+            ])
+        return LLMResponse(content="done")
+
+    return generate, seen
+
+
+def test_parallel_tools_results_in_call_order():
+    """Independent tool calls run concurrently and results return in call order."""
+    generate, seen = make_generate([0.3, 0.1, 0.2])
+    loop = AgentLoop(generate, make_tool_manager(), max_concurrency=3)
+    messages = [LLMMessage(role="user", content="go")]
+
+    start = time.perf_counter()
+    result = asyncio.run(loop.run(messages))
+    elapsed = time.perf_counter() - start
+
+    assert result.stop_reason == "complete"
+    assert result.turns == 2
+    assert result.response.content == "done"
+    assert elapsed < 0.5, f"tools did not run concurrently ({elapsed:.2f}s)"
+
+    # The second model call saw the assistant turn plus results in the original order
+    second_call = seen[1]
+    assert second_call[1].role == "assistant" and len(second_call[1].tool_calls) == 3
+    assert [(m.tool_call_id, m.content) for m in second_call[2:]] == [
+        ("call_0", "result_0"), ("call_1", "result_1"), ("call_2", "result_2")
+    ]
+    print(f"✓ 3 tool calls ran in {elapsed:.2f}s with ordered results")
+
+
+def test_limits():
+    """Concurrency limit, time budget and max turns are enforced."""
+    generate, _ = make_generate([0.1, 0.1, 0.1])
+    start = time.perf_counter()
+    asyncio.run(AgentLoop(generate, make_tool_manager(), max_concurrency=1).run([LLMMessage(role="user", content="go")]))
+    assert time.perf_counter() - start >= 0.3
+    print("✓ max_concurrency=1 runs tools one at a time")
+
+    generate, _ = make_generate([0.5])
+    messages = [LLMMessage(role="user", content="go")]
+    result = asyncio.run(AgentLoop(generate, make_tool_manager(), time_budget=0.1).run(messages))
+    assert result.stop_reason == "time_budget"
+    assert messages[-1].content.startswith("Error:")
+    print("✓ time budget stops long-running tools")
+
+    generate, _ = make_generate([0])
+    result = asyncio.run(AgentLoop(generate, make_tool_manager(), max_turns=1).run([LLMMessage(role="user", content="go")]))
+    assert result.stop_reason == "max_turns" and result.turns == 1
+    print("✓ max_turns stops the loop")
+
+
+def test_failed_tool_calls_reported():
+    """Declined and failing calls are reported so they are not remembered as good suggestions."""
+    generate, _ = make_generate([0, 0, "soon"])
+    loop = AgentLoop(generate, make_tool_manager(), confirm_tool_call=lambda name, args: args["label"] != "result_1")
+    result = asyncio.run(loop.run([LLMMessage(role="user", content="go")]))
+    assert result.tool_calls == 3 and result.failed_tool_calls == ["call_1", "call_2"]
+    print("✓ Declined and failed tool calls reported")
+
+
+if __name__ == "__main__":
+    test_parallel_tools_results_in_call_order()
+    test_limits()
+    test_failed_tool_calls_reported()
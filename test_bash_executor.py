@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Test the non-blocking BashExecutor execution path."""
+
+import asyncio
+import os
+import time
+
+from terminai.utils.bash import BashExecutor
+
+
+def test_streams_lines_and_caps_output():
+    """Lines are emitted as they arrive and only head/tail are kept."""
+    executor = BashExecutor(max_output_bytes=200)
+    lines = []
+
+    exit_code, stdout, stderr = asyncio.run(executor.execute_command_async(
+        "echo first; echo oops >&2; seq 1 100000; printf last",
+        on_output=lambda stream, line: lines.append((stream, line))
+    ))
+
+    assert exit_code == 0
+    assert ("stdout", "first") in lines and ("stderr", "oops") in lines
+    assert ("stdout", "last") in lines
+    assert stdout.startswith("first\n1\n") and stdout.endswith("100000\nlast")
+    assert "bytes omitted" in stdout and len(stdout) < 300
+    assert stderr == "oops\n"
+    print("✓ Output streamed line by line and capped to head/tail")
+
+
+def test_timeout_kills_process_group():
+    """A timed-out command and its children are killed without blocking the loop."""
+    executor = BashExecutor(kill_grace_period=0.2)
+    marker = f"terminai-test-{os.getpid()}"
+
+    async def run():
+        ticks = []
+
+        async def ticker():
+            while True:
+                await asyncio.sleep(0.05)
+                ticks.append(time.monotonic())
+
+        ticking = asyncio.ensure_future(ticker())
+        result = await executor.execute_command_async(
+            f"trap '' TERM; (trap '' TERM; exec -a {marker} sleep 30) & sleep 30",
+            timeout=0.5
+        )
+        ticking.cancel()
+        return result, ticks
+
+    start = time.monotonic()
+    (exit_code, _, stderr), ticks = asyncio.run(run())
+    elapsed = time.monotonic() - start
+
+    assert exit_code == -1 and "timed out" in stderr
+    assert elapsed < 3, f"timeout took {elapsed:.2f}s"
+    assert len(ticks) >= 5, "event loop was blocked while the command ran"
+
+    survivors = os.popen(f"pgrep -f '^{marker}'").read().split()
+    assert not survivors, f"children survived: {survivors}"
+    print(f"✓ Timed-out process group killed in {elapsed:.2f}s")
+
+
+def test_persistent_session_keeps_state():
+    """cd, export and aliases carry over between commands in a persistent session."""
+    executor = BashExecutor(persistent_session=True)
+    original_cwd = os.getcwd()
+
+    async def run():
+        results = []
+        for command in ["cd /tmp && export GREETING=hi && alias greet='echo $GREETING'",
+                        "pwd", "greet", "printf partial", "exit 3", "echo restarted"]:
+            results.append(await executor.execute_command_async(command))
+        await executor.close()
+        return results
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        os.chdir(original_cwd)
+
+    assert results[1] == (0, "/tmp\n", "")
+    assert results[2] == (0, "hi\n", "")
+    assert results[3] == (0, "partial", "")
+    assert results[4][0] == 3
+    assert results[5] == (0, "restarted\n", "")
+    print("✓ Persistent session keeps cwd, environment and aliases")
+
+
+if __name__ == "__main__":
+    test_streams_lines_and_caps_output()
+    test_timeout_kills_process_group()
+    test_persistent_session_keeps_state()
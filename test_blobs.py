@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Test spilling large tool output to disk and paging it back."""
+
+import asyncio
+import os
+import tempfile
+import time
+
+from terminai.tools.blobs import BlobStore
+from terminai.tools.builtin import BuiltinTools
+from terminai.tools.manager import ToolManager, ToolResult
+from terminai.utils.bash import BashExecutor
+
+BIG = "\n".join(f"line {i}: " + "x" * 60 for i in range(5000))
+
+
+def make_store(**kwargs):
+    """A blob store in a fresh directory."""
+    return BlobStore(tempfile.mkdtemp(), **kwargs)
+
+
+def test_spill_and_preview():
+    """Large content is replaced by a bounded head/tail preview naming the saved blob."""
+    store = make_store()
+    small = ToolResult(success=True, content="short output")
+    assert store.spill(small) is small
+
+    result = store.spill(ToolResult(success=True, content=BIG))
+    assert result.truncated and result.total_lines == 5000 and result.total_bytes == len(BIG)
+    assert len(result.content.encode()) <= store.spill_bytes + 512
+    assert result.content.startswith("line 0: ") and result.content.rstrip().endswith("line 4999: " + "x" * 60)
+    assert f'"{result.blob_id}"' in result.content and "fetch_tool_output" in result.content
+    assert store.read(result.blob_id) == BIG
+
+    # Identical output is stored once
+    again = store.spill(ToolResult(success=True, content=BIG))
+    assert again.blob_id == result.blob_id
+    assert len(list(store.directory.glob("*/*"))) == 1
+
+    # A single enormous line is cut rather than sent whole
+    one_line = store.spill(ToolResult(success=True, content="y" * 100000))
+    assert one_line.truncated and len(one_line.content) < 20000
+    print(f"✓ {len(BIG) // 1024} KB of output became a {len(result.content) // 1024} KB preview")
+
+
+def test_paging_and_patterns():
+    """Saved output is read back by line ranges or matching lines."""
+    store = make_store()
+    blob_id = store.spill(ToolResult(success=True, content=BIG)).blob_id
+
+    page = store.page(blob_id, offset=100, limit=3)
+    assert page.success
+    assert page.content.splitlines()[1:4] == [f"{i + 1}: line {i}: " + "x" * 60 for i in (100, 101, 102)]
+    assert "offset=103" in page.content
+
+    matches = store.page(blob_id, pattern=r"^line 49\d\d:", limit=500)
+    assert "matches for" in matches.content and "of 100]" in matches.content
+    assert "More available" not in matches.content
+
+    # Pages never grow past the spill threshold themselves
+    huge_page = store.page(blob_id, limit=100000)
+    assert len(huge_page.content.encode()) <= store.spill_bytes
+
+    assert not store.page("0123456789abcdef").success
+    assert not store.page("../../etc/passwd").success
+    assert not store.page(blob_id, pattern="(").success
+    print("✓ Saved output paged by offset, limit and pattern")
+
+
+def test_pruning():
+    """The store drops its oldest blobs once over its size limit."""
+    store = make_store(spill_bytes=100, max_bytes=25000)
+    ids = []
+    for i in range(5):
+        ids.append(store.put(f"{i}" * 10000))
+        path = store.path(ids[-1])
+        os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+    store.put("final" * 2000)
+    remaining = {path.name for path in store.directory.glob("*/*")}
+    assert ids[0] not in remaining and ids[-1] in remaining
+    assert sum(path.stat().st_size for path in store.directory.glob("*/*")) <= 25000
+    print("✓ Oldest blobs pruned past max_bytes")
+
+
+def test_tool_manager_spills_and_fetch_tool():
+    """Every tool's large output is spilled, and fetch_tool_output reads it back."""
+    store = make_store()
+    manager = ToolManager(blob_store=store)
+    BuiltinTools(BashExecutor(), index_dir=tempfile.mkdtemp(), blob_store=store).register_all(manager)
+    assert "fetch_tool_output" in manager.list_tools()
+
+    async def run():
+        result = await manager.execute_tool("execute_command", {"command": "seq 1 20000"})
+        page = await manager.execute_tool("fetch_tool_output", {"id": result.blob_id, "pattern": "^12345$"})
+        return result, page
+
+    result, page = asyncio.run(run())
+    assert result.success and result.truncated and len(result.content) < len(store.read(result.blob_id))
+    assert page.success and "12345" in page.content and not page.truncated
+
+    # Pages of saved output are never spilled again
+    async def fetch_pages():
+        blob_id = (await manager.execute_tool("execute_command", {"command": "seq 1 5000"})).blob_id
+        first = await manager.execute_tool("fetch_tool_output", {"id": blob_id, "offset": 0, "limit": 1000})
+        end = int(first.content.rsplit("offset=", 1)[1].rstrip("]"))
+        second = await manager.execute_tool("fetch_tool_output", {"id": blob_id, "offset": end, "limit": 1000})
+        return first, end, second
+
+    first, end, second = asyncio.run(fetch_pages())
+    assert not first.truncated and first.blob_id is None
+    assert len(first.content.encode()) <= store.spill_bytes
+    numbers = [line.split(": ", 1)[1] for line in first.content.splitlines()[1:-1]]
+    assert len(numbers) == end
+    assert second.content.splitlines()[1].startswith(f"{end + 1}: ")
+
+    # Without a store, nothing changes
+    plain = ToolManager()
+    BuiltinTools(BashExecutor(), index_dir=tempfile.mkdtemp()).register_all(plain)
+    assert "fetch_tool_output" not in plain.list_tools()
+    print("✓ Tool output spilled by ToolManager and fetched back")
+
+
+if __name__ == "__main__":
+    test_spill_and_preview()
+    test_paging_and_patterns()
+    test_pruning()
+    test_tool_manager_spills_and_fetch_tool()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Test the compiled command classifier and the $PATH executable index."""
+
+import os
+import stat
+import tempfile
+
+from terminai.utils.bash import BashExecutor
+from terminai.utils.classifier import CommandClassifier, BASH, NATURAL_LANGUAGE
+from terminai.utils.path_index import ExecutableIndex
+
+
+def install(directory, name):
+    """Create an executable script in a directory."""
+    path = os.path.join(directory, name)
+    with open(path, "w") as f:
+        f.write("#!/bin/sh\n")
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+    return path
+
+
+def test_classifies_mixed_input():
+    """Commands, requests and prose are told apart, with confidences."""
+    executor = BashExecutor()
+    for text in ["ls -la", "cat foo | grep x", "./run.sh", "FOO=1 make", "(cd /tmp && ls)", "git status"]:
+        assert executor.is_bash_command(text), text
+    for text in ["please list files", "What is my ip", "list all python files", "-h",
+                 "explain this code to me", "summarize the readme"]:
+        assert not executor.is_bash_command(text), text
+
+    decision = executor.classify_input("find the largest file in this directory")
+    assert decision.kind == BASH and decision.confidence < 0.9 and decision.command == "find"
+    assert executor.classify_input("ls -la").confidence > 0.9
+    assert executor.classify_input("").kind == NATURAL_LANGUAGE
+    print("✓ Mixed input classified with confidences")
+
+
+def test_installed_commands_are_recognised():
+    """Executables on PATH are bash however they are named, and installs are picked up."""
+    directory = tempfile.mkdtemp()
+    install(directory, "7z")
+    old_path = os.environ.get("PATH", "")
+    os.environ["PATH"] = directory + os.pathsep + old_path
+    try:
+        index = ExecutableIndex(refresh_interval=0)
+        classifier = CommandClassifier(index)
+        assert classifier.classify("7z x archive zip").is_bash
+        assert not classifier.classify("frobnicate the widgets now").is_bash
+        assert index.lookup("7z") == os.path.join(directory, "7z")
+
+        # Not executable: not a command
+        open(os.path.join(directory, "notes"), "w").close()
+        install(directory, "frobnicate")
+        assert "notes" not in index
+        assert classifier.classify("frobnicate the widgets now").is_bash
+
+        os.environ["PATH"] = old_path
+        assert "7z" not in index
+    finally:
+        os.environ["PATH"] = old_path
+    print("✓ PATH executables recognised and index refreshed on install and PATH change")
+
+
+if __name__ == "__main__":
+    test_classifies_mixed_input()
+    test_installed_commands_are_recognised()
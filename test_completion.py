@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Test tab completion of commands, ! commands and paths."""
+
+import os
+import stat
+import tempfile
+import time
+
+from terminai.terminal import SPECIAL_COMMANDS
+from terminai.utils.completion import CommandCompleter, PrefixTrie
+from terminai.utils.path_index import ExecutableIndex
+
+
+def install(directory, name):
+    """Create an executable script in a directory."""
+    path = os.path.join(directory, name)
+    with open(path, "w") as f:
+        f.write("#!/bin/sh\n")
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+
+
+def complete(completer, line):
+    """Complete the last word of a line, as readline would with our delimiters."""
+    begidx = max(line.rfind(c) for c in " |;&") + 1
+    return completer.complete(line, begidx, len(line))
+
+
+def test_prefix_trie():
+    """Words are listed in order by prefix and removals prune the trie."""
+    trie = PrefixTrie(["git", "gitk", "grep", "gzip"])
+    assert trie.complete("g") == ["git", "gitk", "grep", "gzip"]
+    assert trie.complete("gi") == ["git", "gitk"]
+    assert trie.complete("g", limit=2) == ["git", "gitk"]
+    trie.remove("gitk")
+    trie.remove("missing")
+    assert trie.complete("gi") == ["git"] and "gitk" not in trie and trie.size == 3
+    trie.remove("git")
+    assert trie.complete("gi") == [] and "i" not in trie.root["g"]
+    print("✓ Prefix trie lists, limits and prunes")
+
+
+def test_commands_specials_and_paths():
+    """Commands, ! commands, subcommands and paths complete from the right source."""
+    bin_dir = tempfile.mkdtemp()
+    install(bin_dir, "terminai-fake-tool")
+    old_path = os.environ.get("PATH", "")
+    os.environ["PATH"] = bin_dir + os.pathsep + old_path
+    try:
+        index = ExecutableIndex(refresh_interval=0)
+        completer = CommandCompleter(index, SPECIAL_COMMANDS)
+
+        assert complete(completer, "terminai-fa") == ["terminai-fake-tool"]
+        assert complete(completer, "ls | terminai-f") == ["terminai-fake-tool"]
+        assert "cd" in complete(completer, "c")
+        assert complete(completer, "!t") == ["!tools"]
+        assert complete(completer, "!index ") == ["build", "info", "drop", "list"]
+        assert complete(completer, "!mcp l") == ["list"]
+
+        # Installs and removals reach the trie without a full rebuild
+        install(bin_dir, "terminai-fake-other")
+        assert complete(completer, "terminai-fa") == ["terminai-fake-other", "terminai-fake-tool"]
+        os.remove(os.path.join(bin_dir, "terminai-fake-tool"))
+        assert complete(completer, "terminai-fa") == ["terminai-fake-other"]
+    finally:
+        os.environ["PATH"] = old_path
+
+    root = tempfile.mkdtemp()
+    os.makedirs(os.path.join(root, "src", "pkg"))
+    open(os.path.join(root, "src", "setup.py"), "w").close()
+    open(os.path.join(root, "src", ".hidden"), "w").close()
+    assert complete(completer, f"cat {root}/s") == [f"{root}/src/"]
+    assert complete(completer, f"cat {root}/src/") == [f"{root}/src/pkg/", f"{root}/src/setup.py"]
+    assert complete(completer, f"cat {root}/src/.h") == [f"{root}/src/.hidden"]
+    open(os.path.join(root, "src", "setup.cfg"), "w").close()
+    assert complete(completer, f"cat {root}/src/setup") == [f"{root}/src/setup.cfg", f"{root}/src/setup.py"]
+    print("✓ Commands, ! commands, subcommands and paths complete")
+
+
+def test_keystroke_latency():
+    """Once warm, each completion keystroke takes well under a millisecond."""
+    completer = CommandCompleter(ExecutableIndex(), SPECIAL_COMMANDS)
+    completer.sync()
+
+    lines = ["g", "gi", "git", "p", "py", "pyt", "!", "!to", "ls ", "ls /us", "ls /usr/", "cat REA"]
+    start = time.perf_counter()
+    rounds = 200
+    for _ in range(rounds):
+        for line in lines:
+            complete(completer, line)
+    per_keystroke_ms = (time.perf_counter() - start) * 1000 / (rounds * len(lines))
+    assert per_keystroke_ms < 1.0, f"{per_keystroke_ms:.3f} ms per keystroke"
+    print(f"✓ {per_keystroke_ms * 1000:.0f} us per completion keystroke")
+
+
+if __name__ == "__main__":
+    test_prefix_trie()
+    test_commands_specials_and_paths()
+    test_keystroke_latency()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Test the token-budgeted conversation context."""
+
+import asyncio
+
+from terminai.llm.agent import AgentLoop
+from terminai.llm.base import LLMMessage, LLMResponse
+from terminai.llm.context import ConversationContext, compact_output, estimate_tokens, message_tokens
+from terminai.tools.manager import ToolManager, ToolResult
+
+SYSTEM = LLMMessage(role="system", content="You are helpful. " * 20)
+
+
+def tool_turn(context, prompt, output, call_id):
+    """Add a user prompt, a tool call with its output and a final answer."""
+    context.start_turn([SYSTEM, LLMMessage(role="user", content=prompt)])
+    call = {"id": call_id, "type": "function", "function": {"name": "read_file", "arguments": "{}"}}
+    context.messages.append(LLMMessage(role="assistant", content="", tool_calls=[call]))
+    context.messages.append(LLMMessage(role="tool", content=output, tool_call_id=call_id))
+    context.messages.append(LLMMessage(role="assistant", content=f"answer to {prompt}"))
+
+
+def test_incremental_counts():
+    """Token counts follow appends, replacements and clears without recounting everything."""
+    context = ConversationContext(max_tokens=10000)
+    tool_turn(context, "first", "x" * 400, "call_1")
+    context.fit()
+    assert context.total_tokens == sum(message_tokens(message) for message in context.messages)
+    assert estimate_tokens("x" * 400) == 100
+
+    # A new system prompt replaces the pinned one rather than adding another
+    context.start_turn([LLMMessage(role="system", content="short"), LLMMessage(role="user", content="second")])
+    assert [m.role for m in context.messages].count("system") == 1 and context.messages[0].content == "short"
+    assert context.total_tokens == sum(message_tokens(message) for message in context.messages)
+
+    assert context.recent_requests() == ["first", "second"] and context.tools_called() == ["read_file"]
+
+    context.clear()
+    assert [m.role for m in context.messages] == ["system"] and context.total_tokens == message_tokens(context.messages[0])
+    print("✓ Incremental token counts")
+
+
+def test_old_tool_output_compacted_before_turns_dropped():
+    """Over budget, earlier tool output is cut to head and tail before any turn is dropped."""
+    big_output = "\n".join(f"line {i} " + "y" * 40 for i in range(200))
+    context = ConversationContext(max_tokens=2500, reserve_tokens=500)
+    tool_turn(context, "read big file", big_output, "call_1")
+    tool_turn(context, "and again", "short", "call_2")
+    context.fit()
+
+    assert context.total_tokens <= context.budget
+    assert context.compacted == 1 and context.dropped == 0
+    compacted = context.messages[3].content
+    assert compacted.startswith("line 0 ") and "[... 188 lines omitted ...]" in compacted and compacted.endswith("line 199 " + "y" * 40)
+    assert context.messages[0] is SYSTEM
+    print("✓ Old tool output compacted first")
+
+
+def test_oldest_turns_dropped_and_system_pinned():
+    """Long sessions drop whole turns from the start and keep the system prompt."""
+    context = ConversationContext(max_tokens=1500)
+    for i in range(30):
+        tool_turn(context, f"question {i}", "z" * 800, f"call_{i}")
+        context.fit()
+        assert context.total_tokens <= context.budget
+
+    roles = [message.role for message in context.messages]
+    assert roles[0] == "system" and roles[1] == "user", roles
+    assert context.messages[-4].content == "question 29"
+    # Every tool result still follows the call that asked for it
+    for i, message in enumerate(context.messages):
+        if message.role == "tool":
+            assert context.messages[i - 1].tool_calls[0]["id"] == message.tool_call_id
+    stats = context.stats()
+    assert stats["dropped"] > 0 and stats["turns"] < 30
+    print(f"✓ Kept the last {stats['turns']} of 30 turns within {stats['budget']} tokens")
+
+
+def test_current_turn_compacted_as_last_resort():
+    """A single huge tool output in the current turn is compacted rather than overflowing."""
+    context = ConversationContext(max_tokens=2000)
+    tool_turn(context, "dump logs", "\n".join("w" * 100 for _ in range(500)), "call_1")
+    context.fit()
+    assert context.total_tokens <= context.budget and context.dropped == 0
+    assert compact_output("short") == "short"
+    print("✓ Current turn compacted only as a last resort")
+
+
+def test_agent_loop_fits_before_each_call():
+    """The agent loop trims the history before every model call."""
+    manager = ToolManager()
+
+    async def read_file(path: str = "") -> ToolResult:
+        return ToolResult(success=True, content="\n".join("v" * 100 for _ in range(400)))
+
+    manager.register_tool("read_file", "Read a file", {"path": {"type": "string", "description": "File", "required": False}}, read_file)
+
+    sizes = []
+
+    async def generate(messages, tools=None):
+        sizes.append(sum(message_tokens(message) for message in messages))
+        if len(sizes) < 3:
+            call = {"id": f"call_{len(sizes)}", "type": "function", "function": {"name": "read_file", "arguments": "{}"}}
+            return LLMResponse(content="", tool_calls=[call])
+        return LLMResponse(content="done")
+
+    context = ConversationContext(max_tokens=3000)
+    messages = context.start_turn([SYSTEM, LLMMessage(role="user", content="read everything")])
+    result = asyncio.run(AgentLoop(generate, manager, context=context).run(messages, None))
+    assert result.response.content == "done"
+    assert max(sizes) <= context.budget, sizes
+    print(f"✓ Agent loop prompts stayed within budget: {sizes}")
+
+
+
+def test_interrupted_turn_leaves_valid_history():
+    """Cancelling during tool execution never leaves tool calls without results."""
+    manager = ToolManager()
+    started = asyncio.Event()
+
+    async def slow(path: str = "") -> ToolResult:
+        started.set()
+        await asyncio.sleep(10)
+        return ToolResult(success=True, content="never")
+
+    manager.register_tool("read_file", "Read a file", {"path": {"type": "string", "description": "File", "required": False}}, slow)
+
+    async def generate(messages, tools=None):
+        call = {"id": "call_1", "type": "function", "function": {"name": "read_file", "arguments": "{}"}}
+        return LLMResponse(content="", tool_calls=[call])
+
+    context = ConversationContext(max_tokens=10000)
+    tool_turn(context, "first", "output", "call_0")
+    turn_start = len(context.messages)
+    messages = context.start_turn([SYSTEM, LLMMessage(role="user", content="second")])
+
+    async def run():
+        task = asyncio.ensure_future(AgentLoop(generate, manager, context=context).run(messages, None))
+        await started.wait()
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(run())
+    assert not any(message.tool_calls for message in context.current_turn())
+
+    context.truncate(turn_start)
+    assert context.messages[-1].content == "answer to first"
+    assert context.total_tokens == sum(message_tokens(message) for message in context.messages)
+    print("✓ Interrupted turn left no unanswered tool calls")
+
+
+if __name__ == "__main__":
+    test_incremental_counts()
+    test_old_tool_output_compacted_before_turns_dropped()
+    test_oldest_turns_dropped_and_system_pinned()
+    test_current_turn_compacted_as_last_resort()
+    test_agent_loop_fits_before_each_call()
+    test_interrupted_turn_leaves_valid_history()
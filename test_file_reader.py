@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Test ranged, mmap-backed reads behind the read_file tool."""
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+from terminai.tools.builtin import BuiltinTools, READ_FILE_MAX_BYTES
+from terminai.tools.manager import ToolManager
+from terminai.utils.file_reader import FileReader
+
+LINES = 1_000_000
+
+
+def make_file():
+    """Write a file of numbered lines (about 14 MB)."""
+    fd, path = tempfile.mkstemp(suffix=".log")
+    with os.fdopen(fd, "w") as f:
+        for start in range(0, LINES, 10000):
+            f.write("".join(f"line {i}\n" for i in range(start + 1, start + 10001)))
+    return path
+
+
+def test_line_ranges_use_cached_index():
+    """Line ranges, head and tail return exact lines; repeated range reads reuse the index."""
+    path = make_file()
+    reader = FileReader()
+
+    start = time.perf_counter()
+    piece = reader.read_lines(path, 900000, 900002)
+    first_ms = (time.perf_counter() - start) * 1000
+    assert piece.content == "line 900000\nline 900001\nline 900002\n"
+    assert (piece.start_line, piece.end_line) == (900000, 900002)
+
+    start = time.perf_counter()
+    for line in range(1, LINES, LINES // 100):
+        assert reader.read_lines(path, line, line).content == f"line {line}\n"
+    repeat_ms = (time.perf_counter() - start) * 1000 / 100
+    assert repeat_ms < first_ms, "repeated reads did not reuse the line index"
+
+    assert reader.head(path, 2).content == "line 1\nline 2\n"
+    assert reader.tail(path, 2).content == f"line {LINES - 1}\nline {LINES}\n"
+    assert reader.read_bytes(path, 0, 6).content == "line 1"
+    assert reader.read_bytes(path, -8).content == "1000000\n"
+    assert reader.read_lines(path, LINES + 5).content == ""
+
+    capped = reader.read_lines(path, 1, None, max_bytes=100)
+    assert capped.truncated and capped.content.endswith("\n") and len(capped.content) <= 100
+    assert capped.end_line == capped.content.count("\n")
+    print(f"✓ Line ranges: first read {first_ms:.1f} ms, repeated reads {repeat_ms:.3f} ms each")
+
+    # Changing the file invalidates the cached index
+    with open(path, "w") as f:
+        f.write("a\nb\nc\n")
+    assert reader.read_lines(path, 2, 2).content == "b\n"
+    os.remove(path)
+    print("✓ Line index is rebuilt when the file changes")
+
+
+def test_concurrent_reads_share_index():
+    """Parallel reads of one file extend its shared line index without corrupting it."""
+    path = make_file()
+    reader = FileReader(block_size=4096)
+    errors = []
+    barrier = threading.Barrier(8)
+
+    def worker(seed):
+        barrier.wait()
+        for line in range(seed * 1000 + 1, LINES, 37000):
+            content = reader.read_lines(path, line, line).content
+            if content != f"line {line}\n":
+                errors.append((line, content))
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with open(path, "rb") as f:
+        data = f.read()
+    [(_, index)] = reader._indexes.values()
+    expected = [data[:i * 4096].count(b"\n") for i in range(len(index.counts))]
+    os.remove(path)
+    assert not errors, errors[:3]
+    assert list(index.counts) == expected
+    print(f"✓ {len(threads)} threads shared one line index ({len(index.counts)} blocks)")
+
+
+def test_read_file_tool():
+    """The tool returns small files whole and large ones in labelled, capped pieces."""
+    tool_manager = ToolManager()
+    BuiltinTools(bash_executor=None, index_dir=tempfile.mkdtemp()).register_all(tool_manager)
+
+    def read(**args):
+        return asyncio.run(tool_manager.execute_tool("read_file", args))
+
+    fd, small = tempfile.mkstemp()
+    with os.fdopen(fd, "w") as f:
+        f.write("hello\nworld\n")
+    assert read(path=small).content == "hello\nworld\n"
+
+    path = make_file()
+    result = read(path=path)
+    assert result.success and len(result.content) < READ_FILE_MAX_BYTES + 200
+    assert result.content.startswith("line 1\n") and "output capped" in result.content
+
+    result = read(path=path, start_line=10, end_line=11)
+    assert result.content.startswith("line 10\nline 11\n[Showing lines 10-11 of")
+
+    result = read(path=path, tail=1)
+    assert result.content.startswith(f"line {LINES}\n[Showing bytes")
+
+    result = read(path=path, head=3, tail=3)
+    assert not result.success and "Choose only one" in result.error
+    os.remove(path)
+    os.remove(small)
+    print("✓ read_file tool supports ranges, head and tail")
+
+
+if __name__ == "__main__":
+    test_line_ranges_use_cached_index()
+    test_concurrent_reads_share_index()
+    test_read_file_tool()
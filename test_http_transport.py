@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Test the shared, pooled HTTP transport manager."""
+
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+
+import httpx
+import uvicorn
+
+from terminai.llm.base import LLMManager
+from terminai.llm.providers.openai_provider import OpenAIProvider
+from terminai.mcp.connections.http_connection import HttpConnection
+from terminai.utils.http import TransportManager, environment_proxy
+
+CLIENT_PORTS = []
+
+
+async def app(scope, receive, send):
+    """Tiny HTTP MCP stand-in that records which client port each request came from."""
+    if scope["type"] != "http":
+        return
+    CLIENT_PORTS.append(scope["client"][1])
+    headers = dict(scope["headers"])
+    if scope["path"] == "/tools":
+        body = {"tools": [{"name": "echo"}], "auth": headers.get(b"authorization", b"").decode()}
+    else:
+        body = {"path": scope["path"]}
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": json.dumps(body).encode()})
+
+
+def start_server():
+    """Start the app on a free port in a background thread."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="error"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread, port
+
+
+def test_connections_are_pooled_and_shared():
+    """Requests to one host reuse a keep-alive connection, across consumers, with cached DNS."""
+    server, thread, port = start_server()
+
+    async def run():
+        manager = TransportManager()
+        base_url = f"http://localhost:{port}"
+        client = manager.client_for(base_url + "/v1")
+        assert manager.client_for(base_url + "/other") is client
+        assert manager.client_for(f"http://127.0.0.1:{port}") is not client
+
+        CLIENT_PORTS.clear()
+        for _ in range(5):
+            response = await client.get(base_url + "/ping")
+            assert response.json() == {"path": "/ping"}
+
+        connection = HttpConnection("local", {"url": base_url, "headers": {"Authorization": "Bearer t"}}, manager)
+        await connection.connect()
+        tools = await connection.list_tools()
+        await connection.disconnect()
+        assert not client.is_closed, "disconnect closed the shared client"
+        await client.get(base_url + "/ping")
+
+        stats = manager.stats()
+        resolver = manager.resolver
+        await manager.aclose()
+        return tools, set(CLIENT_PORTS), stats, resolver.lookups, client.is_closed
+
+    try:
+        tools, ports, stats, lookups, closed = asyncio.run(run())
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+
+    assert tools == [{"name": "echo"}]
+    assert len(ports) == 1, f"expected one reused connection, saw {len(ports)}"
+    assert lookups == 1 and closed
+    assert list(stats.values())[0] == 1
+    print(f"✓ 7 requests from 2 consumers over {len(ports)} connection with {lookups} DNS lookup")
+
+
+def test_providers_get_shared_clients():
+    """LLMManager hands the transport manager to providers, whose SDK clients use it."""
+    manager = TransportManager()
+    llm_manager = LLMManager(transport_manager=manager)
+    llm_manager.register_provider("openai", OpenAIProvider)
+    provider = llm_manager.get_provider("openai", {"api_key": "test", "model": "gpt-4o-mini"})
+    sdk_client = provider._get_client()
+    assert sdk_client._client is manager.client_for("https://api.openai.com/v1")
+    asyncio.run(manager.aclose())
+    print("✓ OpenAI-compatible providers use the shared pooled client")
+
+
+
+def test_environment_proxies():
+    """HTTPS_PROXY routes requests through the proxy, and NO_PROXY hosts bypass it."""
+    seen = []
+
+    async def handle(reader, writer):
+        seen.append((await reader.readline()).decode().strip())
+        writer.write(b"HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\n\r\n")
+        await writer.drain()
+        writer.close()
+
+    async def run():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        saved = {name: os.environ.get(name) for name in ("HTTPS_PROXY", "NO_PROXY", "https_proxy", "no_proxy")}
+        os.environ.update(HTTPS_PROXY=f"http://127.0.0.1:{port}", NO_PROXY="internal.example")
+        os.environ.pop("https_proxy", None)
+        os.environ.pop("no_proxy", None)
+        manager = TransportManager()
+        try:
+            assert environment_proxy("https://internal.example/v1") is None
+            assert environment_proxy("http://api.example.com/v1") is None
+            try:
+                await manager.client_for("https://api.example.com/v1").get("https://api.example.com/v1/models")
+                raise AssertionError("expected the proxy to refuse the tunnel")
+            except httpx.ProxyError:
+                pass
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+            await manager.aclose()
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run(run())
+    assert seen == ["CONNECT api.example.com:443 HTTP/1.1"], seen
+    print("✓ HTTPS_PROXY and NO_PROXY from the environment are honored")
+
+
+if __name__ == "__main__":
+    test_connections_are_pooled_and_shared()
+    test_providers_get_shared_clients()
+    test_environment_proxies()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Test the paginated, lazy list_files tool."""
+
+import asyncio
+import os
+import tempfile
+import time
+
+from terminai.tools.builtin import BuiltinTools
+from terminai.tools.manager import ToolManager
+from terminai.utils.walker import iter_entries
+
+
+def make_tree(root, dirs, files_per_dir):
+    """Create dirs x files_per_dir files plus some ignored and VCS content."""
+    for d in range(dirs):
+        directory = os.path.join(root, f"dir{d:03d}")
+        os.makedirs(os.path.join(directory, "nested"))
+        for f in range(files_per_dir):
+            open(os.path.join(directory, f"file{f:03d}.py"), "w").close()
+        open(os.path.join(directory, "nested", "deep.txt"), "w").close()
+    os.makedirs(os.path.join(root, ".git", "objects"))
+    os.makedirs(os.path.join(root, "build"))
+    open(os.path.join(root, "build", "out.o"), "w").close()
+    with open(os.path.join(root, ".gitignore"), "w") as f:
+        f.write("build/\n")
+
+
+def make_tool_manager():
+    """Create a tool manager with the builtin tools."""
+    tool_manager = ToolManager()
+    BuiltinTools(bash_executor=None, index_dir=tempfile.mkdtemp()).register_all(tool_manager)
+    return tool_manager
+
+
+def test_pagination_matches_full_listing():
+    """Cursor and offset pages join up to exactly the full listing."""
+    root = tempfile.mkdtemp()
+    make_tree(root, 5, 7)
+    tool_manager = make_tool_manager()
+
+    def list_files(**args):
+        result = asyncio.run(tool_manager.execute_tool("list_files", dict(path=root, recursive=True, **args)))
+        assert result.success, result.error
+        return result.content.split("\n")
+
+    full = list_files(max_entries=10000)
+    assert not full[-1].startswith("[More entries")
+    assert "dir000/" in full and "dir000/nested/deep.txt" in full
+    assert not [line for line in full if line.startswith((".git/", "build"))]
+
+    paged = []
+    cursor = None
+    while True:
+        page = list_files(max_entries=6, **({"cursor": cursor} if cursor else {}))
+        if page[-1].startswith("[More entries"):
+            cursor = page[-1].split('cursor="')[1].rstrip('"]')
+            page = page[:-1]
+            assert len(page) == 6
+            paged.extend(page)
+        else:
+            paged.extend(page)
+            break
+    assert paged == full
+
+    by_offset = []
+    for offset in range(0, len(full), 9):
+        page = list_files(max_entries=9, offset=offset)
+        by_offset.extend(line for line in page if not line.startswith("[More entries"))
+    assert by_offset == full
+    print(f"✓ {len(full)} entries listed identically in full, by cursor and by offset")
+
+
+def test_depth_pattern_and_details():
+    """Depth limits descent, patterns filter names and details add stat columns."""
+    root = tempfile.mkdtemp()
+    make_tree(root, 2, 3)
+    tool_manager = make_tool_manager()
+
+    def list_files(**args):
+        return asyncio.run(tool_manager.execute_tool("list_files", dict(path=root, **args))).content.split("\n")
+
+    assert list_files() == [".gitignore", "dir000/", "dir001/"]
+    assert "dir000/nested/" in list_files(recursive=True, depth=2)
+    assert "dir000/nested/deep.txt" not in list_files(recursive=True, depth=2)
+    assert list_files(recursive=True, pattern="deep.*") == ["dir000/nested/deep.txt", "dir001/nested/deep.txt"]
+    assert "build/" in list_files(include_ignored=True)
+
+    detailed = list_files(details=True)
+    assert detailed[1].startswith("d ") and detailed[1].endswith(" dir000/")
+    assert detailed[0].split()[:2] == ["f", "7"]
+
+    result = asyncio.run(tool_manager.execute_tool("list_files", {"path": os.path.join(root, "missing")}))
+    assert not result.success and "Path not found" in result.error
+    print("✓ Depth, pattern, include_ignored and details options")
+
+
+def test_first_page_is_lazy():
+    """The first page of a large tree comes back without walking all of it."""
+    root = tempfile.mkdtemp()
+    make_tree(root, 300, 30)
+
+    start = time.perf_counter()
+    full = sum(1 for _ in iter_entries(root))
+    full_ms = (time.perf_counter() - start) * 1000
+
+    tool_manager = make_tool_manager()
+    start = time.perf_counter()
+    result = asyncio.run(tool_manager.execute_tool("list_files", {"path": root, "recursive": True, "max_entries": 50}))
+    page_ms = (time.perf_counter() - start) * 1000
+
+    assert result.content.count("\n") == 50
+    assert page_ms < full_ms, f"first page took {page_ms:.1f} ms, full walk {full_ms:.1f} ms"
+    print(f"✓ First page in {page_ms:.1f} ms vs {full_ms:.1f} ms to walk all {full} entries")
+
+
+if __name__ == "__main__":
+    test_pagination_matches_full_listing()
+    test_depth_pattern_and_details()
+    test_first_page_is_lazy()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Test the on-disk MCP tool catalog cache and incremental refresh."""
+
+import asyncio
+import tempfile
+
+from terminai.tools.manager import ToolManager
+from terminai.tools.mcp_tools import MCPToolWrapper
+
+
+class FakeConnection:
+    """Stand-in connection that only carries a config."""
+
+    def __init__(self, config):
+        self.config = config
+
+
+class FakeMCPClient:
+    """Stand-in MCP client serving a fixed catalog and counting round-trips."""
+
+    def __init__(self, config, tools, resources=None):
+        self.connections = {"demo": FakeConnection(config)}
+        self.tools = tools
+        self.resources = [] if resources is None else resources
+        self.calls = 0
+
+    async def list_tools(self, server_name):
+        self.calls += 1
+        if self.tools is None:
+            raise ConnectionError("server went away")
+        return list(self.tools)
+
+    async def list_resources(self, server_name):
+        self.calls += 1
+        if self.resources is None:
+            raise ConnectionError("resources not supported")
+        return list(self.resources)
+
+
+def tool(name, description="A tool"):
+    """Build an MCP tool schema."""
+    return {
+        "name": name,
+        "description": description,
+        "inputSchema": {"type": "object", "properties": {"x": {"type": "string"}}, "required": ["x"]}
+    }
+
+
+def test_cache_roundtrip_and_incremental_refresh():
+    """Tools come back from the cache without network calls and refresh applies only diffs."""
+    config = {"name": "demo", "type": "stdio", "command": "demo-server"}
+    cache_dir = tempfile.mkdtemp()
+
+    client = FakeMCPClient(config, [tool("a"), tool("b")], [{"uri": "file:///x", "name": "x"}])
+    first = MCPToolWrapper(client, cache_dir=cache_dir)
+    changes = asyncio.run(first.discover_and_register_tools(ToolManager(), "demo"))
+    assert changes == {"added": 4, "updated": 0, "removed": 0}
+
+    # A fresh launch registers everything from disk
+    offline = FakeMCPClient(config, [])
+    wrapper = MCPToolWrapper(offline, cache_dir=cache_dir)
+    tool_manager = ToolManager()
+    assert wrapper.register_from_cache(tool_manager, "demo", config)
+    assert offline.calls == 0
+    assert sorted(tool_manager.list_tools()) == [
+        "mcp_demo_a", "mcp_demo_b", "mcp_demo_list_resources", "mcp_demo_read_resource"
+    ]
+    print("✓ Tools registered from cache without contacting the server")
+
+    # The live server changed: b updated, a removed, c added, resources gone
+    executor_b = tool_manager.executors["mcp_demo_b"]
+    offline.tools = [tool("b", "Changed"), tool("c")]
+    changes = asyncio.run(wrapper.refresh_server_tools(tool_manager, "demo"))
+    assert changes == {"added": 1, "updated": 1, "removed": 3}
+    assert sorted(tool_manager.list_tools()) == ["mcp_demo_b", "mcp_demo_c"]
+    assert tool_manager.tools["mcp_demo_b"].description.endswith("Changed")
+    assert tool_manager.executors["mcp_demo_b"] is not executor_b
+
+    # Nothing changed: nothing is re-registered
+    executor_c = tool_manager.executors["mcp_demo_c"]
+    changes = asyncio.run(wrapper.refresh_server_tools(tool_manager, "demo"))
+    assert changes == {"added": 0, "updated": 0, "removed": 0}
+    assert tool_manager.executors["mcp_demo_c"] is executor_c
+    print("✓ Refresh applies only added, updated and removed tools")
+
+    # The refreshed catalog replaced the cached one; another config misses the cache
+    assert [t["name"] for t in wrapper.load_cached_catalog(config)["tools"]] == ["b", "c"]
+    assert not wrapper.register_from_cache(ToolManager(), "demo", dict(config, command="other"))
+    print("✓ Cache is keyed by server configuration")
+
+
+def test_failed_listing_changes_nothing():
+    """A refresh that cannot list tools keeps the registered tools and the cached catalog."""
+    config = {"name": "demo", "type": "stdio", "command": "demo-server"}
+    cache_dir = tempfile.mkdtemp()
+    client = FakeMCPClient(config, [tool("a")], [{"uri": "file:///x", "name": "x"}])
+    wrapper = MCPToolWrapper(client, cache_dir=cache_dir)
+    tool_manager = ToolManager()
+    asyncio.run(wrapper.refresh_server_tools(tool_manager, "demo"))
+    registered = sorted(tool_manager.list_tools())
+
+    client.tools = None
+    try:
+        asyncio.run(wrapper.refresh_server_tools(tool_manager, "demo"))
+        assert False, "refresh should fail"
+    except ConnectionError:
+        pass
+    assert sorted(tool_manager.list_tools()) == registered
+    assert [t["name"] for t in wrapper.load_cached_catalog(config)["tools"]] == ["a"]
+
+    # Resources that cannot be listed keep the ones already known
+    client.tools, client.resources = [tool("a"), tool("b")], None
+    changes = asyncio.run(wrapper.refresh_server_tools(tool_manager, "demo"))
+    assert changes == {"added": 1, "updated": 0, "removed": 0}
+    assert "mcp_demo_read_resource" in tool_manager.tools
+    print("✓ Failed listings leave tools and cache untouched")
+
+
+if __name__ == "__main__":
+    test_cache_roundtrip_and_incremental_refresh()
+    test_failed_listing_changes_nothing()
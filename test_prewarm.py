@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Test background pre-warming of shared HTTP connections."""
+
+import asyncio
+import socket
+import threading
+import time
+
+import uvicorn
+
+from terminai.llm.providers.anthropic_provider import AnthropicProvider
+from terminai.llm.providers.openai_provider import OpenAIProvider
+from terminai.utils.http import TransportManager
+
+CLIENT_PORTS = []
+
+
+async def app(scope, receive, send):
+    """Answer every request, recording which client port it came from."""
+    if scope["type"] != "http":
+        return
+    CLIENT_PORTS.append(scope["client"][1])
+    await send({"type": "http.response.start", "status": 404, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def start_server():
+    """Start the app on a free port in a background thread."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="error"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread, port
+
+
+async def wait_for_status(manager, predicate, timeout=5.0):
+    """Poll the origin status until ``predicate`` holds, failing after ``timeout`` seconds."""
+    deadline = time.monotonic() + timeout
+    while True:
+        statuses = manager.origin_status()
+        if statuses and predicate(statuses[0]):
+            return statuses[0]
+        assert time.monotonic() < deadline, f"timed out waiting for origin status: {statuses}"
+        await asyncio.sleep(0.01)
+
+
+def test_prewarm_and_rewarm():
+    """The first request reuses the pre-warmed connection, which is refreshed while idle."""
+    server, thread, port = start_server()
+    base_url = f"http://127.0.0.1:{port}/v1"
+
+    async def run():
+        manager = TransportManager(keepalive_expiry=0.5)
+        assert manager.origin_status() == []
+
+        CLIENT_PORTS.clear()
+        task = asyncio.ensure_future(manager.keep_warm([base_url, base_url], idle_limit=1.5, check_interval=0.05))
+        status = await wait_for_status(manager, lambda status: status.warmed >= 1)
+        assert status.state == "warm" and status.warmed == 1 and status.handshake_ms is not None
+
+        await manager.client_for(base_url).get(base_url + "/models")
+        [status] = manager.origin_status()
+        assert status.reused_requests == 1 and status.saved_ms == status.handshake_ms
+
+        # Idle for longer than the keep-alive: re-warming keeps the same connection open
+        await asyncio.sleep(0.9)
+        [status] = manager.origin_status()
+        assert status.state == "warm" and status.warmed >= 2
+        await manager.client_for(base_url).get(base_url + "/models")
+        assert manager.origin_status()[0].reused_requests == 2
+
+        # Past the idle limit re-warming stops and the connection expires
+        await asyncio.sleep(2.0)
+        [status] = manager.origin_status()
+        task.cancel()
+        await manager.aclose()
+        return status
+
+    try:
+        status = asyncio.run(run())
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+
+    assert status.state == "cold", status
+    assert len(set(CLIENT_PORTS)) == 1, f"expected one connection before the idle limit, saw {set(CLIENT_PORTS)}"
+    print(f"✓ Pre-warmed connection reused, re-warmed {status.warmed - 1} times, then left to expire")
+
+
+def test_unreachable_origin():
+    """Warming a host that refuses connections fails quietly and leaves it cold."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    async def run():
+        manager = TransportManager()
+        ok = await manager.warm(f"http://127.0.0.1:{port}")
+        statuses = manager.origin_status()
+        await manager.aclose()
+        return ok, statuses
+
+    ok, statuses = asyncio.run(run())
+    assert not ok and statuses[0].state == "cold" and statuses[0].warmed == 0
+    print("✓ Unreachable origins stay cold")
+
+
+def test_provider_base_urls():
+    """Providers report the endpoint to warm, falling back to their default."""
+    assert OpenAIProvider({"api_key": "test"}).get_base_url() == "https://api.openai.com/v1"
+    assert OpenAIProvider({"api_key": "test", "base_url": "http://localhost:8000/v1"}).get_base_url() == "http://localhost:8000/v1"
+    assert AnthropicProvider({"api_key": "test"}).get_base_url() == "https://api.anthropic.com"
+    print("✓ Providers expose their base URL")
+
+
+if __name__ == "__main__":
+    test_prewarm_and_rewarm()
+    test_unreachable_origin()
+    test_provider_base_urls()
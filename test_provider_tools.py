@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Test tool calling and streaming in the Anthropic and Google providers."""
+
+import asyncio
+import json
+
+import httpx
+from google.generativeai import protos
+
+from terminai.llm.base import LLMMessage, StreamAccumulator
+from terminai.llm.providers.anthropic_provider import AnthropicProvider
+from terminai.llm.providers.google_provider import GoogleProvider
+
+TOOLS = [{
+    "type": "function",
+    "function": {
+        "name": "list_files",
+        "description": "List files in a directory",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "path": {"type": "string", "description": "Directory"},
+                "depth": {"type": "integer", "description": "How deep", "default": 1}
+            },
+            "required": ["path"]
+        }
+    }
+}]
+
+CALL = {"id": "toolu_1", "type": "function", "function": {"name": "list_files", "arguments": "{\"path\": \".\", \"depth\": 2}"}}
+
+CONVERSATION = [
+    LLMMessage(role="system", content="You are helpful."),
+    LLMMessage(role="user", content="list files"),
+    LLMMessage(role="assistant", content="", tool_calls=[CALL, dict(CALL, id="toolu_2")]),
+    LLMMessage(role="tool", content="a.py", tool_call_id="toolu_1"),
+    LLMMessage(role="tool", content="b.py", tool_call_id="toolu_2"),
+]
+
+
+def sse(events):
+    """Encode Anthropic stream events."""
+    return "".join(f"event: {event['type']}\ndata: {json.dumps(event)}\n\n" for event in events).encode()
+
+
+def anthropic_provider(handler):
+    """An Anthropic provider whose requests go to ``handler``."""
+    provider = AnthropicProvider({"api_key": "test", "model": "claude-test", "max_tokens": 100})
+    from anthropic import AsyncAnthropic
+    provider.client = AsyncAnthropic(api_key="test", http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return provider
+
+
+def test_anthropic_request_format():
+    """Tool calls and results map to tool_use/tool_result blocks, with cache breakpoints."""
+    provider = AnthropicProvider({"api_key": "test", "model": "claude-test"})
+    kwargs = provider._build_api_kwargs(CONVERSATION, TOOLS)
+
+    assert kwargs["system"] == [{"type": "text", "text": "You are helpful.", "cache_control": {"type": "ephemeral"}}]
+    assert kwargs["tools"][0]["input_schema"] == TOOLS[0]["function"]["parameters"]
+    assert kwargs["tools"][-1]["cache_control"] == {"type": "ephemeral"}
+
+    user, assistant, results = kwargs["messages"]
+    assert user == {"role": "user", "content": [{"type": "text", "text": "list files"}]}
+    assert assistant["content"][0] == {"type": "tool_use", "id": "toolu_1", "name": "list_files", "input": {"path": ".", "depth": 2}}
+    # Results of parallel calls share one user turn
+    assert results["role"] == "user" and [block["tool_use_id"] for block in results["content"]] == ["toolu_1", "toolu_2"]
+
+    provider.prompt_caching = False
+    kwargs = provider._build_api_kwargs(CONVERSATION, TOOLS)
+    assert "cache_control" not in kwargs["system"][0] and "cache_control" not in kwargs["tools"][0]
+    print("✓ Anthropic requests carry tool blocks and cache breakpoints")
+
+
+def test_anthropic_generate_and_stream():
+    """Responses with tool_use blocks come back as shared tool calls, streamed or not."""
+    requests = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        requests.append(body)
+        if not body.get("stream"):
+            return httpx.Response(200, json={
+                "id": "msg_1", "type": "message", "role": "assistant", "model": "claude-test",
+                "content": [
+                    {"type": "text", "text": "Listing. "},
+                    {"type": "tool_use", "id": "toolu_9", "name": "list_files", "input": {"path": "src"}}
+                ],
+                "stop_reason": "tool_use", "stop_sequence": None,
+                "usage": {"input_tokens": 1200, "output_tokens": 20, "cache_read_input_tokens": 1100}
+            })
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=sse([
+            {"type": "message_start", "message": {
+                "id": "msg_2", "type": "message", "role": "assistant", "model": "claude-test", "content": [],
+                "stop_reason": None, "stop_sequence": None, "usage": {"input_tokens": 1200, "output_tokens": 1}}},
+            {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}},
+            {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": "Listing"}},
+            {"type": "content_block_stop", "index": 0},
+            {"type": "content_block_start", "index": 1, "content_block": {"type": "tool_use", "id": "toolu_9", "name": "list_files", "input": {}}},
+            {"type": "content_block_delta", "index": 1, "delta": {"type": "input_json_delta", "partial_json": "{\"path\": "}},
+            {"type": "content_block_delta", "index": 1, "delta": {"type": "input_json_delta", "partial_json": "\"src\"}"}},
+            {"type": "content_block_stop", "index": 1},
+            {"type": "message_delta", "delta": {"stop_reason": "tool_use", "stop_sequence": None}, "usage": {"output_tokens": 25}},
+            {"type": "message_stop"},
+        ]))
+
+    provider = anthropic_provider(handler)
+
+    async def run():
+        response = await provider.generate(CONVERSATION, tools=TOOLS)
+        accumulator = StreamAccumulator()
+        async for chunk in provider.stream(CONVERSATION, tools=TOOLS):
+            accumulator.add(chunk)
+        return response, accumulator
+
+    response, accumulator = asyncio.run(run())
+    assert response.content == "Listing."
+    assert response.tool_calls == [{"id": "toolu_9", "type": "function", "function": {"name": "list_files", "arguments": "{\"path\": \"src\"}"}}]
+    assert response.usage["cache_read_input_tokens"] == 1100
+
+    streamed = accumulator.to_response()
+    assert accumulator.finish_reason == "tool_calls"
+    assert streamed.content == "Listing" and json.loads(streamed.tool_calls[0]["function"]["arguments"]) == {"path": "src"}
+    assert streamed.tool_calls[0]["id"] == "toolu_9"
+    assert streamed.usage["input_tokens"] == 1200 and streamed.usage["output_tokens"] == 25
+    assert requests[0]["tools"][0]["name"] == "list_files" and requests[1]["stream"] is True
+    print("✓ Anthropic tool calls parsed from responses and streams")
+
+
+class FakeGeminiModel:
+    """Stands in for GenerativeModel, returning canned protobuf responses."""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+
+    async def generate_content_async(self, contents, stream=False, **kwargs):
+        self.calls.append(dict(kwargs, contents=contents, stream=stream))
+        if not stream:
+            return self.responses[0]
+
+        async def chunks():
+            for response in self.responses:
+                yield response
+        return chunks()
+
+
+def gemini_response(parts, tokens=0):
+    """Build a GenerateContentResponse with one candidate."""
+    return protos.GenerateContentResponse(
+        candidates=[protos.Candidate(content=protos.Content(role="model", parts=parts))],
+        usage_metadata=protos.GenerateContentResponse.UsageMetadata(
+            prompt_token_count=tokens, candidates_token_count=tokens, total_token_count=2 * tokens
+        )
+    )
+
+
+def test_google_tools_and_streaming():
+    """Gemini gets structured contents and function declarations, and its calls are mapped back."""
+    provider = GoogleProvider({"api_key": "test", "model": "gemini-test"})
+    contents = provider._convert_messages(CONVERSATION)
+    assert [content["role"] for content in contents] == ["user", "model", "user"]
+    assert contents[1]["parts"][0] == {"function_call": {"name": "list_files", "args": {"path": ".", "depth": 2}}}
+    assert [part["function_response"]["name"] for part in contents[2]["parts"]] == ["list_files", "list_files"]
+
+    declaration = provider._convert_tools(TOOLS)[0]["function_declarations"][0]
+    assert "default" not in declaration["parameters"]["properties"]["depth"]
+
+    call = protos.Part(function_call=protos.FunctionCall(name="list_files", args={"path": "src", "depth": 2}))
+    model = FakeGeminiModel([gemini_response([protos.Part(text="Listing ")]), gemini_response([call], tokens=10)])
+    provider.model_instance, provider._system_prompt = model, "You are helpful."
+
+    async def run():
+        response = await provider.generate(CONVERSATION, tools=TOOLS)
+        accumulator = StreamAccumulator()
+        async for chunk in provider.stream(CONVERSATION, tools=TOOLS):
+            accumulator.add(chunk)
+        return response, accumulator
+
+    response, accumulator = asyncio.run(run())
+    assert response.content == "Listing" and response.tool_calls is None
+    streamed = accumulator.to_response()
+    assert streamed.content == "Listing " and accumulator.finish_reason == "tool_calls"
+    # Protobuf numbers are floats; whole numbers are turned back into ints
+    assert json.loads(streamed.tool_calls[0]["function"]["arguments"]) == {"path": "src", "depth": 2}
+    assert "2.0" not in streamed.tool_calls[0]["function"]["arguments"]
+    assert streamed.usage["total_tokens"] == 20
+    assert model.calls[0]["tools"][0]["function_declarations"][0]["name"] == "list_files"
+    assert provider.model_instance is model, "model rebuilt although the system prompt did not change"
+    print("✓ Google tool calls, structured history and streaming")
+
+
+if __name__ == "__main__":
+    test_anthropic_request_format()
+    test_anthropic_generate_and_stream()
+    test_google_tools_and_streaming()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Test the streaming, atomic replace engine behind replace_in_file."""
+
+import asyncio
+import os
+import stat
+import tempfile
+import tracemalloc
+
+from terminai.tools.builtin import BuiltinTools
+from terminai.tools.manager import ToolManager
+from terminai.utils import replace as replace_module
+from terminai.utils.replace import stream_replace
+
+
+def write_file(content):
+    """Write content to a fresh temp file."""
+    fd, path = tempfile.mkstemp(suffix=".txt")
+    with os.fdopen(fd, "w", newline="") as f:
+        f.write(content)
+    return path
+
+
+def read_file(path):
+    """Read a file without newline translation."""
+    with open(path, newline="") as f:
+        return f.read()
+
+
+def test_chunk_boundaries_and_line_numbers():
+    """Matches crossing chunk boundaries are replaced and reported with their lines."""
+    path = write_file("alpha\r\nbeta gamma\r\n" * 50)
+    os.chmod(path, 0o640)
+
+    result = stream_replace(path, "beta gamma", "BETA", chunk_size=7)
+    assert result.replacements == 50 and result.mode == "literal"
+    assert result.lines == list(range(2, 101, 2))
+    assert read_file(path) == "alpha\r\nBETA\r\n" * 50
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+
+    result = stream_replace(path, r"(\w+)\r\nBETA", r"\1!", chunk_size=5, regex_overlap=16)
+    assert result.mode == "regex" and result.replacements == 50
+    assert read_file(path) == "alpha!\r\n" * 50
+    os.remove(path)
+    print("✓ Literal and regex matches across chunk boundaries, CRLF and mode preserved")
+
+
+
+def test_multiline_text_in_crlf_files():
+    """Multi-line text written with \\n matches CRLF files, which keep their line endings."""
+    path = write_file("def f():\r\n    return 1\r\n\r\nf()\r\n")
+    result = stream_replace(path, "def f():\n    return 1\n", "def f():\n    return 2\n", chunk_size=4)
+    assert result.replacements == 1 and result.mode == "literal" and result.lines == [1]
+    assert read_file(path) == "def f():\r\n    return 2\r\n\r\nf()\r\n"
+
+    # LF files are matched as before
+    lf_path = write_file("a\nb\n")
+    assert stream_replace(lf_path, "a\nb", "c\nd").replacements == 1
+    assert read_file(lf_path) == "c\nd\n"
+    os.remove(path)
+    os.remove(lf_path)
+    print("✓ Multi-line replacements in CRLF files keep CRLF endings")
+
+def test_dry_run_and_atomicity():
+    """Dry runs only report a diff; a failure mid-write leaves the original untouched."""
+    original = "one\ntwo foo\nthree\n"
+    path = write_file(original)
+
+    result = stream_replace(path, "foo", "bar", dry_run=True)
+    assert not result.written and read_file(path) == original
+    assert "@@ -2,1 +2,1 @@\n-two foo\n+two bar" in result.diff
+
+    def exploding_pass(*args, **kwargs):
+        raise OSError("disk full")
+
+    real_pass = replace_module._replace_pass
+    replace_module._replace_pass = exploding_pass
+    try:
+        stream_replace(path, "foo", "bar")
+        raise AssertionError("expected the failure to propagate")
+    except OSError:
+        pass
+    finally:
+        replace_module._replace_pass = real_pass
+
+    assert read_file(path) == original
+    assert os.listdir(os.path.dirname(path)).count(os.path.basename(path)) == 1
+    assert not [name for name in os.listdir(os.path.dirname(path)) if name.startswith(f".{os.path.basename(path)}.")]
+    os.remove(path)
+    print("✓ Dry run leaves the file alone and failed writes never replace it")
+
+
+def test_constant_memory():
+    """Peak memory depends on the chunk size, not on the file size."""
+    peaks = []
+    for blocks in (4, 16):
+        path = write_file("")
+        with open(path, "a") as f:
+            for _ in range(blocks):
+                f.write("filler line with needle inside\n" * 16384)
+
+        tracemalloc.start()
+        result = stream_replace(path, "needle", "pin")
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        assert result.replacements == blocks * 16384
+        peaks.append((os.path.getsize(path), peak))
+        os.remove(path)
+
+    (small_size, small_peak), (large_size, large_peak) = peaks
+    assert large_peak < small_peak * 1.5, f"peak grew from {small_peak} to {large_peak} bytes"
+    print(f"✓ Peak memory {small_peak / 1024 / 1024:.1f} MB for {small_size / 1024 / 1024:.0f} MB, "
+          f"{large_peak / 1024 / 1024:.1f} MB for {large_size / 1024 / 1024:.0f} MB")
+
+
+def test_symlinks_and_runaway_matches():
+    """Replacing through a symlink edits its target, and an endless match does not buffer the file."""
+    target = write_file("keep foo here\n")
+    link = target + ".link"
+    os.symlink(target, link)
+    if os.geteuid() == 0:
+        os.chown(target, 1234, 2345)
+    stream_replace(link, "foo", "bar")
+    assert os.path.islink(link) and read_file(target) == "keep bar here\n"
+    if os.geteuid() == 0:
+        assert (os.stat(target).st_uid, os.stat(target).st_gid) == (1234, 2345)
+    os.remove(link)
+    os.remove(target)
+
+    path = write_file("start " + "x" * 200000 + " end\n")
+    tracemalloc.start()
+    result = stream_replace(path, r"start x+", "short", chunk_size=1000, regex_overlap=100)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert result.mode == "regex" and read_file(path).startswith("short")
+    assert peak < 100000, f"buffered {peak} bytes"
+    os.remove(path)
+    print("✓ Symlinks kept and runaway regex matches capped")
+
+
+def test_replace_in_file_tool():
+    """The tool reports counts, lines and diffs, and errors when nothing matches."""
+    tool_manager = ToolManager()
+    BuiltinTools(bash_executor=None, index_dir=tempfile.mkdtemp()).register_all(tool_manager)
+    path = write_file("a = 1\nb = 2\na = 3\n")
+
+    def replace(**args):
+        return asyncio.run(tool_manager.execute_tool("replace_in_file", dict(path=path, **args)))
+
+    result = replace(old_content="a =", new_content="c =", dry_run=True)
+    assert result.content.startswith("Would replace 2 occurrences") and "+c = 3" in result.content
+    result = replace(old_content="a =", new_content="c =")
+    assert result.content == f"Replaced 2 occurrences in file: {path} (lines 1, 3)"
+    assert read_file(path) == "c = 1\nb = 2\nc = 3\n"
+
+    assert "No occurrences" in replace(old_content="zzz", new_content="y").error
+    assert "Invalid regex" in replace(old_content="(", new_content="y").error
+    os.remove(path)
+    print("✓ replace_in_file tool reports replacements")
+
+
+if __name__ == "__main__":
+    test_chunk_boundaries_and_line_numbers()
+    test_multiline_text_in_crlf_files()
+    test_dry_run_and_atomicity()
+    test_constant_memory()
+    test_symlinks_and_runaway_matches()
+    test_replace_in_file_tool()
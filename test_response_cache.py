@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Test the response cache for deterministic LLM requests."""
+
+import asyncio
+import os
+import tempfile
+import time
+
+from terminai.llm.base import LLMProvider, LLMMessage, LLMResponse, StreamAccumulator
+from terminai.llm.cache import CachingProvider, ResponseCache, cache_key
+from terminai.llm.router import RoutingProvider
+from terminai.tools.manager import ToolManager
+
+TOOLS = [
+    {"type": "function", "function": {"name": "list_files", "parameters": {}}},
+    {"type": "function", "function": {"name": "read_file", "parameters": {}}},
+]
+
+
+class CountingProvider(LLMProvider):
+    """Provider that answers with a tool call and counts requests."""
+
+    def __init__(self, temperature=0.0):
+        super().__init__({"model": "test-model", "temperature": temperature})
+        self.calls = 0
+
+    async def generate(self, messages, tools=None):
+        self.calls += 1
+        return LLMResponse(
+            content=f"answer {self.calls}",
+            tool_calls=[{"id": "call_1", "type": "function", "function": {"name": "list_files", "arguments": "{\"path\": \".\"}"}}],
+            model=self.model
+        )
+
+    def is_configured(self):
+        return True
+
+    def get_required_config(self):
+        return []
+
+
+def make_cache(**kwargs):
+    """Create a cache in a fresh directory."""
+    return ResponseCache(os.path.join(tempfile.mkdtemp(), "responses.db"), **kwargs)
+
+
+def collect(provider, messages, tools):
+    """Stream a response and reassemble it."""
+    async def run():
+        accumulator = StreamAccumulator()
+        async for chunk in provider.stream(messages, tools=tools):
+            accumulator.add(chunk)
+        return accumulator.to_response()
+    return asyncio.run(run())
+
+
+def test_hits_misses_and_normalization():
+    """Repeated requests are served from the cache, including whitespace variants and streams."""
+    inner = CountingProvider()
+    provider = CachingProvider(inner, make_cache(), "openai")
+    messages = provider.format_prompt("list all python files")
+
+    first = asyncio.run(provider.generate(messages, tools=TOOLS))
+    again = asyncio.run(provider.generate(provider.format_prompt("  list all   python files\n"), tools=list(reversed(TOOLS))))
+    assert inner.calls == 1 and again == first
+
+    streamed = collect(provider, messages, TOOLS)
+    assert inner.calls == 1 and streamed.content == first.content and streamed.tool_calls == first.tool_calls
+
+    # A streamed miss is stored too
+    other = provider.format_prompt("disk usage")
+    collect(provider, other, TOOLS)
+    asyncio.run(provider.generate(other, tools=TOOLS))
+    assert inner.calls == 2
+
+    stats = provider.cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (3, 2, 2)
+
+    key = cache_key("openai", "test-model", 0.0, messages, TOOLS)
+    assert key != cache_key("openai", "other-model", 0.0, messages, TOOLS)
+    assert key != cache_key("openai", "test-model", 0.0, messages, TOOLS[:1])
+    print("✓ Hits served from cache for generate and stream; keys normalized")
+
+
+def test_tool_manager_bytes():
+    """With a ToolManager, tools are hashed from its cached bytes and stay order independent."""
+    async def noop(**kwargs):
+        pass
+
+    manager = ToolManager()
+    for name in ("read_file", "list_files", "search_files"):
+        manager.register_tool(name, f"The {name} tool", {}, noop)
+    tools = manager.get_tool_definitions()
+
+    inner = CountingProvider()
+    provider = CachingProvider(inner, make_cache(), "openai", tool_manager=manager)
+    messages = provider.format_prompt("list all python files")
+    asyncio.run(provider.generate(messages, tools=tools[:2]))
+    asyncio.run(provider.generate(messages, tools=list(reversed(tools[:2]))))
+    assert inner.calls == 1
+    asyncio.run(provider.generate(messages, tools=tools))
+    assert inner.calls == 2
+
+    key = cache_key("openai", "test-model", 0.0, messages, tools, manager.get_tool_definitions_json())
+    assert provider.cache.get(key) is not None
+    print("✓ Tools hashed from the ToolManager's cached JSON")
+
+
+def test_temperature_threshold():
+    """Requests above the temperature threshold always reach the provider."""
+    inner = CountingProvider(temperature=0.7)
+    provider = CachingProvider(inner, make_cache(), "openai", max_temperature=0.2)
+    messages = provider.format_prompt("disk usage")
+    asyncio.run(provider.generate(messages))
+    asyncio.run(provider.generate(messages))
+    assert inner.calls == 2 and provider.cache.stats()["entries"] == 0
+
+    inner = CountingProvider(temperature=0.1)
+    provider = CachingProvider(inner, make_cache(), "openai", max_temperature=0.2)
+    asyncio.run(provider.generate(messages))
+    asyncio.run(provider.generate(messages))
+    assert inner.calls == 1
+    print("✓ Only requests at or below the temperature threshold are cached")
+
+
+class FailingProvider(CountingProvider):
+    """Provider whose every request fails."""
+
+    async def generate(self, messages, tools=None):
+        self.calls += 1
+        raise RuntimeError("unavailable")
+
+
+def test_first_turn_and_answering_provider():
+    """Only first turns are cached, under the provider that actually answered."""
+    inner = CountingProvider()
+    provider = CachingProvider(inner, make_cache(), "openai")
+    history = provider.format_prompt("list files") + [
+        LLMMessage(role="assistant", content="done"),
+        LLMMessage(role="user", content="and again")
+    ]
+    asyncio.run(provider.generate(history))
+    asyncio.run(provider.generate(history))
+    assert inner.calls == 2 and provider.cache.stats()["entries"] == 0
+
+    primary, fallback = FailingProvider(), CountingProvider()
+    router = RoutingProvider([("openai", primary), ("anthropic", fallback)], hedge=False, max_error_rate=0.3)
+    provider = CachingProvider(router, make_cache(), "openai")
+    messages = provider.format_prompt("disk usage")
+    first = asyncio.run(provider.generate(messages))
+    assert provider.cache.get(cache_key("anthropic", "test-model", 0.0, messages, None)) == first
+    assert provider.cache.get(cache_key("openai", "test-model", 0.0, messages, None)) is None
+
+    # While the primary is benched the fallback's answer is reused
+    assert asyncio.run(provider.generate(messages)) == first and fallback.calls == 1
+    print("✓ Only first turns cached, keyed on the provider that answered")
+
+
+def test_ttl_and_lru_eviction():
+    """Expired entries miss, and the least recently used entries are evicted first."""
+    response = LLMResponse(content="cached")
+    cache = make_cache(ttl=0.2, max_entries=2)
+    cache.put("a", response)
+    time.sleep(0.3)
+    assert cache.get("a") is None
+
+    cache = make_cache(max_entries=2)
+    cache.put("a", response)
+    time.sleep(0.01)
+    cache.put("b", response)
+    time.sleep(0.01)
+    assert cache.get("a") is not None
+    time.sleep(0.01)
+    cache.put("c", response)
+    assert cache.get("b") is None and cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+    assert cache.clear() == 2 and cache.stats()["entries"] == 0
+    cache.close()
+    print("✓ TTL expiry and LRU eviction")
+
+
+if __name__ == "__main__":
+    test_hits_misses_and_normalization()
+    test_tool_manager_bytes()
+    test_temperature_threshold()
+    test_first_turn_and_answering_provider()
+    test_ttl_and_lru_eviction()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Test failover and hedged requests in the routing provider."""
+
+import asyncio
+
+from terminai.llm.base import LLMProvider, LLMResponse, LLMStreamChunk, StreamAccumulator
+from terminai.llm.router import ProviderHealth, RoutingProvider
+
+
+class FakeProvider(LLMProvider):
+    """Provider that answers after a delay, or fails."""
+
+    def __init__(self, name, delay=0.0, fail=False, configured=True):
+        super().__init__({"model": name})
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.configured = configured
+        self.calls = 0
+        self.cancelled = 0
+        self.closed = 0
+
+    async def generate(self, messages, tools=None):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise ConnectionError(f"{self.name} is down")
+        return LLMResponse(content=self.name, model=self.name)
+
+    async def stream(self, messages, tools=None):
+        try:
+            response = await self.generate(messages, tools)
+            yield LLMStreamChunk(content=response.content)
+            yield LLMStreamChunk(content="!", finish_reason="stop")
+        finally:
+            self.closed += 1
+
+    def is_configured(self):
+        return self.configured
+
+    def get_required_config(self):
+        return []
+
+
+def route(router, stream=False):
+    """Send one request through the router."""
+    messages = router.format_prompt("hello")
+
+    async def run():
+        if not stream:
+            return await router.generate(messages)
+        accumulator = StreamAccumulator()
+        async for chunk in router.stream(messages):
+            accumulator.add(chunk)
+        return accumulator.to_response()
+    return asyncio.run(run())
+
+
+def warm_up(router, name, seconds, kind="generate", count=5):
+    """Give a provider a latency history so hedging kicks in."""
+    for _ in range(count):
+        router.health[name].record_success(seconds, kind)
+
+
+def test_failover():
+    """A failing primary falls through to the next configured provider and is benched."""
+    primary = FakeProvider("openai", fail=True)
+    unconfigured = FakeProvider("google", configured=False)
+    fallback = FakeProvider("deepseek")
+    router = RoutingProvider([("openai", primary), ("google", unconfigured), ("deepseek", fallback)], cooldown=30)
+
+    assert route(router).content == "deepseek"
+    assert unconfigured.calls == 0 and router.failovers == 1
+
+    route(router)
+    assert not router.health["openai"].is_available()
+    # Benched providers are tried last
+    assert route(router).content == "deepseek" and primary.calls == 2
+
+    try:
+        route(RoutingProvider([("openai", FakeProvider("openai", fail=True))]))
+        assert False, "expected every provider to fail"
+    except RuntimeError as e:
+        assert "openai is down" in str(e)
+    print("✓ Failover to the next configured provider, with cooldown")
+
+
+def test_hedging_cancels_the_loser():
+    """A primary slower than its p95 is raced by the secondary; the loser is cancelled."""
+    primary = FakeProvider("openai", delay=1.0)
+    secondary = FakeProvider("deepseek", delay=0.01)
+    router = RoutingProvider([("openai", primary), ("deepseek", secondary)])
+    warm_up(router, "openai", 0.05)
+
+    response = route(router)
+    assert response.content == "deepseek"
+    assert primary.cancelled == 1 and router.hedges == 1 and router.hedge_wins == 1
+    # The cancelled attempt is neither a success nor a failure, but its latency counts
+    assert router.health["openai"].failures == 0 and router.health["openai"].successes == 5
+    assert router.health["openai"].latency() > 0.05
+
+    # A primary answering within its p95 is never hedged
+    primary.delay = 0.0
+    assert route(router).content == "openai" and router.hedges == 1
+
+    # Without enough samples there is nothing to hedge against
+    router = RoutingProvider([("openai", FakeProvider("openai", delay=0.1)), ("deepseek", FakeProvider("deepseek"))])
+    assert route(router).content == "openai" and router.hedges == 0
+    print("✓ Hedged after p95 latency; the losing request is cancelled")
+
+
+def test_streams_hedge_on_first_chunk():
+    """Streams race on the first chunk and close the losing stream."""
+    primary = FakeProvider("openai", delay=1.0)
+    secondary = FakeProvider("deepseek")
+    router = RoutingProvider([("openai", primary), ("deepseek", secondary)])
+    warm_up(router, "openai", 0.05, kind="stream")
+
+    response = route(router, stream=True)
+    assert response.content == "deepseek!"
+    assert primary.cancelled == 1 and primary.closed == 1 and secondary.closed == 1
+
+    router = RoutingProvider([("openai", FakeProvider("openai", fail=True)), ("deepseek", FakeProvider("deepseek"))])
+    assert route(router, stream=True).content == "deepseek!"
+    print("✓ Streams hedge and fail over before the first chunk")
+
+
+def test_outer_cancellation():
+    """Cancelling a routed request cancels every attempt in flight."""
+    primary = FakeProvider("openai", delay=5.0)
+    secondary = FakeProvider("deepseek", delay=5.0)
+    router = RoutingProvider([("openai", primary), ("deepseek", secondary)])
+    warm_up(router, "openai", 0.01)
+
+    async def run():
+        task = asyncio.ensure_future(router.generate(router.format_prompt("hello")))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert primary.cancelled == 1 and secondary.cancelled == 1
+    assert router.health["openai"].failures == 0
+    print("✓ Cancelling the request cancels both attempts")
+
+
+def test_health_statistics():
+    """Latency and error rate are exponentially weighted; p95 needs enough samples."""
+    health = ProviderHealth(alpha=0.5)
+    health.record_success(1.0)
+    health.record_success(3.0)
+    assert health.latency() == 2.0 and health.p95() is None
+    for seconds in range(1, 21):
+        health.record_success(seconds / 10)
+    assert health.p95() == 2.0
+    health.record_failure(RuntimeError("boom"))
+    assert health.error_rate == 0.5 and health.last_error == "boom"
+    health.record_success(0.1)
+    assert health.error_rate == 0.25
+    print("✓ EWMA latency, error rate and p95")
+
+
+if __name__ == "__main__":
+    test_failover()
+    test_hedging_cancels_the_loser()
+    test_streams_hedge_on_first_chunk()
+    test_outer_cancellation()
+    test_health_statistics()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Test the content search engine behind the search_files tool."""
+
+import asyncio
+import os
+import tempfile
+
+from terminai.tools.builtin import BuiltinTools
+from terminai.tools.manager import ToolManager
+from terminai.utils.search import SearchEngine
+from terminai.utils.walker import walk_files
+
+
+def make_tree():
+    """Create a small tree with ignored, binary and large files."""
+    root = tempfile.mkdtemp()
+    files = {
+        ".gitignore": "node_modules/\n*.log\n!keep.log\n/build\n",
+        "src/app.py": "import os\n\ndef main():\n    return needle()\n",
+        "src/.gitignore": "generated.py\n",
+        "src/generated.py": "needle\n",
+        "src/build/keep.txt": "needle (only root /build is ignored)\n",
+        "keep.log": "needle\n",
+        "debug.log": "needle\n",
+        "build/out.txt": "needle\n",
+        "node_modules/pkg/index.js": "needle\n",
+        ".git/config": "needle\n",
+        "big.txt": "".join(f"line {i}\n" for i in range(200000)) + "needle at the end\n",
+    }
+    for rel_path, content in files.items():
+        full_path = os.path.join(root, rel_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w") as f:
+            f.write(content)
+    with open(os.path.join(root, "image.bin"), "wb") as f:
+        f.write(b"\x89PNG\0\0needle")
+    return root
+
+
+def test_walk_respects_ignore_rules():
+    """.gitignore rules (nested, negated, anchored) and VCS directories are pruned."""
+    root = make_tree()
+    paths = [rel_path for rel_path, _ in walk_files(root)]
+    assert paths == [".gitignore", "big.txt", "image.bin", "keep.log", "src/.gitignore", "src/app.py", "src/build/keep.txt"]
+    assert [rel_path for rel_path, _ in walk_files(root, file_pattern="*.py")] == ["src/app.py"]
+    print("✓ Walk honours .gitignore rules and skips VCS directories")
+
+
+def test_search_content_with_context_and_cap():
+    """Matches carry line numbers and context, binaries are skipped and results are capped."""
+    root = make_tree()
+    engine = SearchEngine(chunk_size=4096)
+
+    result = engine.search(root, "needle", context_lines=1)
+    found = [(os.path.relpath(m.path, root), m.line_number) for m in result.matches]
+    assert found == [("big.txt", 200001), ("keep.log", 1), ("src/app.py", 4), ("src/build/keep.txt", 1)]
+    assert result.binary_files_skipped == 1 and not result.truncated
+
+    app_match = result.matches[2]
+    assert app_match.before == ["def main():"] and app_match.after == []
+    assert result.matches[0].before == ["line 199999"]
+    assert f"{app_match.path}:4:    return needle()" in result.format()
+
+    capped = engine.search(root, "NEEDLE", case_sensitive=False, max_results=2)
+    assert len(capped.matches) == 2 and capped.truncated
+    assert "capped at 2" in capped.format()
+
+    regex = engine.search(root, r"^line 1234\d$", regex=True, context_lines=0)
+    assert [m.line_number for m in regex.matches] == list(range(12341, 12351))
+    print("✓ Content search returns line numbers, context and capped results")
+
+
+def test_search_files_tool():
+    """The tool runs the engine off the event loop and reports bad regexes."""
+    root = make_tree()
+    tool_manager = ToolManager()
+    BuiltinTools(bash_executor=None).register_all(tool_manager)
+
+    result = asyncio.run(tool_manager.execute_tool("search_files", {
+        "pattern": "return needle", "path": root, "search_content": True
+    }))
+    assert result.success and ":4:    return needle()" in result.content
+
+    result = asyncio.run(tool_manager.execute_tool("search_files", {"pattern": "app", "path": root}))
+    assert result.content == os.path.join(root, "src/app.py")
+
+    result = asyncio.run(tool_manager.execute_tool("search_files", {
+        "pattern": "(", "path": root, "search_content": True, "regex": True
+    }))
+    assert not result.success and "Invalid regular expression" in result.error
+    print("✓ search_files tool uses the search engine")
+
+
+if __name__ == "__main__":
+    test_walk_respects_ignore_rules()
+    test_search_content_with_context_and_cap()
+    test_search_files_tool()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Test the semantic near-duplicate prompt cache."""
+
+import os
+import tempfile
+import time
+
+from terminai.llm.semantic_cache import HashingVectorizer, SemanticCache, literals
+
+DISK_CALLS = [{"id": "call_1", "type": "function", "function": {"name": "execute_command", "arguments": "{\"command\": \"df -h\"}"}}]
+PY_CALLS = [{"id": "call_2", "type": "function", "function": {"name": "list_files", "arguments": "{\"pattern\": \"*.py\"}"}}]
+
+
+def test_rephrasings_match():
+    """Rephrased requests find the earlier prompt; different requests do not."""
+    cache = SemanticCache(tempfile.mkdtemp())
+    cache.add("show disk usage", DISK_CALLS)
+    cache.add("list all python files", PY_CALLS)
+
+    match = cache.lookup("how much disk is used")
+    assert match is not None and match.prompt == "show disk usage" and match.tool_calls == DISK_CALLS
+    assert cache.lookup("Please list python files").tool_calls == PY_CALLS
+    assert cache.lookup("show memory usage") is None
+    assert cache.lookup("list all javascript files") is None
+    assert cache.lookup("???") is None
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 3
+
+    vectorizer = HashingVectorizer()
+    assert (vectorizer.embed("disk usage") == HashingVectorizer().embed("disk usage")).all()
+    print("✓ Rephrased prompts match, unrelated prompts do not")
+
+
+
+def test_targets_must_match():
+    """Prompts naming different files, numbers or quoted text never share tool calls."""
+    delete_a = [{"id": "call_3", "type": "function", "function": {"name": "execute_command", "arguments": "{\"command\": \"rm a.txt\"}"}}]
+    cache = SemanticCache(tempfile.mkdtemp())
+    cache.add("delete file a.txt", delete_a)
+    cache.add("show the top 10 processes", DISK_CALLS)
+    cache.add('search for "TODO" in the code', PY_CALLS)
+
+    assert cache.vectorizer.embed("delete file a.txt") @ cache.vectorizer.embed("delete file b.txt") >= cache.threshold
+    assert cache.lookup("delete file b.txt") is None
+    assert cache.lookup("please delete file a.txt").tool_calls == delete_a
+    assert cache.lookup("show the top 5 processes") is None
+    assert cache.lookup('search for "FIXME" in the code') is None
+    assert literals("copy ./src/x.py to 'my dir', then stop.") == ["./src/x.py", "my dir"]
+    print("✓ Different targets never reuse tool calls")
+
+
+def test_store_persists_and_appends():
+    """Entries survive reopening, appends extend the map and torn appends are repaired."""
+    directory = tempfile.mkdtemp()
+    cache = SemanticCache(directory, max_entries=8)
+    for i in range(5):
+        cache.add(f"request number {i} about topic{i}", PY_CALLS)
+    assert len(cache.store) == 5 and cache.store.vectors().shape == (5, 512)
+    cache.add("show disk usage", DISK_CALLS)
+    assert cache.store.vectors().shape == (6, 512)
+
+    reopened = SemanticCache(directory)
+    assert len(reopened.store) == 6
+    assert reopened.lookup("disk usage").tool_calls == DISK_CALLS
+
+    # An append interrupted after the vector was written is trimmed away
+    with open(os.path.join(directory, "vectors.f32"), "ab") as f:
+        f.write(b"\0" * 100)
+    assert len(SemanticCache(directory).store) == 6
+    assert os.path.getsize(os.path.join(directory, "vectors.f32")) == 6 * 512 * 4
+
+    # Going well over max_entries keeps only the newest
+    for i in range(10):
+        cache.add(f"another request {i} on subject{i}", PY_CALLS)
+    assert len(cache.store) <= 10 and cache.lookup("another request 9 on subject9") is not None
+    assert len(SemanticCache(directory).store) == len(cache.store)
+    print("✓ Memory-mapped store appends, persists, repairs and compacts")
+
+
+def test_lookup_speed():
+    """Lookups over thousands of stored prompts stay fast."""
+    cache = SemanticCache(tempfile.mkdtemp(), max_entries=20000)
+    for i in range(5000):
+        cache.add(f"request {i} for item{i} in folder{i % 97}", PY_CALLS)
+
+    start = time.perf_counter()
+    for i in range(100):
+        cache.lookup(f"find item{i} somewhere")
+    per_lookup_ms = (time.perf_counter() - start) * 10
+    assert per_lookup_ms < 20, f"{per_lookup_ms:.2f} ms per lookup"
+    print(f"✓ {per_lookup_ms:.2f} ms per lookup over 5000 prompts")
+
+
+if __name__ == "__main__":
+    test_rephrasings_match()
+    test_targets_must_match()
+    test_store_persists_and_appends()
+    test_lookup_speed()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Test SSE connection readiness against a local MCP server."""
+
+import asyncio
+import socket
+import threading
+import time
+
+import uvicorn
+from mcp.server.fastmcp import FastMCP
+
+from terminai.mcp.connections.sse_connection import SSEConnection
+from terminai.mcp.exceptions import MCPConnectionError
+
+# A fast local server must connect well under the old fixed 2 s sleep
+CONNECT_BUDGET_MS = 1000
+
+
+def start_server():
+    """Start a FastMCP SSE server on a free port in a background thread."""
+    server = FastMCP("stand-in")
+
+    @server.tool()
+    def echo(text: str) -> str:
+        """Echo the text back."""
+        return text
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    uvicorn_server = uvicorn.Server(uvicorn.Config(server.sse_app(), host="127.0.0.1", port=port, log_level="error"))
+    thread = threading.Thread(target=uvicorn_server.run, daemon=True)
+    thread.start()
+    while not uvicorn_server.started:
+        time.sleep(0.01)
+    return uvicorn_server, thread, port
+
+
+def test_connects_as_soon_as_initialized():
+    """connect() returns once the session is initialized, not after a fixed delay."""
+    server, thread, port = start_server()
+
+    async def run():
+        connection = SSEConnection("local", {"url": f"http://127.0.0.1:{port}/sse", "timeout": 5})
+        start = time.perf_counter()
+        await connection.connect()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        tools = await connection.list_tools()
+
+        start = time.perf_counter()
+        await connection.disconnect()
+        disconnect_ms = (time.perf_counter() - start) * 1000
+        return elapsed_ms, disconnect_ms, tools, connection.is_connected()
+
+    try:
+        elapsed_ms, disconnect_ms, tools, connected_after = asyncio.run(run())
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+
+    assert [tool["name"] for tool in tools] == ["echo"]
+    assert not connected_after
+    assert elapsed_ms < CONNECT_BUDGET_MS, f"connect took {elapsed_ms:.0f} ms"
+    print(f"✓ Connected in {elapsed_ms:.1f} ms, disconnected in {disconnect_ms:.1f} ms")
+
+
+def test_connection_error_surfaces_immediately():
+    """A refused connection fails right away with the underlying error."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    async def run():
+        connection = SSEConnection("missing", {"url": f"http://127.0.0.1:{port}/sse", "timeout": 5})
+        start = time.perf_counter()
+        try:
+            await connection.connect()
+        except MCPConnectionError as e:
+            return (time.perf_counter() - start) * 1000, str(e)
+        raise AssertionError("connect() should have failed")
+
+    elapsed_ms, error = asyncio.run(run())
+    assert elapsed_ms < CONNECT_BUDGET_MS, f"failure took {elapsed_ms:.0f} ms"
+    assert "connect" in error.lower()
+    print(f"✓ Connection error reported in {elapsed_ms:.1f} ms: {error}")
+
+
+if __name__ == "__main__":
+    test_connects_as_soon_as_initialized()
+    test_connection_error_surfaces_immediately()
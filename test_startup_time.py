@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Import-time benchmark for terminai startup.
+
+Runs the startup path (terminal import plus provider discovery) under
+``python -X importtime`` and fails if it exceeds the budget or pulls in
+any vendor LLM SDK before a provider is actually used.
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+# Budget for all imports on the startup path, in milliseconds
+IMPORT_BUDGET_MS = float(os.getenv("TERMINAI_IMPORT_BUDGET_MS", "1500"))
+
+SDK_MODULES = ["openai", "anthropic", "google.generativeai"]
+
+STARTUP_SCRIPT = """
+import json, sys
+from terminai.terminal import TerminaiTerminal
+from terminai.llm.base import LLMManager
+
+config = json.load(open(sys.argv[1]))
+manager = LLMManager()
+manager.load_providers_from_config(config)
+manager.get_configured_providers(config)
+default = config["llm"]["default_provider"]
+manager.get_provider(default, config["llm"]["providers"][default])
+print(json.dumps([m for m in %r if m in sys.modules]))
+""" % (SDK_MODULES,)
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CONFIG = os.path.join(ROOT, "config", "default.json")
+
+
+def run_startup():
+    """Run the startup script and return (total_ms, loaded_sdks)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT, DEFAULT_CONFIG],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        # Only top-level imports; nested ones are already in their parent's cumulative time
+        if fields[2].startswith("  "):
+            continue
+        total_us += int(fields[1])
+
+    return total_us / 1000.0, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_startup_import_time():
+    """Startup imports stay within budget and skip vendor SDKs."""
+    # First run warms the bytecode cache
+    run_startup()
+    total_ms, loaded_sdks = run_startup()
+
+    print(f"Startup import time: {total_ms:.1f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)")
+    print(f"SDK modules loaded at startup: {loaded_sdks or 'none'}")
+
+    assert not loaded_sdks, f"SDKs imported during startup: {loaded_sdks}"
+    assert total_ms <= IMPORT_BUDGET_MS, f"Startup imports took {total_ms:.1f} ms, budget is {IMPORT_BUDGET_MS:.0f} ms"
+
+
+if __name__ == "__main__":
+    test_startup_import_time()
+    print("✓ Startup import time within budget")
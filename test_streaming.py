@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Test streamed responses and tool-call reassembly for OpenAI-compatible providers."""
+
+import asyncio
+import json
+
+import httpx
+from openai import AsyncOpenAI
+
+from terminai.llm.base import LLMMessage, StreamAccumulator
+from terminai.llm.providers.openai_provider import OpenAIProvider
+
+
+def sse_event(delta, finish_reason=None):
+    """Build one chat.completion.chunk server-sent event."""
+    chunk = {
+        "id": "chatcmpl-test",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": "test-model",
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+    }
+    return f"data: {json.dumps(chunk)}\n\n"
+
+
+STREAM_BODY = "".join([
+    sse_event({"role": "assistant", "content": "Let me "}),
+    sse_event({"content": "check."}),
+    sse_event({"tool_calls": [{"index": 0, "id": "call_a", "type": "function",
+                               "function": {"name": "read_file", "arguments": "{\"pa"}}]}),
+    sse_event({"tool_calls": [{"index": 1, "id": "call_b", "type": "function",
+                               "function": {"name": "list_files", "arguments": ""}}]}),
+    sse_event({"tool_calls": [{"index": 0, "function": {"arguments": "th\": \"README.md\"}"}}]}),
+    sse_event({"tool_calls": [{"index": 1, "function": {"arguments": "{\"path\": \".\"}"}}]}),
+    sse_event({}, finish_reason="tool_calls"),
+    "data: [DONE]\n\n",
+])
+
+
+async def collect_stream():
+    """Stream from a provider backed by a canned SSE response."""
+    def handler(request):
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=STREAM_BODY.encode())
+
+    provider = OpenAIProvider({"api_key": "test-key", "model": "test-model"})
+    provider.client = AsyncOpenAI(
+        api_key="test-key",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+
+    accumulator = StreamAccumulator()
+    deltas = []
+    async for chunk in provider.stream([LLMMessage(role="user", content="read the readme")]):
+        accumulator.add(chunk)
+        if chunk.content:
+            deltas.append(chunk.content)
+    return deltas, accumulator.to_response()
+
+
+def test_stream_reassembles_tool_calls():
+    """Content deltas arrive incrementally and tool-call fragments are stitched back together."""
+    deltas, response = asyncio.run(collect_stream())
+
+    assert deltas == ["Let me ", "check."]
+    assert response.content == "Let me check."
+    assert response.model == "test-model"
+    assert response.tool_calls == [
+        {"id": "call_a", "type": "function",
+         "function": {"name": "read_file", "arguments": "{\"path\": \"README.md\"}"}},
+        {"id": "call_b", "type": "function",
+         "function": {"name": "list_files", "arguments": "{\"path\": \".\"}"}},
+    ]
+    print("✓ Streamed tool calls reassembled in order")
+
+
+if __name__ == "__main__":
+    test_stream_reassembles_tool_calls()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Test cached, versioned tool definitions in ToolManager."""
+
+import json
+import time
+
+from terminai.tools.manager import ToolManager
+
+
+async def noop(**kwargs):
+    """Executor that is never called."""
+
+
+def register(manager, names):
+    """Register simple tools in the given order."""
+    for name in names:
+        manager.register_tool(name, f"The {name} tool", {"arg": {"type": "string", "description": "An argument"}}, noop)
+
+
+def test_generation_and_caching():
+    """Definitions are built once per generation and rebuilt after changes."""
+    manager = ToolManager()
+    assert manager.generation == 0 and manager.get_tool_definitions() == []
+
+    register(manager, ["read_file", "list_files"])
+    assert manager.generation == 2
+    first = manager.get_tool_definitions()
+    assert manager.get_tool_definitions() is first
+    assert manager.get_tool_definitions_json() is manager.get_tool_definitions_json()
+    assert json.loads(manager.get_tool_definitions_json()) == first
+
+    register(manager, ["search_files"])
+    assert manager.generation == 3 and manager.get_tool_definitions() is not first
+    assert len(manager.get_tool_definitions()) == 3
+
+    assert manager.unregister_tool("search_files") and manager.generation == 4
+    assert not manager.unregister_tool("search_files") and manager.generation == 4
+    assert json.loads(manager.get_tool_definitions_json()) == first
+    print("✓ Definitions cached per generation")
+
+
+def test_deterministic_bytes():
+    """The same tools produce the same bytes whatever order they were registered in."""
+    names = [f"mcp_server_tool_{i}" for i in range(20)] + ["execute_command", "read_file"]
+    a, b = ToolManager(), ToolManager()
+    register(a, names)
+    register(b, list(reversed(names)))
+    assert a.get_tool_definitions_json() == b.get_tool_definitions_json()
+    assert [d["function"]["name"] for d in a.get_tool_definitions()] == sorted(names)
+
+    # Subsets are joined from the cached bytes in name order
+    subset = [a.get_tool_definitions()[3], a.get_tool_definitions()[1]]
+    assert a.get_tool_definitions_json(subset) == b.get_tool_definitions_json(list(reversed(subset)))
+    assert json.loads(a.get_tool_definitions_json(subset)) == sorted(subset, key=lambda d: d["function"]["name"])
+    print("✓ Tool JSON is identical regardless of registration order")
+
+
+def test_cached_calls_are_cheap():
+    """Repeated calls skip rebuilding and reserializing."""
+    manager = ToolManager()
+    register(manager, [f"mcp_server_tool_{i}" for i in range(300)])
+
+    start = time.perf_counter()
+    for _ in range(100):
+        json.dumps(manager._build_definitions())
+    rebuilt = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(100):
+        manager.get_tool_definitions()
+        manager.get_tool_definitions_json()
+    cached = time.perf_counter() - start
+
+    assert cached * 10 < rebuilt
+    print(f"✓ 300 tools: {rebuilt * 10:.2f} ms per rebuild vs {cached * 10 * 1000:.1f} µs cached")
+
+
+if __name__ == "__main__":
+    test_generation_and_caching()
+    test_deterministic_bytes()
+    test_cached_calls_are_cheap()
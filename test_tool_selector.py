@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Test relevance-based tool selection."""
+
+from terminai.tools.builtin import BuiltinTools
+from terminai.tools.manager import ToolManager
+from terminai.tools.selector import ToolSelector, tokenize
+from terminai.utils.bash import BashExecutor
+
+MCP_TOOLS = {
+    "mcp_takeoff_project-find-by-path": ("Find a project by its filesystem path", ["path"]),
+    "mcp_takeoff_test-connection": ("Test the connection to the takeoff server", []),
+    "mcp_github_create_issue": ("Create an issue in a GitHub repository", ["repo", "title", "body"]),
+    "mcp_github_list_pull_requests": ("List pull requests for a repository", ["repo", "state"]),
+    "mcp_db_run_query": ("Run a SQL query against the database", ["sql"]),
+    "mcp_db_list_tables": ("List tables in the database", ["schema"]),
+    "mcp_slack_post_message": ("Post a message to a Slack channel", ["channel", "text"]),
+    "mcp_calendar_createEvent": ("Create a calendar event", ["title", "start", "end"]),
+    "mcp_weather_forecast": ("Get the weather forecast for a city", ["city"]),
+    "mcp_jira_transition_ticket": ("Move a Jira ticket to another status", ["ticket", "status"]),
+}
+
+
+async def noop(**kwargs):
+    """Executor that is never called."""
+
+
+def make_manager():
+    """A tool manager with the builtin tools and a spread of MCP tools."""
+    manager = ToolManager()
+    BuiltinTools(BashExecutor()).register_all(manager)
+    for name, (description, params) in MCP_TOOLS.items():
+        manager.register_tool(name, description, {p: {"type": "string", "description": p} for p in params}, noop)
+    return manager
+
+
+def test_tokenize():
+    """Names split on underscores, dashes and camelCase; plurals fold."""
+    assert tokenize("mcp_calendar_createEvent") == ["calendar", "create", "event"]
+    assert tokenize("project-find-by-path") == ["project", "find", "path"]
+    assert tokenize("List the files") == ["list", "file"]
+    assert tokenize("process address") == ["process", "address"]
+    print("✓ Tool names and requests tokenized alike")
+
+
+def test_relevant_tools_selected():
+    """The best-matching tools are sent along with the pinned core set."""
+    definitions = make_manager().get_tool_definitions()
+    selector = ToolSelector(top_k=3)
+
+    selection = selector.select("open a github issue about the crash in this repo", definitions)
+    assert "mcp_github_create_issue" in selection.selected
+    registered = [d["function"]["name"] for d in definitions]
+    for pinned in selector.pinned:
+        assert pinned in selection.selected or pinned not in registered
+    assert "mcp_weather_forecast" not in selection.selected
+    assert len(selection.selected) <= 3 + len(selector.pinned)
+
+    # Selected tools keep registration order
+    names = [d["function"]["name"] for d in definitions]
+    assert selection.selected == sorted(selection.selected, key=names.index)
+
+    selection = selector.select("what tables are in the database?", definitions)
+    assert {"mcp_db_list_tables", "mcp_db_run_query"} <= set(selection.selected)
+
+    selection = selector.select("find the project at this path", definitions)
+    assert "mcp_takeoff_project-find-by-path" in selection.selected
+    print(f"✓ Relevant tools selected ({len(selection.selected)} of {selection.total})")
+
+
+def test_tokens_saved_and_settings():
+    """Savings are reported per request and per session; small tool sets are sent whole."""
+    definitions = make_manager().get_tool_definitions()
+    selector = ToolSelector(top_k=2)
+    first = selector.select("post a message to slack", definitions)
+    assert first.tokens_saved > 0 and first.tokens_sent + first.tokens_saved > first.tokens_sent
+    selector.select("weather in paris", definitions)
+    stats = selector.stats()
+    assert stats["requests"] == 2 and stats["tokens_saved"] > first.tokens_saved
+
+    # No match: only the pinned tools
+    selection = selector.select("hello there", definitions)
+    assert selection.selected == [name for name in [d["function"]["name"] for d in definitions] if name in selector.pinned]
+
+    selector.enabled = False
+    assert len(selector.select("post to slack", definitions).tools) == len(definitions)
+
+    # Tools used earlier in the conversation are kept for follow-ups
+    selector.enabled = True
+    follow_up = selector.select("now do the same again", definitions, keep=["mcp_slack_post_message"])
+    assert "mcp_slack_post_message" in follow_up.selected
+
+    # Sizes from the manager's cached bytes match serializing afresh
+    manager = make_manager()
+    cached = ToolSelector(top_k=2, serialize=manager.get_tool_definition_json)
+    selection = cached.select("post a message to slack", manager.get_tool_definitions(), manager.generation)
+    assert (selection.tokens_sent, selection.tokens_saved) == (first.tokens_sent, first.tokens_saved)
+
+    small = ToolSelector(top_k=8)
+    builtin_only = [d for d in definitions if not d["function"]["name"].startswith("mcp_")]
+    assert small.select("slack", builtin_only).tools == builtin_only
+    print(f"✓ Saved ~{stats['tokens_saved']} tokens over 2 requests")
+
+
+if __name__ == "__main__":
+    test_tokenize()
+    test_relevant_tools_selected()
+    test_tokens_saved_and_settings()
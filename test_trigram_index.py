@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Test the persistent trigram index used by search_files."""
+
+import asyncio
+import os
+import tempfile
+import time
+
+from terminai.tools.builtin import BuiltinTools
+from terminai.tools.manager import ToolManager
+from terminai.utils.trigram_index import IndexManager, extract_trigrams
+
+
+def write(root, rel_path, content):
+    """Write a file, bumping its mtime so changes are always detected."""
+    full_path = os.path.join(root, rel_path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, "w") as f:
+        f.write(content)
+    stamp = time.time() + 10
+    os.utime(full_path, (stamp, stamp))
+
+
+def test_incremental_index():
+    """Candidates narrow to files containing every trigram and follow file changes."""
+    root = tempfile.mkdtemp()
+    manager = IndexManager(tempfile.mkdtemp())
+    for i in range(50):
+        write(root, f"pkg/mod_{i}.py", f"def function_{i}():\n    return {i}\n")
+    write(root, "pkg/special.py", "class NeedleFinder:\n    pass\n")
+    write(root, "ignored/.gitignore", "*.py\n")
+    write(root, "ignored/hidden.py", "NeedleFinder\n")
+
+    assert manager.find(root) is None
+    index = manager.open(root, create=True)
+    stats = index.update()
+    assert stats["added"] == 52 and stats["unchanged"] == 0
+
+    assert index.candidates("needlefinder") == ["pkg/special.py"]
+    assert index.candidates("function_1") == sorted(
+        f"pkg/mod_{i}.py" for i in [1] + list(range(10, 20))
+    )
+    assert index.candidates("ab") is None
+    assert extract_trigrams(b"AbCd") == extract_trigrams(b"abcd")
+    print("✓ Trigram candidates narrow the search case-insensitively")
+
+    write(root, "pkg/mod_3.py", "NeedleFinder()\n")
+    os.remove(os.path.join(root, "pkg/special.py"))
+    write(root, "pkg/new.py", "needlefinder = 1\n")
+    stats = index.update()
+    assert stats == {"added": 1, "updated": 1, "removed": 1, "unchanged": 50}
+    assert index.candidates("NeedleFinder") == ["pkg/mod_3.py", "pkg/new.py"]
+    assert index.candidates("function_3(") == []
+    assert index.candidates("needle", prefix="pkg") == ["pkg/mod_3.py", "pkg/new.py"]
+    assert index.candidates("needle", prefix="other") == []
+    print("✓ Incremental updates re-index only changed files")
+
+    found_index, prefix = manager.find(os.path.join(root, "pkg"))
+    assert found_index is index and prefix == "pkg"
+    assert manager.list_roots() == [os.path.realpath(root)]
+    assert manager.drop(root) and manager.find(root) is None
+
+
+def test_search_files_uses_index():
+    """search_files gives the same results with and without an index."""
+    root = tempfile.mkdtemp()
+    for i in range(20):
+        write(root, f"src/file_{i}.txt", "".join(f"line {j}\n" for j in range(100)) + ("MARKER\n" if i % 7 == 0 else ""))
+    write(root, "src/sub/deep.txt", "marker in a subdirectory\n")
+
+    tools = BuiltinTools(bash_executor=None, index_dir=tempfile.mkdtemp())
+    tool_manager = ToolManager()
+    tools.register_all(tool_manager)
+
+    def search(**args):
+        return asyncio.run(tool_manager.execute_tool("search_files", dict(
+            {"pattern": "MARKER", "path": os.path.join(root, "src"), "search_content": True, "context_lines": 0}, **args
+        ))).content
+
+    expected = search()
+    unindexed_recursive = search(recursive=False)
+    tools.index_manager.open(root, create=True).update()
+    assert search() == expected and expected.count("MARKER") == 3
+    assert search(recursive=False) == unindexed_recursive
+    assert "deep.txt" in search(case_sensitive=False)
+    print("✓ search_files returns identical results through the index")
+
+
+
+def test_index_refresh_rate_limited():
+    """Searches walk the tree at most once per refresh interval, and again after writes."""
+    root = tempfile.mkdtemp()
+    write(root, "a.txt", "MARKER\n")
+    tools = BuiltinTools(bash_executor=None, index_dir=tempfile.mkdtemp(), index_refresh=60)
+    tool_manager = ToolManager()
+    tools.register_all(tool_manager)
+    index = tools.index_manager.open(root, create=True)
+    assert index.refresh(60) is not None and index.refresh(60) is None
+
+    def search():
+        return asyncio.run(tool_manager.execute_tool("search_files", {
+            "pattern": "MARKER", "path": root, "search_content": True, "context_lines": 0
+        })).content
+
+    # Changed behind our back: not seen until the interval passes
+    write(root, "b.txt", "MARKER\n")
+    assert "b.txt" not in search()
+
+    # Our own writes make the next search walk the tree
+    asyncio.run(tool_manager.execute_tool("write_to_file", {"path": os.path.join(root, "c.txt"), "content": "MARKER\n"}))
+    found = search()
+    assert "b.txt" in found and "c.txt" in found
+    assert index.refresh(60) is None and index.refresh(0) is not None
+    print("✓ Index refreshes are rate-limited and follow our own writes")
+
+
+if __name__ == "__main__":
+    test_incremental_index()
+    test_search_files_uses_index()
+    test_index_refresh_rate_limited()